@@ -0,0 +1,679 @@
+"""
+Benchmark and regression check for the hottest pure-Python code: extracting
+data from filenames and matching files, GetComics groups and search results
+to volumes.
+
+The corpus is built deterministically from the fixtures in
+`parsing_corpus.json`. Alongside it, `parsing_real.json` holds filenames as
+they occur in the wild, taken from the test suites of other comic tools and
+from the documentation. `parsing_golden.json` contains the expected output of
+every call of every function for the full corpus, so that a change in results
+is noticed and can be pinpointed. Outputs that occur more than once are stored
+once and referred to by their index.
+
+```
+# Report throughput and the memory allocated per call
+python3 benchmarks/parsing.py
+
+# Fail if any function gives a different result than the golden outputs
+python3 benchmarks/parsing.py --check
+
+# Save a baseline, make a change, then compare speed and results with it
+python3 benchmarks/parsing.py --save /tmp/before.json
+python3 benchmarks/parsing.py --compare /tmp/before.json --tolerance 0.1
+```
+"""
+
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from collections.abc import Callable, Sequence
+from json import dump, dumps, load
+from os.path import abspath, dirname, isfile, join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from typing import Any
+
+BENCHMARK_FOLDER = dirname(abspath(__file__))
+sys.path.insert(0, join(dirname(BENCHMARK_FOLDER), "src"))
+
+from backend.base.definitions import (  # noqa: E402
+    FilenameData,
+    IssueData,
+    SearchResultData,
+    SpecialVersion,
+    VolumeData,
+)
+from backend.base.file_extraction import (  # noqa: E402
+    clear_filename_data_cache,
+    extract_filename_data,
+)
+from backend.features.search import _rank_search_result  # noqa: E402
+from backend.implementations.matching import (  # noqa: E402
+    IssueIndex,
+    check_search_result_match,
+    file_importing_filter,
+    gc_group_filter,
+)
+
+CORPUS_FILE = join(BENCHMARK_FOLDER, "parsing_corpus.json")
+REAL_FILE = join(BENCHMARK_FOLDER, "parsing_real.json")
+GOLDEN_FILE = join(BENCHMARK_FOLDER, "parsing_golden.json")
+
+
+class Fixture:
+    "A volume of the corpus, with its issues and the inputs that belong to it"
+
+    def __init__(self, id: int, volume: dict[str, Any]) -> None:
+        self.volume_data = VolumeData(
+            id=id,
+            comicvine_id=id,
+            libgen_series_id=None,
+            marvel_id=None,
+            title=volume["title"],
+            alt_title=volume.get("alt_title"),
+            year=volume["year"],
+            publisher=volume["publisher"],
+            volume_number=volume["volume_number"],
+            description="",
+            site_url="",
+            monitored=True,
+            monitor_new_issues=True,
+            root_folder=1,
+            folder="/comics/" + volume["title"].replace(":", ""),
+            custom_folder=False,
+            special_version=SpecialVersion(
+                volume.get("special_version", SpecialVersion.NORMAL.value)
+            ),
+            special_version_locked=False,
+            last_cv_fetch=0,
+        )
+        self.issue_count: int = volume["issue_count"]
+
+        numbers = [float(n) for n in range(1, self.issue_count + 1)]
+        if volume.get("half_issues"):
+            numbers += [n + 0.5 for n in numbers[::4]]
+
+        self.issue_index = IssueIndex(
+            IssueData(
+                id=id * 10_000 + i,
+                volume_id=id,
+                comicvine_id=id * 10_000 + i,
+                issue_number=str(n).removesuffix(".0"),
+                calculated_issue_number=n,
+                title=None,
+                date=f"{self.issue_year(n)}-01-01",
+                description=None,
+                monitored=True,
+                files=[],
+            )
+            for i, n in enumerate(numbers)
+        )
+        self.ending_year = self.issue_year(numbers[-1])
+
+        self.filepaths: list[str] = []
+        self.titles: list[str] = []
+        return
+
+    def issue_year(self, issue_number: float) -> int:
+        return self.volume_data.year + int(issue_number - 1) // 12
+
+    def format_values(self, sample: int, group: str) -> dict[str, Any]:
+        issue = (sample - 1) % self.issue_count + 1
+        series = self.volume_data.title
+        safe_series = series.replace(":", "")
+        return {
+            "series": series,
+            "safe_series": safe_series,
+            "series_dotted": safe_series.replace(" ", "."),
+            "series_underscored": safe_series.replace(" ", "_"),
+            "publisher": self.volume_data.publisher,
+            "year": self.volume_data.year,
+            "volume": self.volume_data.volume_number,
+            "issue": issue,
+            "issue_end": min(issue + 4, self.issue_count),
+            "issue_year": self.issue_year(issue),
+            "issue_count": self.issue_count,
+            "group": group,
+        }
+
+
+def build_corpus() -> list[Fixture]:
+    """Expand the fixtures of the corpus file into the full corpus.
+
+    Returns:
+        List[Fixture]: The volumes, with their filepaths and GetComics titles.
+    """
+    with open(CORPUS_FILE) as f:
+        corpus = load(f)
+
+    fixtures: list[Fixture] = []
+    groups: list[str] = corpus["release_groups"]
+    counter = 0
+    for id, volume in enumerate(corpus["volumes"], start=1):
+        fixture = Fixture(id, volume)
+        for sample in corpus["issue_samples"]:
+            for folder in corpus["folders"]:
+                for filename in corpus["filenames"]:
+                    values = fixture.format_values(
+                        sample, groups[counter % len(groups)]
+                    )
+                    values["series"] = values["safe_series"]
+                    counter += 1
+                    fixture.filepaths.append(
+                        folder.format(**values) + filename.format(**values)
+                    )
+
+            for title in corpus["titles"]:
+                values = fixture.format_values(
+                    sample, groups[counter % len(groups)]
+                )
+                counter += 1
+                fixture.titles.append(title.format(**values))
+
+        fixtures.append(fixture)
+
+    return fixtures
+
+
+def load_real_filenames() -> list[str]:
+    """Load the sample of real filenames.
+
+    Returns:
+        List[str]: The filenames.
+    """
+    with open(REAL_FILE) as f:
+        return load(f)["filenames"]
+
+
+class Benchmark:
+    "A function and the arguments of every call that is made to it"
+
+    def __init__(
+        self,
+        function: Callable[..., Any],
+        calls: Sequence[tuple],
+        setup: Callable[[], Any] | None = None,
+    ) -> None:
+        """Prepare a benchmark.
+
+        Args:
+            function (Callable[..., Any]): The function to benchmark.
+            calls (Sequence[tuple]): The positional arguments of every call.
+            setup (Union[Callable[[], Any], None], optional): Run before every
+            run of the benchmark, e.g. to clear a cache.
+                Defaults to None.
+        """
+        self.function = function
+        self.calls = calls
+        self.setup = setup
+        return
+
+    def run(self) -> list:
+        """Make every call.
+
+        Returns:
+            list: The output of every call.
+        """
+        if self.setup is not None:
+            self.setup()
+        return [self.function(*args) for args in self.calls]
+
+    def allocated_per_call(self) -> int:
+        """Trace the memory that every call allocates at its peak. The output
+        of a call is discarded right after it, so that the memory that is kept
+        by earlier outputs isn't counted.
+
+        Returns:
+            int: The mean of the peak of allocated memory per call, in bytes.
+        """
+        if self.setup is not None:
+            self.setup()
+
+        total = 0
+        start()
+        try:
+            for args in self.calls:
+                before = get_traced_memory()[0]
+                reset_peak()
+                self.function(*args)
+                total += get_traced_memory()[1] - before
+        finally:
+            stop()
+
+        return round(total / len(self.calls))
+
+
+def _extract_filename_data(*args: Any) -> dict[str, Any]:
+    return dict(extract_filename_data(*args))
+
+
+def build_benchmarks(
+    fixtures: list[Fixture], real_filenames: list[str]
+) -> dict[str, Benchmark]:
+    """Prepare the inputs of every benchmarked function.
+
+    Args:
+        fixtures (List[Fixture]): The corpus.
+        real_filenames (List[str]): The sample of real filenames.
+
+    Returns:
+        Dict[str, Benchmark]: Name of the benchmark to the benchmark.
+    """
+    efd_inputs: list[tuple] = []
+    files: list[tuple[FilenameData, VolumeData, IssueIndex]] = []
+    groups: list[tuple[FilenameData, VolumeData, int | None, IssueIndex]] = []
+    results: list[
+        tuple[SearchResultData, VolumeData, IssueIndex, float | None]
+    ] = []
+
+    for fixture in fixtures:
+        for filepath in fixture.filepaths:
+            efd_inputs.append((filepath,))
+            files.append(
+                (
+                    extract_filename_data(filepath),
+                    fixture.volume_data,
+                    fixture.issue_index,
+                )
+            )
+
+        for index, title in enumerate(fixture.titles):
+            efd_inputs.append((title, False, False, True))
+            efd = extract_filename_data(
+                title, assume_volume_number=False, fix_year=True
+            )
+            groups.append(
+                (
+                    efd,
+                    fixture.volume_data,
+                    fixture.ending_year,
+                    fixture.issue_index,
+                )
+            )
+
+            issue_number = efd["issue_number"]
+            results.append(
+                (
+                    SearchResultData(
+                        **efd,
+                        link=f"https://getcomics.org/dlds/{len(results)}",
+                        display_title=title,
+                        source="GetComics",
+                        filesize=None,
+                        pages=None,
+                        releaser=None,
+                        scan_type=None,
+                        resolution=None,
+                        dpi=None,
+                        extension=None,
+                        comics_id=None,
+                        md5=None,
+                        web_sub_title=None,
+                    ),
+                    fixture.volume_data,
+                    fixture.issue_index,
+                    # Alternate between volume and issue searches
+                    issue_number
+                    if index % 2 and isinstance(issue_number, float)
+                    else None,
+                )
+            )
+
+    matches = [check_search_result_match(*args) for args in results]
+    ranks = [
+        (
+            result,
+            match,
+            volume_data.title,
+            volume_data.volume_number,
+            (volume_data.year, None),
+            calculated_issue_number,
+        )
+        for (result, volume_data, _, calculated_issue_number), match in zip(
+            results, matches
+        )
+    ]
+
+    return {
+        "extract_filename_data": Benchmark(
+            _extract_filename_data, efd_inputs, clear_filename_data_cache
+        ),
+        "extract_filename_data[real]": Benchmark(
+            _extract_filename_data,
+            [(filename,) for filename in real_filenames],
+            clear_filename_data_cache,
+        ),
+        "file_importing_filter": Benchmark(file_importing_filter, files),
+        "gc_group_filter": Benchmark(gc_group_filter, groups),
+        "check_search_result_match": Benchmark(
+            check_search_result_match, results
+        ),
+        "_rank_search_result": Benchmark(_rank_search_result, ranks),
+    }
+
+
+def run_benchmarks(
+    benchmarks: dict[str, Benchmark],
+    repeats: int,
+    only: Sequence[str] = (),
+) -> dict[str, dict[str, Any]]:
+    """Time every benchmark and measure its allocations.
+
+    Args:
+        benchmarks (Dict[str, Benchmark]): The output of `build_benchmarks()`.
+        repeats (int): Take the fastest of this many runs.
+        only (Sequence[str], optional): Only run the benchmarks with these
+        names. Give an empty sequence for all.
+            Defaults to ().
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Name of the benchmark to its calls, calls per
+        second, mean peak of allocated memory per call in bytes and the
+        outputs.
+    """
+    report: dict[str, dict[str, Any]] = {}
+    for name, benchmark in benchmarks.items():
+        if only and name not in only:
+            continue
+
+        calls = len(benchmark.calls)
+        timings: list[float] = []
+        outputs: list = []
+        for _ in range(repeats):
+            start_time = perf_counter()
+            outputs = benchmark.run()
+            timings.append(perf_counter() - start_time)
+
+        # Measure allocations separately, as tracing slows down the run
+        report[name] = {
+            "calls": calls,
+            "per_second": round(calls / min(timings)),
+            "bytes_per_call": benchmark.allocated_per_call(),
+            "outputs": normalise_outputs(outputs),
+        }
+        print(
+            f"{name:<36}{calls:>8} calls{report[name]['per_second']:>10}/s"
+            f"{report[name]['bytes_per_call']:>10} B/call",
+            flush=True,
+        )
+
+    return report
+
+
+def normalise_outputs(outputs: list) -> list:
+    "Make the outputs JSON compatible, so that they compare after saving"
+    return [_normalise(o) for o in outputs]
+
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalise(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if isinstance(value, SpecialVersion):
+        return value.value
+    return value
+
+
+def load_golden() -> dict[str, list]:
+    """Read the golden outputs.
+
+    Returns:
+        Dict[str, list]: Name of the benchmark to the expected output of each
+        call.
+    """
+    if not isfile(GOLDEN_FILE):
+        return {}
+
+    with open(GOLDEN_FILE) as f:
+        golden: dict[str, Any] = load(f)
+
+    values: list = golden["values"]
+    return {
+        name: [values[i] for i in expected]
+        for name, expected in golden["expected"].items()
+    }
+
+
+def save_golden(golden: dict[str, list]) -> None:
+    """Write the golden outputs. Every distinct output is written once, on its
+    own line, and each call refers to it by index. That keeps the file small
+    and a change in results shows up as a readable diff.
+
+    Args:
+        golden (Dict[str, list]): Name of the benchmark to the expected output
+        of each call.
+    """
+    values: dict[str, int] = {}
+    expected = {
+        name: [
+            values.setdefault(dumps(output, sort_keys=True), len(values))
+            for output in outputs
+        ]
+        for name, outputs in sorted(golden.items())
+    }
+
+    with open(GOLDEN_FILE, "w") as f:
+        f.write('{\n    "values": [\n')
+        f.write(",\n".join(f"        {v}" for v in values))
+        f.write('\n    ],\n    "expected": {\n')
+        f.write(
+            ",\n".join(
+                f"        {dumps(name)}: {dumps(indexes)}"
+                for name, indexes in expected.items()
+            )
+        )
+        f.write("\n    }\n}\n")
+
+
+def check_golden(
+    report: dict[str, dict[str, Any]], inputs: dict[str, list]
+) -> list[str]:
+    """Compare the outputs with the golden outputs.
+
+    Args:
+        report (Dict[str, Dict[str, Any]]): The output of `run_benchmarks()`.
+        inputs (Dict[str, list]): Name of the benchmark to a description of
+        each input, to show when an output differs.
+
+    Returns:
+        List[str]: A description of every difference.
+    """
+    golden = load_golden()
+
+    failures: list[str] = []
+    for name, result in report.items():
+        if name not in golden:
+            failures.append(f"{name}: no golden outputs")
+            continue
+
+        expected = golden[name]
+        if len(expected) != len(result["outputs"]):
+            failures.append(
+                f"{name}: {len(result['outputs'])} outputs instead of "
+                f"{len(expected)}, the corpus changed"
+            )
+            continue
+
+        diffs = [
+            i
+            for i, (exp, act) in enumerate(zip(expected, result["outputs"]))
+            if exp != act
+        ]
+        if diffs:
+            failures.append(f"{name}: {len(diffs)} outputs differ")
+            for i in diffs[:10]:
+                failures.append(
+                    f"    {inputs[name][i]!r}\n"
+                    f"        expected: {expected[i]}\n"
+                    f"        actual:   {result['outputs'][i]}"
+                )
+
+    return failures
+
+
+def compare_reports(
+    report: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    inputs: dict[str, list],
+    tolerance: float,
+) -> list[str]:
+    """Compare the speed and outputs with a saved report.
+
+    Args:
+        report (Dict[str, Dict[str, Any]]): The output of `run_benchmarks()`.
+        baseline (Dict[str, Dict[str, Any]]): A report saved earlier.
+        inputs (Dict[str, list]): Name of the benchmark to a description of
+        each input, to show when an output differs.
+        tolerance (float): How much slower a function is allowed to be, as a
+        fraction.
+
+    Returns:
+        List[str]: A description of every regression.
+    """
+    failures: list[str] = []
+    for name, result in report.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+
+        if result["per_second"] < old["per_second"] * (1 - tolerance):
+            failures.append(
+                f"{name}: {result['per_second']}/s is slower than the "
+                f"baseline of {old['per_second']}/s"
+            )
+
+        diffs = [
+            i
+            for i, (a, b) in enumerate(zip(result["outputs"], old["outputs"]))
+            if a != b
+        ]
+        if len(result["outputs"]) != len(old["outputs"]):
+            failures.append(
+                f"{name}: {len(result['outputs'])} outputs instead of "
+                f"{len(old['outputs'])}"
+            )
+        if diffs:
+            failures.append(f"{name}: {len(diffs)} outputs differ")
+            for i in diffs[:10]:
+                failures.append(
+                    f"    {inputs[name][i]!r}\n"
+                    f"        was: {old['outputs'][i]}\n"
+                    f"        now: {result['outputs'][i]}"
+                )
+
+    return failures
+
+
+def describe_inputs(
+    fixtures: list[Fixture], real_filenames: list[str]
+) -> dict[str, list]:
+    "The input string of every call of every benchmark, in the same order"
+    files = [f for fixture in fixtures for f in fixture.filepaths]
+    titles = [t for fixture in fixtures for t in fixture.titles]
+    efd = [
+        i for fixture in fixtures for i in (*fixture.filepaths, *fixture.titles)
+    ]
+    return {
+        "extract_filename_data": efd,
+        "extract_filename_data[real]": real_filenames,
+        "file_importing_filter": files,
+        "gc_group_filter": titles,
+        "check_search_result_match": titles,
+        "_rank_search_result": titles,
+    }
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        description="Benchmark the parsing and matching of filenames and "
+        "search results"
+    )
+    parser.add_argument(
+        "-r",
+        "--repeats",
+        type=int,
+        default=3,
+        help="Take the fastest of this many runs",
+    )
+    parser.add_argument(
+        "-o",
+        "--only",
+        action="append",
+        default=[],
+        help="Only run this benchmark; can be given multiple times",
+    )
+    parser.add_argument(
+        "--save", metavar="FILE", help="Save the timings and outputs to a file"
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="Fail if slower than or giving different results than a file "
+        "made with --save",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="How much slower is allowed when comparing, as a fraction",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Fail if the results differ from the golden outputs",
+    )
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help="Replace the golden outputs with the current results",
+    )
+    args = parser.parse_args()
+
+    # Searching checks the blocklist, so a database is needed
+    from backend.internals.db import set_db_location, setup_db
+    from backend.internals.server import Server
+
+    with TemporaryDirectory() as db_folder:
+        set_db_location(db_folder)
+        with Server().app.app_context():
+            setup_db()
+
+            fixtures = build_corpus()
+            real_filenames = load_real_filenames()
+            benchmarks = build_benchmarks(fixtures, real_filenames)
+            report = run_benchmarks(benchmarks, args.repeats, args.only)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            dump(report, f)
+
+    if args.update_golden:
+        # Keep the golden outputs of the benchmarks that weren't run
+        golden = load_golden()
+        golden.update(
+            {name: result["outputs"] for name, result in report.items()}
+        )
+        save_golden(golden)
+
+    inputs = describe_inputs(fixtures, real_filenames)
+    failures: list[str] = []
+    if args.check:
+        failures += check_golden(report, inputs)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = load(f)
+        failures += compare_reports(report, baseline, inputs, args.tolerance)
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -74,7 +74,7 @@ export default function IssueSummary({ volumeId, issueId }: IssueSummaryProps) {
         SocketEventHandler<typeof socketEvents.ISSUE_DELETED>
     >(
         (data) => {
-            if (data.issueId === issueId) {
+            if (data.issueIds.includes(issueId)) {
                 refetch();
             }
         },
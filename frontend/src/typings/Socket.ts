@@ -43,7 +43,7 @@ type IssueUpdatedData = CamelCasedPropertiesDeep<{
 
 type IssueDeletedData = CamelCasedPropertiesDeep<{
     volume_id: number;
-    issue_id: number;
+    issue_ids: number[];
 }>;
 
 type VolumeUpdatedData = CamelCasedPropertiesDeep<{
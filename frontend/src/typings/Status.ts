@@ -6,6 +6,15 @@ export interface RawAboutInfo {
     database_version: number;
     database_location: string;
     data_folder: string;
+    comicvine_cache: {
+        hits: number;
+        misses: number;
+        hit_ratio: number;
+        evictions: number;
+        entries: number;
+        size: number;
+        max_size: number;
+    };
 }
 
 export type AboutInfo = CamelCasedProperties<RawAboutInfo>;
@@ -55,6 +55,9 @@ class Constants:
     API_PREFIX = "/api"
     "The URL prefix that all API endpoints bind to"
 
+    COVER_MAX_AGE = 86400  # seconds
+    "Seconds that clients may use a cached volume cover without revalidating"
+
     DB_FOLDER = ("db",)
     "Subfolder of application folder to put database in"
 
@@ -64,6 +67,9 @@ class Constants:
     CV_CACHE_NAME = "cv_cache.sqlite"
     "Name of database file itself"
 
+    CV_RATE_LIMIT_NAME = "cv_rate_limit.sqlite"
+    "Name of the database file in which the usage of the CV API is tracked"
+
     THUMBNAILS_FOLDER_NAME = "thumbnails"
 
     DB_TIMEOUT = 10.0  # seconds
@@ -72,12 +78,111 @@ class Constants:
     DB_MAX_CONCURRENT_CONNECTIONS = 32
     "Maximum allowed database connections to be open at the same time"
 
+    DB_READ_POOL_SIZE = HOSTING_THREADS
+    "Maximum amount of read-only database connections that are kept open"
+
+    DB_WAL_SIZE_LIMIT = 64 * 1024 * 1024  # bytes
+    "Size that the write-ahead log file is truncated to after a checkpoint"
+
+    DB_ANALYSIS_LIMIT = 1000
+    "Amount of rows per index that ANALYZE looks at to build statistics"
+
+    DB_SCAN_BATCH_SIZE = 50
+    """
+    Amount of volumes whose scan results are written to the database
+    in one transaction
+    """
+
+    DB_BUSY_RETRIES = 3
+    """
+    Amount of times a statement is retried when the database is busy, after
+    having already waited on it for `DB_TIMEOUT`
+    """
+
+    DB_BLOB_CHUNK_SIZE = 64 * 1024  # bytes
+    "Size of the chunks in which BLOBs are streamed out of the database"
+
+    DB_PROFILER_SAMPLE_SIZE = 1000
+    """
+    Amount of most recent timings that are kept per statement by the query
+    profiler to calculate percentiles with
+    """
+
+    DB_PROFILER_SLOW_QUERY_COUNT = 100
+    "Amount of most recent slow queries that the query profiler keeps in memory"
+
+    FILENAME_DATA_CACHE_SIZE = 10_000
+    "Maximum amount of results of `extract_filename_data()` that are cached"
+
+    UPDATE_ALL_UNIT_SIZE = 100
+    """
+    Amount of volumes that the Update All task refreshes together, as one unit
+    of work that is retried and resumed as a whole
+    """
+
+    UPDATE_ALL_RETRY_DELAY = 60.0  # seconds
+    """
+    Seconds to wait before retrying a unit of the Update All task that failed
+    the first time. Doubles with every following failure.
+    """
+
+    UPDATE_ALL_MAX_ATTEMPTS = 5
+    "Amount of times a unit of the Update All task is tried before giving up"
+
+    CV_SCRAPE_WORKERS = 5
+    "Amount of CV pages of volumes that are downloaded at the same time"
+
+    FOLDER_WALK_WORKERS = 8
+    """
+    Amount of folders that are listed at the same time when walking a folder
+    tree. Mostly helps for network shares, where every listing is a round trip.
+    """
+
+    FOLDER_WALK_BATCH_SIZE = 500
+    "Amount of walked files that are processed together, e.g. in one query"
+
+    WATCHER_DEBOUNCE = 5.0  # seconds
+    """
+    Seconds without new file system events for a volume folder before the
+    library watcher scans it
+    """
+
+    WATCHER_QUEUE_SIZE = 10_000
+    """
+    Maximum amount of file system events that wait to be processed by the
+    library watcher. When exceeded, all volumes are scanned instead.
+    """
+
+    WATCHER_POLL_INTERVAL = 60.0  # seconds
+    """
+    Seconds between looking for changes in the root folders when they can't be
+    watched natively, and between checking which root folders there are
+    """
+
+    WATCHER_READ_TIMEOUT = 1.0  # seconds
+    "Maximum seconds that the library watcher waits on new events at a time"
+
+    WATCHER_ERROR_BACKOFF = 10.0  # seconds
+    """
+    Seconds that the library watcher waits before watching again after an
+    error. Doubles with every error in a row.
+    """
+
+    WATCHER_MAX_ERROR_BACKOFF = 600.0  # seconds
+    "Maximum seconds that the library watcher waits after an error"
+
     LOGGER_NAME = "Kapowarr"
     "Name of the logger that is used"
 
     LOGGER_FILENAME = "Kapowarr.log"
     "Filename that the logs are put in"
 
+    SLOW_QUERY_LOGGER_NAME = "Kapowarr.slow_queries"
+    "Name of the logger that slow database queries are logged to"
+
+    SLOW_QUERY_LOGGER_FILENAME = "Kapowarr_slow_queries.log"
+    "Filename that the slow database queries are put in"
+
     PASSWORD_REPLACEMENT: str = "********"
     "What passwords are replaced with when shared as a string"
 
@@ -114,8 +219,47 @@ class Constants:
     CV_API_URL = "https://comicvine.gamespot.com/api"
     "The base URL of the ComicVine API"
 
-    CV_BRAKE_TIME = 10.0  # seconds
-    "Average amount of seconds between requests to the CV API"
+    CV_HOURLY_QUOTA = 200
+    "Amount of requests that the CV API allows per resource per hour"
+
+    CV_MIN_REQUEST_INTERVAL = 1.0  # seconds
+    """
+    Minimum amount of seconds between two requests to the CV API, regardless
+    of resource, to not trigger the velocity detection of CV
+    """
+
+    CV_MAX_CONCURRENT_REQUESTS = 5
+    """
+    Maximum amount of requests to the CV API that are in flight at once,
+    across all threads
+    """
+
+    CV_MAX_INTERACTIVE_WAIT = 10.0  # seconds
+    """
+    Maximum amount of seconds that a request to the CV API that a user is
+    waiting on is delayed for the rate limit, before giving up
+    """
+
+    CV_DELTA_REFRESH_MARGIN = 86_400  # 1 day
+    """
+    Amount of seconds that a delta refresh looks further back than the last
+    fetch, because the dates of CV are in its own timezone
+    """
+
+    CV_CACHE_TTLS = {
+        "search": 86_400,  # 1 day
+        "issues": 604_800,  # 1 week
+    }
+    "Amount of seconds that responses of a CV API endpoint stay in the cache"
+
+    CV_CACHE_DEFAULT_TTL = 1_209_600  # 2 weeks
+    "Amount of seconds that responses of other CV API endpoints stay cached"
+
+    CV_CACHE_MAX_SIZE = 100 * 1024 * 1024  # 100MB
+    """
+    Maximum total size in bytes of the cached CV API responses, after which
+    the least recently used responses are evicted
+    """
 
     LIBGEN_SITE_URL = FETCHED_CONSTANTS["libgen_site_url"]
     """
@@ -343,6 +487,23 @@ class DateType(BaseEnum):
     STORE_DATE = "store_date"
 
 
+class DBSynchronous(BaseEnum):
+    "How thoroughly SQLite makes sure that changes have reached the disk"
+
+    OFF = "off"
+    NORMAL = "normal"
+    FULL = "full"
+    EXTRA = "extra"
+
+
+class DBTempStore(BaseEnum):
+    "Where SQLite stores temporary tables and indices"
+
+    DEFAULT = "default"
+    FILE = "file"
+    MEMORY = "memory"
+
+
 class MatchRejections(BaseEnum):
     BLOCKLISTED = "Link is blocklisted"
     ANNUAL = "Annual conflict"
@@ -417,9 +578,7 @@ class LibrarySorting(BaseEnum):
         "issues_downloaded_monitored >= issue_count_monitored, "
         "title, year, volume_number"
     )
-    RECENTLY_RELEASED = (
-        "(SELECT MAX(date) FROM vol_issues) DESC, title, year, volume_number"
-    )
+    RECENTLY_RELEASED = "last_issue_date DESC, title, year, volume_number"
 
 
 class LibraryFilter(BaseEnum):
@@ -644,6 +803,35 @@ class FilenameData(TypedDict):
     is_image_file: bool
 
 
+class FileManifestEntry(TypedDict):
+    filepath: str
+    inode: int
+    size: int
+    mtime: int
+    "Last modification time of the file, in nanoseconds"
+    file_data: FilenameData
+    match_key: str
+    "Hash of the volume data that the file was matched with"
+    issue_ids: list[int]
+    general_file_type: str | None
+
+
+class CVVolumePage(TypedDict):
+    issue_count: int
+    "The issue count shown on the CV page of the volume"
+    etag: str | None
+    last_modified: str | None
+
+
+class UpdateAllUnit(TypedDict):
+    id: int
+    volume_ids: list[int]
+    allow_skipping: bool
+    attempts: int
+    next_attempt: int
+    "Epoch timestamp from which the unit may be tried (again)"
+
+
 class RemoteMappingData(TypedDict):
     id: int
     external_download_client_id: int
@@ -831,6 +1019,32 @@ class IssueData:
         return asdict(self)
 
 
+@dataclass(frozen=True)
+class LibraryEvent:
+    path: str
+    removed: bool
+    "The path was removed or moved away"
+    is_folder: bool
+    "The path is a folder, so everything inside it could have changed"
+
+
+@dataclass
+class VolumeScanResult:
+    volume_id: int
+    partial: bool
+    "Only specific files were scanned, so bindings can only be added"
+    bindings: list[tuple[str, int]]
+    "Filepath and the ID of the issue that it covers"
+    general_bindings: list[tuple[str, str]]
+    "Filepath and the type of general file that it is"
+    file_sizes: dict[str, int]
+    "Filepath to the current size of the file"
+    manifest_updates: list[FileManifestEntry]
+    "Manifest entries of files that are new or changed since the last scan"
+    manifest_deletions: list[str]
+    "Filepaths in the manifest of files that aren't in the folder anymore"
+
+
 @dataclass
 class VolumeData:
     id: int
@@ -3,12 +3,16 @@ Extracting comic data (like series name, issue number, etc.) from a string and
 generalising it. The string can be a filepath, filename, search result title, etc.
 """
 
-from collections.abc import Collection
+from collections.abc import Collection, Mapping
+from functools import lru_cache
 from os.path import basename, dirname, splitext
 from re import IGNORECASE, Pattern, compile
+from types import MappingProxyType
+from typing import Any
 
 from backend.base.definitions import (
     CharConstants,
+    Constants,
     FileConstants,
     FilenameData,
     SpecialVersion,
@@ -365,7 +369,8 @@ def extract_filename_data(
     fix_year: bool = False,
 ) -> FilenameData:
     """Extract comic data from a string and generalise it. The string can be a
-    filepath, filename, search result title, etc.
+    filepath, filename, search result title, etc. The results are cached, see
+    `get_filename_data_cache_stats()`.
 
     ```
     >>> extract_filename_data(
@@ -413,6 +418,61 @@ def extract_filename_data(
     Returns:
         FilenameData: The extracted data.
     """
+    # Always give all arguments positionally, so that they're cached as the
+    # same key
+    return FilenameData(
+        **_extract_filename_data_cached(
+            filepath, assume_volume_number, prefer_folder_year, fix_year
+        )
+    )
+
+
+def get_filename_data_cache_stats() -> dict[str, int]:
+    """Get statistics about the cache of `extract_filename_data()`.
+
+    Returns:
+        Dict[str, int]: The amount of hits and misses, and the current and
+        maximum size.
+    """
+    cache_info = _extract_filename_data_cached.cache_info()
+    return {
+        "hits": cache_info.hits,
+        "misses": cache_info.misses,
+        "size": cache_info.currsize,
+        "max_size": cache_info.maxsize or 0,
+    }
+
+
+def clear_filename_data_cache() -> None:
+    "Empty the cache of `extract_filename_data()` and reset its statistics"
+    _extract_filename_data_cached.cache_clear()
+    return
+
+
+@lru_cache(maxsize=Constants.FILENAME_DATA_CACHE_SIZE)
+def _extract_filename_data_cached(
+    filepath: str,
+    assume_volume_number: bool,
+    prefer_folder_year: bool,
+    fix_year: bool,
+) -> Mapping[str, Any]:
+    """The cached version of `_extract_filename_data()`. The result is
+    read-only, as it's shared between all callers.
+    """
+    return MappingProxyType(
+        _extract_filename_data(
+            filepath, assume_volume_number, prefer_folder_year, fix_year
+        )
+    )
+
+
+def _extract_filename_data(
+    filepath: str,
+    assume_volume_number: bool,
+    prefer_folder_year: bool,
+    fix_year: bool,
+) -> FilenameData:
+    "The uncached version of `extract_filename_data()`"
     LOGGER.debug(f"Extracting filename data: {filepath}")
     # These contain the parts extracted from the string,
     # pre-processed or post-processed
@@ -2,7 +2,8 @@
 Handling folders, files and filenames.
 """
 
-from collections.abc import Iterable, Sequence
+from collections.abc import Generator, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from os import listdir, makedirs, remove, scandir
 from os.path import (
     abspath,
@@ -43,9 +44,15 @@ def folder_path(*folders: str) -> str:
     return join(dirname(dirname(dirname(abspath(__file__)))), *folders)
 
 
-def list_files(folder: str, ext: Iterable[str] = []) -> list[str]:
-    """List all files in a folder recursively with absolute paths. Hidden files
-    (files starting with `.`) are ignored.
+def iter_files(
+    folder: str,
+    ext: Iterable[str] = [],
+    workers: int = Constants.FOLDER_WALK_WORKERS,
+) -> Generator[str]:
+    """Walk a folder recursively and yield the absolute paths of the files in
+    it as they're found. Hidden files (files starting with `.`) are ignored.
+    Multiple folders are listed at the same time, which hides the latency of
+    network shares. The order of the files is not defined.
 
     Args:
         folder (str): The base folder to search through.
@@ -54,34 +61,93 @@ def list_files(folder: str, ext: Iterable[str] = []) -> list[str]:
             Dot-prefix optional. Keep empty to allow all extensions.
             Defaults to [].
 
-    Returns:
-        List[str]: The absolute paths of the files in the folder.
+        workers (int, optional): The maximum amount of folders to list at the
+        same time.
+            Defaults to `Constants.FOLDER_WALK_WORKERS`.
+
+    Raises:
+        NotADirectoryError: `folder` is not a folder.
+
+    Yields:
+        Generator[str]: The absolute paths of the files.
     """
-    files: list[str] = []
+    ext = {force_prefix(e.lower(), ".") for e in ext}
 
-    def _list_files(folder: str, ext: set[str] = set()):
-        """Internal function to add all files in a folder to the files list.
+    def _list_folder(folder: str) -> tuple[list[str], list[str]]:
+        """List the content of one folder.
 
         Args:
-            folder (str): The base folder to search through.
-            ext (Set[str], optional): A set of lowercase dot-prefixed
-                extensions to filter for, or empty for no filter.
-                Defaults to set().
+            folder (str): The folder to list.
+
+        Returns:
+            Tuple[List[str], List[str]]: The sub-folders and the (filtered)
+            files.
         """
-        for f in scandir(folder):
-            if f.is_dir():
-                _list_files(f.path, ext)
+        folders: list[str] = []
+        files: list[str] = []
+        with scandir(folder) as entries:
+            for f in entries:
+                if f.is_dir():
+                    folders.append(f.path)
+
+                elif (
+                    f.is_file()
+                    and not f.name.startswith(".")
+                    and check_filter(splitext(f.name)[1].lower(), ext)
+                ):
+                    files.append(f.path)
+
+        return folders, files
+
+    # Listing the base folder directly makes errors surface on the first
+    # iteration, and avoids the pool for folders without sub-folders
+    folders, files = _list_folder(folder)
+    yield from files
+    if not folders:
+        return
 
-            elif (
-                f.is_file()
-                and not f.name.startswith(".")
-                and check_filter(splitext(f.name)[1].lower(), ext)
-            ):
-                files.append(f.path)
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="FolderWalkerThread"
+    )
+    try:
+        pending: set[Future[tuple[list[str], list[str]]]] = {
+            executor.submit(_list_folder, f) for f in folders
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folders, files = future.result()
+                pending.update(
+                    executor.submit(_list_folder, f) for f in folders
+                )
+                yield from files
+
+    finally:
+        # Don't list the rest of the tree when the caller stops early
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    ext = {force_prefix(e.lower(), ".") for e in ext}
-    _list_files(folder, ext)
-    return list(files)
+    return
+
+
+def list_files(folder: str, ext: Iterable[str] = []) -> list[str]:
+    """List all files in a folder recursively with absolute paths. Hidden files
+    (files starting with `.`) are ignored. See `iter_files()` for processing
+    files while the folder is still being walked.
+
+    Args:
+        folder (str): The base folder to search through.
+
+        ext (Iterable[str], optional): File extensions to only include.
+            Dot-prefix optional. Keep empty to allow all extensions.
+            Defaults to [].
+
+    Raises:
+        NotADirectoryError: `folder` is not a folder.
+
+    Returns:
+        List[str]: The absolute paths of the files in the folder.
+    """
+    return list(iter_files(folder, ext))
 
 
 def get_archive_mimetype(filepath: str) -> str | None:
@@ -4,9 +4,10 @@ Generic functions and classes
 
 from __future__ import annotations
 
+import json
 import time
 from asyncio import sleep
-from base64 import urlsafe_b64encode
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import deque
 from collections.abc import (
     Callable,
@@ -17,7 +18,7 @@ from collections.abc import (
     Sequence,
 )
 from functools import lru_cache
-from hashlib import pbkdf2_hmac
+from hashlib import blake2b, pbkdf2_hmac
 from multiprocessing.pool import Pool
 from os import cpu_count, sep
 from os.path import basename, dirname
@@ -193,6 +194,18 @@ def hash_password(salt: bytes, password: str) -> str:
     ).decode()
 
 
+def hash_blob(blob: bytes | None) -> str:
+    """Hash the contents of a BLOB, e.g. to detect whether it changed.
+
+    Args:
+        blob (Union[bytes, None]): The contents to hash.
+
+    Returns:
+        str: The resulting hash, in hexadecimal form.
+    """
+    return blake2b(blob or b"", digest_size=16).hexdigest()
+
+
 def get_torrent_info(torrent: bytes) -> dict[bytes, Any]:
     """Get the info from the contents of a torrent file.
 
@@ -499,6 +512,55 @@ def to_string_cv_id(ids: Iterable[str | int]) -> list[str]:
     return [str(i) for i in to_number_cv_id(ids)]
 
 
+# region Pagination
+def encode_page_cursor(values: Sequence[int]) -> str:
+    """Create an opaque cursor that points to a position in an ordered list,
+    for keyset pagination.
+
+    Args:
+        values (Sequence[int]): The values of the sort key of the last entry
+        of the current page.
+
+    Returns:
+        str: The cursor.
+    """
+    return (
+        urlsafe_b64encode(json.dumps(list(values)).encode("utf-8"))
+        .decode("utf-8")
+        .rstrip("=")
+    )
+
+
+def decode_page_cursor(cursor: str, length: int) -> list[int]:
+    """Get the values back out of a cursor made by `encode_page_cursor()`.
+
+    Args:
+        cursor (str): The cursor.
+        length (int): The amount of values that the cursor should contain.
+
+    Raises:
+        ValueError: The cursor is invalid.
+
+    Returns:
+        list[int]: The values of the sort key.
+    """
+    try:
+        values = json.loads(
+            urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid page cursor: {cursor}")
+
+    if not (
+        isinstance(values, list)
+        and len(values) == length
+        and all(isinstance(v, int) for v in values)
+    ):
+        raise ValueError(f"Invalid page cursor: {cursor}")
+
+    return values
+
+
 def check_overlapping_issues(
     issues_1: float | tuple[float, float],
     issues_2: float | tuple[float, float],
@@ -49,6 +49,7 @@ class MPRotatingFileHandler(RotatingFileHandler):
 
 
 LOGGER = logging.getLogger(Constants.LOGGER_NAME)
+SLOW_QUERY_LOGGER = logging.getLogger(Constants.SLOW_QUERY_LOGGER_NAME)
 LOGGING_CONFIG: dict = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -91,8 +92,24 @@ LOGGING_CONFIG: dict = {
             "backupCount": 1,
             "do_rollover": True,
         },
+        "slow_query_file": {
+            "()": MPRotatingFileHandler,
+            "level": "DEBUG",
+            "formatter": "detailed",
+            "filename": "",
+            "maxBytes": 1_000_000,
+            "backupCount": 1,
+            "do_rollover": True,
+            "delay": True,
+        },
+    },
+    "loggers": {
+        Constants.LOGGER_NAME: {},
+        Constants.SLOW_QUERY_LOGGER_NAME: {
+            "handlers": ["slow_query_file"],
+            "propagate": False,
+        },
     },
-    "loggers": {Constants.LOGGER_NAME: {}},
     "root": {"level": "INFO", "handlers": ["console", "console_error", "file"]},
 }
 
@@ -143,12 +160,19 @@ def setup_logging(
 
     if log_folder is None:
         LOGGING_CONFIG["handlers"]["file"]["filename"] = folder_path(log_file)
+        LOGGING_CONFIG["handlers"]["slow_query_file"]["filename"] = folder_path(
+            Constants.SLOW_QUERY_LOGGER_FILENAME
+        )
     else:
         LOGGING_CONFIG["handlers"]["file"]["filename"] = join(
             log_folder, log_file
         )
+        LOGGING_CONFIG["handlers"]["slow_query_file"]["filename"] = join(
+            log_folder, Constants.SLOW_QUERY_LOGGER_FILENAME
+        )
 
     LOGGING_CONFIG["handlers"]["file"]["do_rollover"] = do_rollover
+    LOGGING_CONFIG["handlers"]["slow_query_file"]["do_rollover"] = do_rollover
 
     logging.config.dictConfig(LOGGING_CONFIG)
 
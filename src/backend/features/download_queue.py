@@ -28,7 +28,13 @@ from backend.base.definitions import (
     SeedingHandling,
 )
 from backend.base.files import create_folder, delete_file_folder
-from backend.base.helpers import CommaList, Singleton, get_subclasses
+from backend.base.helpers import (
+    CommaList,
+    Singleton,
+    decode_page_cursor,
+    encode_page_cursor,
+    get_subclasses,
+)
 from backend.base.logging import LOGGER
 from backend.features.post_processing import (
     PostProcessor,
@@ -840,7 +846,8 @@ def get_download_history(
     volume_id: int | None = None,
     issue_id: int | None = None,
     offset: int = 0,
-) -> list[dict[str, Any]]:
+    after: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
     """Get the download history in blocks of 50.
 
     Args:
@@ -856,63 +863,79 @@ def get_download_history(
         The higher the number, the deeper into history you go.
             Defaults to 0.
 
+        after (Union[str, None], optional): The cursor returned with the
+        previous block. Get the block after it, instead of using the offset.
+        Doesn't slow down the deeper into history you go.
+            Defaults to None.
+
+    Raises:
+        InvalidKeyValue: The cursor is invalid.
+
     Returns:
-        List[Dict[str, Any]]: The history entries.
+        Tuple[List[Dict[str, Any]], Union[str, None]]: The history entries and
+        the cursor to get the next block with. The cursor is `None` if there
+        are no more entries.
     """
+    filters: list[str] = []
+    params: dict[str, Any] = {
+        "issue_id": issue_id,
+        "volume_id": volume_id,
+        "offset": offset * 50,
+    }
+
     if issue_id is not None:
-        comm = """
-            SELECT
-                web_link, web_title, web_sub_title,
-                file_title,
-                volume_id, issue_id,
-                source, downloaded_at, success
-            FROM download_history
-            WHERE issue_id = :issue_id
-            ORDER BY downloaded_at DESC
-            LIMIT 50
-            OFFSET :offset;
-            """
+        filters.append("issue_id = :issue_id")
 
     elif volume_id is not None:
-        comm = """
-            SELECT
-                web_link, web_title, web_sub_title,
-                file_title,
-                volume_id, issue_id,
-                source, downloaded_at, success
-            FROM download_history
-            WHERE volume_id = :volume_id
-            ORDER BY downloaded_at DESC
-            LIMIT 50
-            OFFSET :offset;
-            """
+        filters.append("volume_id = :volume_id")
 
-    else:
-        comm = """
+    if after is not None:
+        try:
+            params["after_downloaded_at"], params["after_rowid"] = (
+                decode_page_cursor(after, 2)
+            )
+        except ValueError:
+            raise InvalidKeyValue("after", after)
+
+        filters.append(
+            "(downloaded_at, rowid) < (:after_downloaded_at, :after_rowid)"
+        )
+        params["offset"] = 0
+
+    sql_filter = ("WHERE " + " AND ".join(filters)) if filters else ""
+
+    entries = (
+        get_db()
+        .execute(
+            f"""
             SELECT
+                rowid,
                 web_link, web_title, web_sub_title,
                 file_title,
                 volume_id, issue_id,
                 source, downloaded_at, success
             FROM download_history
-            ORDER BY downloaded_at DESC
+            {sql_filter}
+            ORDER BY downloaded_at DESC, rowid DESC
             LIMIT 50
             OFFSET :offset;
-            """
-
-    return (
-        get_db()
-        .execute(
-            comm,
-            {
-                "issue_id": issue_id,
-                "volume_id": volume_id,
-                "offset": offset * 50,
-            },
+            """,
+            params,
         )
         .fetchalldict()
     )
 
+    next_cursor = None
+    if len(entries) == 50:
+        next_cursor = encode_page_cursor(
+            (entries[-1]["downloaded_at"], entries[-1]["rowid"])
+        )
+
+    for entry in entries:
+        del entry["rowid"]
+
+    return entries, next_cursor
+
 
 def get_download_history_total_records(
     volume_id: int | None = None,
@@ -1,5 +1,7 @@
 from asyncio import run
+from collections.abc import Iterator
 from glob import glob
+from itertools import batched as iter_batched
 from itertools import chain
 from os.path import abspath, basename, dirname, isfile, splitext
 from typing import Any
@@ -9,6 +11,7 @@ from backend.base.custom_exceptions import (
     VolumeAlreadyAdded,
 )
 from backend.base.definitions import (
+    Constants,
     CVFileMapping,
     FileConstants,
     FilenameData,
@@ -21,6 +24,7 @@ from backend.base.files import (
     common_folder,
     delete_empty_parent_folders,
     folder_is_inside_folder,
+    iter_files,
     list_files,
     rename_file,
 )
@@ -111,52 +115,62 @@ def propose_library_import(
 
         except NotADirectoryError:
             raise InvalidKeyValue("excluded_folders_str", excluded_folders_str)
-    try:
-        all_files = set(
-            chain.from_iterable(
-                list_files(f, FileConstants.CONTENT_EXTENSIONS)
-                for f in scan_folders
-            )
-        )
 
-    except NotADirectoryError:
-        raise InvalidKeyValue("included_folders_str", included_folders_str)
+    def walk_scan_folders() -> Iterator[str]:
+        seen: set[str] = set()
+        for folder in scan_folders:
+            for f in iter_files(folder, FileConstants.CONTENT_EXTENSIONS):
+                if f not in seen:
+                    seen.add(f)
+                    yield f
 
-    # Get imported files
-    imported_files = {f["filepath"] for f in FilesDB.fetch()}
-
-    # Filter away imported files and apply limit
+    # Filter away imported files and apply limit, while the folders are
+    # still being walked
     folders = set()
     image_folders = set()
     # efd to files with that efd
     unimported_files = DictKeyedDict()
-    for f in all_files:
-        if f in imported_files or f in all_excluded_files:
-            continue
+    try:
+        for files_batch in iter_batched(
+            walk_scan_folders(), Constants.FOLDER_WALK_BATCH_SIZE
+        ):
+            imported_files = {
+                f["filepath"] for f in FilesDB.fetch_many(filepaths=files_batch)
+            }
 
-        d = abspath(dirname(f))
-        if d in root_folders:
-            # File directly in root folder is not allowed
-            continue
+            for f in files_batch:
+                if f in imported_files or f in all_excluded_files:
+                    continue
 
-        efd = extract_filename_data(f, prefer_folder_year=True)
-        del efd["issue_number"]  # pyright: ignore
+                d = abspath(dirname(f))
+                if d in root_folders:
+                    # File directly in root folder is not allowed
+                    continue
 
-        if (
-            f.endswith(FileConstants.IMAGE_EXTENSIONS)
-            and efd["special_version"] != SpecialVersion.COVER
-        ):
-            if d in image_folders:
-                continue
-            image_folders.add(d)
-            d, f = dirname(d), d
+                efd = extract_filename_data(f, prefer_folder_year=True)
+                del efd["issue_number"]  # pyright: ignore
+
+                if (
+                    f.endswith(FileConstants.IMAGE_EXTENSIONS)
+                    and efd["special_version"] != SpecialVersion.COVER
+                ):
+                    if d in image_folders:
+                        continue
+                    image_folders.add(d)
+                    d, f = dirname(d), d
+
+                folders.add(dirname(d) if limit_parent_folder else d)
 
-        folders.add(dirname(d) if limit_parent_folder else d)
+                if len(folders) > limit:
+                    break
 
-        if len(folders) > limit:
-            break
+                unimported_files.setdefault(efd, []).append(f)
 
-        unimported_files.setdefault(efd, []).append(f)
+            if len(folders) > limit:
+                break
+
+    except NotADirectoryError:
+        raise InvalidKeyValue("included_folders_str", included_folders_str)
 
     LOGGER.debug("File groupings: %s", unimported_files)
 
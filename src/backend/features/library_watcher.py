@@ -0,0 +1,559 @@
+"""
+Watching the root folders for changes that are made outside of Kapowarr, and
+scanning the volumes that they affect.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from os import scandir
+from os.path import abspath, dirname, join, splitext
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING
+
+from flask import Flask
+
+from backend.base.definitions import Constants, FileConstants, LibraryEvent
+from backend.base.files import folder_is_inside_folder
+from backend.base.helpers import Singleton
+from backend.base.logging import LOGGER
+from backend.features.tasks import TaskHandler
+from backend.implementations.root_folders import RootFolders
+from backend.implementations.volumes import scan_files
+from backend.internals.db import close_db, get_db
+
+if TYPE_CHECKING:
+    from inotify_simple import INotify, flags
+
+else:
+    try:
+        from inotify_simple import INotify, flags
+
+    except ImportError:
+        INotify = flags = None
+
+SCANNABLE_EXTENSIONS = frozenset(
+    e.lower() for e in FileConstants.SCANNABLE_EXTENSIONS
+)
+
+
+def _is_scannable(path: str) -> bool:
+    return splitext(path)[1].lower() in SCANNABLE_EXTENSIONS
+
+
+# region Backends
+class WatcherBackend(ABC):
+    "A way of finding out about changes to files inside folders"
+
+    name: str
+
+    @abstractmethod
+    def set_folders(self, folders: Collection[str]) -> None:
+        """Watch exactly the given folders, including their subfolders.
+
+        Args:
+            folders (Collection[str]): The folders to watch.
+        """
+        ...
+
+    @abstractmethod
+    def read(self, timeout: float) -> list[LibraryEvent]:
+        """Get the changes since the last call.
+
+        Args:
+            timeout (float): The maximum amount of seconds to wait for changes.
+
+        Returns:
+            List[LibraryEvent]: The changes.
+        """
+        ...
+
+    def close(self) -> None:
+        "Stop watching all folders"
+        return
+
+
+class PollingBackend(WatcherBackend):
+    """Finds changes by regularly listing the files in the folders and
+    comparing them to the previous listing. Works everywhere, but is slow for
+    large libraries.
+    """
+
+    name = "polling"
+
+    def __init__(self) -> None:
+        self.snapshots: dict[str, dict[str, tuple[int, int, int]]] = {}
+        self.next_poll = monotonic() + Constants.WATCHER_POLL_INTERVAL
+        return
+
+    @staticmethod
+    def _snapshot(folder: str) -> dict[str, tuple[int, int, int]]:
+        """Get the inode, size and modification time of all scannable files
+        inside a folder, recursively.
+
+        Args:
+            folder (str): The folder.
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: The filepaths mapped to their
+            inode, size and modification time.
+        """
+        result: dict[str, tuple[int, int, int]] = {}
+        folders = [folder]
+        while folders:
+            try:
+                entries = list(scandir(folders.pop()))
+            except OSError:
+                continue
+
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+
+                try:
+                    if entry.is_dir():
+                        folders.append(entry.path)
+
+                    elif entry.is_file() and _is_scannable(entry.name):
+                        entry_stat = entry.stat()
+                        result[entry.path] = (
+                            entry_stat.st_ino,
+                            entry_stat.st_size,
+                            entry_stat.st_mtime_ns,
+                        )
+
+                except OSError:
+                    continue
+
+        return result
+
+    def set_folders(self, folders: Collection[str]) -> None:
+        for folder in self.snapshots.keys() - set(folders):
+            del self.snapshots[folder]
+
+        for folder in folders:
+            if folder not in self.snapshots:
+                self.snapshots[folder] = self._snapshot(folder)
+        return
+
+    def read(self, timeout: float) -> list[LibraryEvent]:
+        remaining = self.next_poll - monotonic()
+        if remaining > 0:
+            sleep(min(timeout, remaining))
+            return []
+
+        events: list[LibraryEvent] = []
+        for folder, old_snapshot in self.snapshots.items():
+            new_snapshot = self._snapshot(folder)
+            events.extend(
+                LibraryEvent(filepath, True, False)
+                for filepath in old_snapshot.keys() - new_snapshot.keys()
+            )
+            events.extend(
+                LibraryEvent(filepath, False, False)
+                for filepath, file_info in new_snapshot.items()
+                if old_snapshot.get(filepath) != file_info
+            )
+            self.snapshots[folder] = new_snapshot
+
+        self.next_poll = monotonic() + Constants.WATCHER_POLL_INTERVAL
+        return events
+
+
+class InotifyBackend(WatcherBackend):
+    """Gets notified of changes by the Linux kernel, using inotify. Every folder
+    needs a watch of its own, so subfolders are watched as they appear.
+    """
+
+    name = "inotify"
+
+    def __init__(self) -> None:
+        """Setup inotify.
+
+        Raises:
+            OSError: inotify is not available.
+        """
+        if INotify is None:
+            raise OSError("inotify_simple is not installed")
+
+        self.inotify = INotify()
+        self.mask = (
+            flags.CREATE
+            | flags.CLOSE_WRITE
+            | flags.DELETE
+            | flags.MOVED_FROM
+            | flags.MOVED_TO
+            | flags.ONLYDIR
+        )
+        self.root_folders: set[str] = set()
+        self.watches: dict[int, str] = {}
+        return
+
+    def _watch_tree(self, folder: str) -> None:
+        """Watch a folder and all of its subfolders.
+
+        Args:
+            folder (str): The folder.
+        """
+        folders = [folder]
+        while folders:
+            current = folders.pop()
+            try:
+                self.watches[self.inotify.add_watch(current, self.mask)] = (
+                    current
+                )
+                folders.extend(
+                    entry.path
+                    for entry in scandir(current)
+                    if entry.is_dir() and not entry.name.startswith(".")
+                )
+
+            except OSError as e:
+                LOGGER.warning(f"Failed to watch folder {current}: {e}")
+        return
+
+    def _unwatch_tree(self, folder: str) -> None:
+        """Stop watching a folder and all of its subfolders.
+
+        Args:
+            folder (str): The folder.
+        """
+        for wd, path in tuple(self.watches.items()):
+            if folder_is_inside_folder(folder, path):
+                del self.watches[wd]
+                try:
+                    self.inotify.rm_watch(wd)
+                except OSError:
+                    # Folder was already removed
+                    pass
+        return
+
+    def set_folders(self, folders: Collection[str]) -> None:
+        for folder in self.root_folders - set(folders):
+            self._unwatch_tree(folder)
+
+        for folder in set(folders) - self.root_folders:
+            self._watch_tree(folder)
+
+        self.root_folders = set(folders)
+        return
+
+    def read(self, timeout: float) -> list[LibraryEvent]:
+        events: list[LibraryEvent] = []
+        for event in self.inotify.read(timeout=round(timeout * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                # Events were lost, so anything could have changed
+                events.extend(
+                    LibraryEvent(folder, False, True)
+                    for folder in self.root_folders
+                )
+                continue
+
+            if event.mask & flags.IGNORED:
+                self.watches.pop(event.wd, None)
+                continue
+
+            parent = self.watches.get(event.wd)
+            if parent is None:
+                continue
+            path = join(parent, event.name)
+
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    self._watch_tree(path)
+                    events.append(LibraryEvent(path, False, True))
+
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    self._unwatch_tree(path)
+                    events.append(LibraryEvent(path, True, True))
+
+            elif not _is_scannable(path):
+                continue
+
+            elif event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO):
+                # Files that are created are only handled once they're
+                # written, which is also reported when it's done.
+                events.append(LibraryEvent(path, False, False))
+
+            elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                events.append(LibraryEvent(path, True, False))
+
+        return events
+
+    def close(self) -> None:
+        self.inotify.close()
+        return
+
+
+def _get_backend() -> WatcherBackend:
+    """Get the best backend that is available.
+
+    Returns:
+        WatcherBackend: The backend.
+    """
+    try:
+        return InotifyBackend()
+
+    except OSError as e:
+        LOGGER.debug(f"Can't use inotify for watching the library: {e}")
+        return PollingBackend()
+
+
+# region Watcher
+@dataclass
+class _PendingScan:
+    deadline: float
+    full: bool = False
+    "Scan all files in the volume folder instead of only `filepaths`"
+    filepaths: set[str] = field(default_factory=set)
+
+
+class LibraryWatcher(metaclass=Singleton):
+    """Watches the root folders for changes, and scans the volumes whose folder
+    they're in once no more changes come in for `Constants.WATCHER_DEBOUNCE`
+    seconds. Only changed files are scanned, unless files were removed or
+    whole folders changed. Note: Singleton.
+    """
+
+    def __init__(self) -> None:
+        """Setup the watcher"""
+        watcher_context = Flask("watcher")
+        watcher_context.teardown_appcontext(close_db)
+        self.context = watcher_context.app_context
+
+        self.events: Queue[LibraryEvent] = Queue(
+            maxsize=Constants.WATCHER_QUEUE_SIZE
+        )
+        self.overflowed = Event()
+        self.stopped = Event()
+        self.threads: list[Thread] = []
+        return
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self.threads)
+
+    def start(self) -> None:
+        "Start watching the root folders, if not already doing so"
+        if self.running:
+            return
+
+        LOGGER.info("Starting library watcher")
+        self.stopped.clear()
+        backend = _get_backend()
+        LOGGER.debug(f"Watching library using {backend.name}")
+        self.threads = [
+            Thread(
+                target=self.__watch,
+                args=(backend,),
+                name="LibraryWatcherThread",
+            ),
+            Thread(target=self.__process, name="LibraryScanThread"),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return
+
+    def stop(self) -> None:
+        "Stop watching the root folders"
+        if not self.running:
+            return
+
+        LOGGER.info("Stopping library watcher")
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        return
+
+    def __watch(self, backend: WatcherBackend) -> None:
+        """Put the changes that the backend finds in the event queue. After an
+        error, the backend is replaced and watching continues after a back-off.
+
+        Args:
+            backend (WatcherBackend): The backend to get the changes from.
+        """
+        next_folder_check = 0.0
+        errors = 0
+        try:
+            while not self.stopped.is_set():
+                try:
+                    if monotonic() >= next_folder_check:
+                        with self.context():
+                            backend.set_folders(
+                                [
+                                    abspath(rf.folder)
+                                    for rf in RootFolders().get_all()
+                                ]
+                            )
+                        next_folder_check = (
+                            monotonic() + Constants.WATCHER_POLL_INTERVAL
+                        )
+
+                    for event in backend.read(Constants.WATCHER_READ_TIMEOUT):
+                        try:
+                            self.events.put_nowait(event)
+                        except Full:
+                            self.overflowed.set()
+
+                    errors = 0
+
+                except Exception:
+                    errors += 1
+                    backoff = min(
+                        Constants.WATCHER_ERROR_BACKOFF * 2 ** (errors - 1),
+                        Constants.WATCHER_MAX_ERROR_BACKOFF,
+                    )
+                    LOGGER.exception(
+                        "An error occured while watching the library, "
+                        f"retrying in {backoff:.0f} seconds: "
+                    )
+                    if self.stopped.wait(backoff):
+                        break
+
+                    # Changes might have been missed, so scan everything
+                    self.overflowed.set()
+                    backend.close()
+                    backend = _get_backend()
+                    next_folder_check = 0.0
+
+        finally:
+            backend.close()
+
+        return
+
+    @staticmethod
+    def _volumes_of_event(
+        event: LibraryEvent, volume_folders: dict[str, int]
+    ) -> set[int]:
+        """Find the volumes that are affected by a change.
+
+        Args:
+            event (LibraryEvent): The change.
+            volume_folders (Dict[str, int]): The folders of all volumes mapped
+            to their ID.
+
+        Returns:
+            Set[int]: The IDs of the affected volumes.
+        """
+        result: set[int] = set()
+
+        # The volume that the path is in
+        path = event.path
+        while True:
+            if path in volume_folders:
+                result.add(volume_folders[path])
+                break
+
+            parent = dirname(path)
+            if parent == path:
+                break
+            path = parent
+
+        if event.is_folder:
+            # The volumes that are inside the folder
+            result.update(
+                volume_id
+                for folder, volume_id in volume_folders.items()
+                if folder_is_inside_folder(event.path, folder)
+            )
+
+        return result
+
+    def __queue_scans(
+        self, events: list[LibraryEvent], pending: dict[int, _PendingScan]
+    ) -> None:
+        """Register the volumes that are affected by the changes to be scanned,
+        or postpone their scan if they were already registered.
+
+        Args:
+            events (List[LibraryEvent]): The changes.
+            pending (Dict[int, _PendingScan]): The registered volumes.
+        """
+        with self.context():
+            volume_folders: dict[str, int] = {
+                abspath(folder): volume_id
+                for volume_id, folder in get_db().execute(
+                    "SELECT id, folder FROM volumes;"
+                )
+            }
+
+        deadline = monotonic() + Constants.WATCHER_DEBOUNCE
+        if self.overflowed.is_set():
+            LOGGER.warning(
+                "Lost track of the changes in the library, scanning all volumes"
+            )
+            self.overflowed.clear()
+            for volume_id in volume_folders.values():
+                pending[volume_id] = _PendingScan(deadline, full=True)
+
+        for event in events:
+            for volume_id in self._volumes_of_event(event, volume_folders):
+                scan = pending.setdefault(volume_id, _PendingScan(deadline))
+                scan.deadline = deadline
+                if event.removed or event.is_folder:
+                    scan.full = True
+                else:
+                    scan.filepaths.add(event.path)
+        return
+
+    def __process(self) -> None:
+        "Scan the volumes that are affected by the changes in the event queue"
+        pending: dict[int, _PendingScan] = {}
+        while not self.stopped.is_set():
+            timeout = Constants.WATCHER_READ_TIMEOUT
+            if pending:
+                timeout = min(
+                    timeout,
+                    max(
+                        0.0,
+                        min(s.deadline for s in pending.values()) - monotonic(),
+                    ),
+                )
+
+            events: list[LibraryEvent] = []
+            try:
+                events.append(self.events.get(timeout=timeout))
+                while True:
+                    events.append(self.events.get_nowait())
+            except Empty:
+                pass
+
+            try:
+                if events or self.overflowed.is_set():
+                    self.__queue_scans(events, pending)
+
+                now = monotonic()
+                for volume_id, scan in tuple(pending.items()):
+                    if scan.deadline > now:
+                        continue
+
+                    if TaskHandler.task_for_volume_running(volume_id):
+                        # Task will most likely scan the volume already
+                        scan.deadline = now + Constants.WATCHER_DEBOUNCE
+                        continue
+
+                    del pending[volume_id]
+                    LOGGER.debug(
+                        f"Scanning volume {volume_id} because of changes in "
+                        f"the library: {'all' if scan.full else scan.filepaths}"
+                    )
+                    with self.context():
+                        scan_files(
+                            volume_id,
+                            filepath_filter=(
+                                [] if scan.full else sorted(scan.filepaths)
+                            ),
+                            update_websocket=True,
+                        )
+
+            except Exception:
+                LOGGER.exception(
+                    "An error occured while processing changes in the library: "
+                )
+
+        return
@@ -16,7 +16,6 @@ from backend.base.file_extraction import extract_filename_data
 from backend.base.helpers import (
     AsyncSession,
     check_overlapping_issues,
-    extract_year_from_date,
     force_range,
     get_subclasses,
 )
@@ -382,11 +381,7 @@ def manual_search(
     """
     volume = Volume(volume_id)
     volume_data = volume.get_data()
-    volume_issues = volume.get_issues()
-    number_to_year: dict[float, int | None] = {
-        i.calculated_issue_number: extract_year_from_date(i.date)
-        for i in volume_issues
-    }
+    issue_index = volume.get_issue_index()
     issue_number: str | None = None
     calculated_issue_number: float | None = None
 
@@ -474,8 +469,7 @@ def manual_search(
             match_data = check_search_result_match(
                 result,
                 volume_data,
-                volume_issues,
-                number_to_year,
+                issue_index,
                 calculated_issue_number,
             )
             results.append(
@@ -489,7 +483,9 @@ def manual_search(
                         volume_data.volume_number,
                         (
                             volume_data.year,
-                            number_to_year.get(calculated_issue_number or 0),
+                            issue_index.number_to_year.get(
+                                calculated_issue_number or 0
+                            ),
                         ),
                         calculated_issue_number,
                     ),
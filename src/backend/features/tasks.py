@@ -12,19 +12,39 @@ from typing import Any
 from flask import Flask
 
 from backend.base.custom_exceptions import (
+    CVRateLimitReached,
     InvalidComicVineApiKey,
+    InvalidKeyValue,
     TaskNotDeletable,
     TaskNotFound,
 )
-from backend.base.definitions import SearchResultData
-from backend.base.helpers import Singleton, get_subclasses
+from backend.base.definitions import Constants, SearchResultData
+from backend.base.helpers import (
+    Singleton,
+    batched,
+    decode_page_cursor,
+    encode_page_cursor,
+    get_subclasses,
+)
 from backend.base.logging import LOGGER
 from backend.features.download_queue import DownloadHandler
 from backend.features.search import auto_search
 from backend.implementations.conversion import mass_convert
 from backend.implementations.naming import mass_rename
-from backend.implementations.volumes import Issue, Volume, refresh_and_scan
-from backend.internals.db import close_db, get_db
+from backend.implementations.volumes import (
+    Issue,
+    Volume,
+    finish_library_scan,
+    get_volumes_to_refresh,
+    refresh_and_scan,
+)
+from backend.internals.db import (
+    close_db,
+    commit,
+    get_db,
+    run_db_maintenance,
+)
+from backend.internals.db_models import UpdateAllUnitsDB
 from backend.internals.server import WebSocket
 
 
@@ -441,7 +461,8 @@ class UpdateAll(Task):
     def __init__(
         self, allow_skipping: bool = False, called_from: str = ""
     ) -> None:
-        """Create the task
+        """Create the task. If a previous run was interrupted, it's continued
+        instead, with the value of `allow_skipping` that it was started with.
 
         Args:
             allow_skipping (bool, optional): Skip volumes that have been updated in the last 24 hours.
@@ -452,18 +473,120 @@ class UpdateAll(Task):
         return
 
     def run(self) -> None:
+        ws = WebSocket()
+
+        # The volumes are refreshed in units, of which the progress is stored
+        # so that a run can be resumed after a restart or rate limit.
+        units = UpdateAllUnitsDB.fetch_pending()
+        if units:
+            LOGGER.info("Resuming the update of all volumes")
+        else:
+            UpdateAllUnitsDB.create(
+                batched(
+                    get_volumes_to_refresh(self.allow_skipping),
+                    Constants.UPDATE_ALL_UNIT_SIZE,
+                ),
+                self.allow_skipping,
+            )
+            commit()
+            units = UpdateAllUnitsDB.fetch_pending()
+
+        total_count = UpdateAllUnitsDB.count_pending_volumes()
+        refreshed_count = 0
+        start_time = time()
+
         self.message = "Updating info on all volumes"
-        WebSocket().update_task_status(self)
+        ws.update_task_status(self)
 
-        try:
-            refresh_and_scan(
-                update_websocket=True, allow_skipping=self.allow_skipping
+        while units:
+            if self.stop:
+                # Continued on the next run
+                return
+
+            unit = units[0]
+            if unit["next_attempt"] > time():
+                self.message = (
+                    "Waiting "
+                    f"{round(unit['next_attempt'] - time())}s before "
+                    "retrying to update volumes"
+                )
+                ws.update_task_status(self)
+                while not self.stop and unit["next_attempt"] > time():
+                    sleep(1)
+                continue
+
+            try:
+                refresh_and_scan(
+                    update_websocket=True,
+                    allow_skipping=unit["allow_skipping"],
+                    volume_ids=unit["volume_ids"],
+                )
+                UpdateAllUnitsDB.mark_done(unit["id"])
+                refreshed_count += len(unit["volume_ids"])
+
+            except InvalidComicVineApiKey:
+                return
+
+            except Exception as e:
+                if not isinstance(e, CVRateLimitReached):
+                    LOGGER.exception(
+                        "An error occured while updating volumes %s: ",
+                        unit["volume_ids"],
+                    )
+                UpdateAllUnitsDB.mark_failed(
+                    unit["id"],
+                    round(
+                        time()
+                        + Constants.UPDATE_ALL_RETRY_DELAY
+                        * 2 ** unit["attempts"]
+                    ),
+                )
+
+            commit()
+            units = UpdateAllUnitsDB.fetch_pending()
+
+            self.message = self._progress_message(
+                refreshed_count, total_count, time() - start_time
+            )
+            ws.update_task_status(self)
+
+        failed_count = UpdateAllUnitsDB.count_failed()
+        if failed_count:
+            LOGGER.warning(
+                f"Gave up on updating {failed_count} batches of volumes after "
+                f"{Constants.UPDATE_ALL_MAX_ATTEMPTS} attempts"
             )
-        except InvalidComicVineApiKey:
-            pass
 
+        finish_library_scan()
+        UpdateAllUnitsDB.clear()
+        commit()
         return
 
+    @staticmethod
+    def _progress_message(
+        refreshed_count: int, total_count: int, elapsed: float
+    ) -> str:
+        """Describe the progress of the task.
+
+        Args:
+            refreshed_count (int): The amount of volumes refreshed in this run.
+            total_count (int): The amount of volumes to refresh in this run.
+            elapsed (float): The seconds since the start of this run.
+
+        Returns:
+            str: The message.
+        """
+        message = f"Updated info on {refreshed_count}/{total_count} volumes"
+        if not refreshed_count or elapsed <= 0:
+            return message
+
+        per_minute = refreshed_count / elapsed * 60
+        minutes_left = round((total_count - refreshed_count) / per_minute)
+        return (
+            message + f" ({per_minute:.0f}/min, "
+            f"{minutes_left // 60}h {minutes_left % 60}m left)"
+        )
+
 
 class SearchAll(Task):
     "Trigger an automatic search for each volume in the library"
@@ -503,6 +626,43 @@ class SearchAll(Task):
         return downloads
 
 
+class DatabaseMaintenance(Task):
+    """Keep the database fast and small: update the statistics of the query
+    planner, reclaim unused space and truncate the write-ahead log"""
+
+    stop = False
+    message = ""
+    action = "database_maintenance"
+    display_title = "Database Maintenance"
+    category = ""
+
+    @property
+    def volume_id(self) -> None:
+        return None
+
+    @property
+    def issue_id(self) -> None:
+        return None
+
+    def __init__(self, called_from: str = "") -> None:
+        self._called_from = called_from
+        return
+
+    def run(self) -> None:
+        self.message = "Performing database maintenance"
+        WebSocket().update_task_status(self)
+
+        reclaimed, duration = run_db_maintenance()
+
+        self.message = (
+            f"Reclaimed {round(reclaimed / 1_048_576, 2)} MiB "
+            f"in {round(duration, 2)} seconds"
+        )
+        WebSocket().update_task_status(self)
+        LOGGER.info(f"Database maintenance: {self.message}")
+        return
+
+
 # =====================
 # Task handling
 # =====================
@@ -678,6 +838,13 @@ class TaskHandler(metaclass=Singleton):
         self.task_interval_waiter.start()
         return
 
+    def resume_tasks(self) -> None:
+        "Add tasks that were interrupted by a shutdown back to the queue"
+        with self.context():
+            if UpdateAllUnitsDB.fetch_pending():
+                self.add(UpdateAll())
+        return
+
     def stop_handle(self) -> None:
         "Stop the task handler"
         LOGGER.debug("Stopping task thread")
@@ -763,7 +930,9 @@ class TaskHandler(metaclass=Singleton):
         return
 
 
-def get_task_history(offset: int = 0) -> list[dict]:
+def get_task_history(
+    offset: int = 0, after: str | None = None
+) -> tuple[list[dict], str | None]:
     """Get the task history in blocks of 50.
 
     Args:
@@ -772,25 +941,64 @@ def get_task_history(offset: int = 0) -> list[dict]:
 
             Defaults to 0.
 
+        after (Union[str, None], optional): The cursor returned with the
+            previous block. Get the block after it, instead of using the
+            offset. Doesn't slow down the deeper into history you go.
+
+            Defaults to None.
+
+    Raises:
+        InvalidKeyValue: The cursor is invalid.
+
     Returns:
-        List[dict]: The history entries.
+        Tuple[List[dict], Union[str, None]]: The history entries and the cursor
+        to get the next block with. The cursor is `None` if there are no
+        more entries.
     """
+    if after is None:
+        sql_filter = ""
+        params: dict[str, Any] = {"offset": offset * 50}
+
+    else:
+        try:
+            after_run_at, after_rowid = decode_page_cursor(after, 2)
+        except ValueError:
+            raise InvalidKeyValue("after", after)
+
+        sql_filter = "WHERE (run_at, rowid) < (:after_run_at, :after_rowid)"
+        params = {
+            "offset": 0,
+            "after_run_at": after_run_at,
+            "after_rowid": after_rowid,
+        }
+
     result = (
         get_db()
         .execute(
-            """
+            f"""
         SELECT
-            task_name, display_title, run_at
+            rowid, task_name, display_title, run_at
         FROM task_history
-        ORDER BY run_at DESC
+        {sql_filter}
+        ORDER BY run_at DESC, rowid DESC
         LIMIT 50
-        OFFSET ?;
+        OFFSET :offset;
         """,
-            (offset * 50,),
+            params,
         )
         .fetchalldict()
     )
-    return result
+
+    next_cursor = None
+    if len(result) == 50:
+        next_cursor = encode_page_cursor(
+            (result[-1]["run_at"], result[-1]["rowid"])
+        )
+
+    for entry in result:
+        del entry["rowid"]
+
+    return result, next_cursor
 
 
 def delete_task_history() -> None:
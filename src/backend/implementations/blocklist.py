@@ -1,6 +1,9 @@
 from time import time
 
-from backend.base.custom_exceptions import BlocklistEntryNotFound
+from backend.base.custom_exceptions import (
+    BlocklistEntryNotFound,
+    InvalidKeyValue,
+)
 from backend.base.definitions import (
     BlocklistEntry,
     BlocklistReason,
@@ -8,12 +11,15 @@ from backend.base.definitions import (
     DownloadSource,
     GCDownloadSource,
 )
+from backend.base.helpers import decode_page_cursor, encode_page_cursor
 from backend.base.logging import LOGGER
 from backend.internals.db import get_db
 
 
 # region Get
-def get_blocklist(offset: int = 0) -> list[BlocklistEntry]:
+def get_blocklist(
+    offset: int = 0, after: str | None = None
+) -> tuple[list[BlocklistEntry], str | None]:
     """Get the blocklist entries in blocks of 50.
 
     Args:
@@ -22,24 +28,49 @@ def get_blocklist(offset: int = 0) -> list[BlocklistEntry]:
 
             Defaults to 0.
 
+        after (Union[str, None], optional): The cursor returned with the
+            previous block. Get the block after it, instead of using the
+            offset. Doesn't slow down the deeper into the list you go.
+
+            Defaults to None.
+
+    Raises:
+        InvalidKeyValue: The cursor is invalid.
+
     Returns:
-        List[BlocklistEntry]: A list of the current entries in the blocklist.
+        Tuple[List[BlocklistEntry], Union[str, None]]: A list of the current
+        entries in the blocklist and the cursor to get the next block with.
+        The cursor is `None` if there are no more entries.
     """
+    if after is None:
+        sql_filter = ""
+        params: dict[str, int] = {"offset": offset * 50}
+
+    else:
+        try:
+            (after_id,) = decode_page_cursor(after, 1)
+        except ValueError:
+            raise InvalidKeyValue("after", after)
+
+        sql_filter = "WHERE id < :after_id"
+        params = {"offset": 0, "after_id": after_id}
+
     entries = (
         get_db()
         .execute(
-            """
+            f"""
         SELECT
             id, volume_id, issue_id,
             web_link, web_title, web_sub_title,
             download_link, source,
             reason, added_at
         FROM blocklist
+        {sql_filter}
         ORDER BY id DESC
         LIMIT 50
-        OFFSET ?;
+        OFFSET :offset;
         """,
-            (offset * 50,),
+            params,
         )
         .fetchalldict()
     )
@@ -56,7 +87,11 @@ def get_blocklist(offset: int = 0) -> list[BlocklistEntry]:
         for entry in entries
     ]
 
-    return result
+    next_cursor = None
+    if len(result) == 50:
+        next_cursor = encode_page_cursor((result[-1].id,))
+
+    return result, next_cursor
 
 
 def get_blocklist_total_records() -> int:
@@ -2,12 +2,29 @@
 Search for volumes/issues and fetch metadata for them on ComicVine
 """
 
-from asyncio import gather, run, sleep
-from collections.abc import Sequence
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Future,
+    gather,
+    get_running_loop,
+    run,
+    sleep,
+    to_thread,
+)
+from collections import deque
+from collections.abc import Mapping, Sequence
+from contextlib import closing
+from datetime import UTC, datetime
+from json import dumps, loads
+from math import ceil, floor
 from os.path import dirname, join
-from pathlib import Path
 from re import IGNORECASE, compile
+from sqlite3 import Connection, connect
+from threading import Lock
+from time import time
 from typing import Any
+from urllib.parse import urlencode, urlparse
 
 from aiohttp.client_exceptions import ClientError
 from bs4 import BeautifulSoup, Tag
@@ -15,11 +32,8 @@ from simyan.comicvine import (
     AuthenticationError,
     BasicIssue,
     BasicVolume,
-    Comicvine,
-    ComicvineResource,
     Issue,
     ServiceError,
-    SQLiteCache,
     Volume,
 )
 
@@ -47,6 +61,7 @@ from backend.base.helpers import (
     AsyncSession,
     DictKeyedDict,
     batched,
+    first_of_subarrays,
     force_range,
     normalise_string,
     to_number_cv_id,
@@ -147,6 +162,786 @@ def _clean_description(description: str, short: bool = False) -> str:
     return result
 
 
+def _get_db_file(name: str) -> str:
+    """Get the location of a database file that is placed at the same place
+    as the Kapowarr database.
+
+    Args:
+        name (str): The filename of the database file.
+
+    Returns:
+        str: The filepath.
+    """
+    return join(
+        dirname(DBConnection.file) or folder_path(*Constants.DB_FOLDER), name
+    )
+
+
+class CVRateLimiter:
+    """Paces the requests to the CV API according to its rate limits, across
+    all threads and processes. CV allows a certain amount of requests per
+    resource per hour and dislikes requests in rapid succession. Both are
+    modelled as token buckets that are stored in a separate database file
+    next to the Kapowarr database, so that every connection shares the same
+    budget. A request debits a token of its resource bucket and of the global
+    bucket, and is delayed until both buckets would have been refilled enough
+    to afford it. The methods block on the database, so async code should run
+    them in a thread.
+    """
+
+    velocity_key = "_velocity"
+    "Name of the bucket that enforces the minimum interval between requests"
+
+    @staticmethod
+    def _buckets(resource: str) -> tuple[tuple[str, float, float], ...]:
+        """Get the buckets that a request to a resource debits.
+
+        Args:
+            resource (str): The resource that is requested.
+
+        Returns:
+            Tuple[Tuple[str, float, float], ...]: Per bucket its name, its
+            capacity and its refill rate in tokens per second.
+        """
+        return (
+            (
+                resource,
+                Constants.CV_HOURLY_QUOTA,
+                Constants.CV_HOURLY_QUOTA / 3600,
+            ),
+            (
+                CVRateLimiter.velocity_key,
+                1,
+                1 / Constants.CV_MIN_REQUEST_INTERVAL,
+            ),
+        )
+
+    @staticmethod
+    def _connect() -> Connection:
+        """Open a connection to the database file of the buckets.
+
+        Returns:
+            Connection: The connection, in autocommit mode.
+        """
+        conn = connect(
+            _get_db_file(Constants.CV_RATE_LIMIT_NAME),
+            timeout=Constants.DB_TIMEOUT,
+            isolation_level=None,
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets(
+                resource VARCHAR(255) PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        return conn
+
+    @staticmethod
+    def get_resource(url: str) -> str:
+        """Get the resource that a URL of the CV API belongs to.
+
+        Args:
+            url (str): The URL of the API endpoint.
+
+        Returns:
+            str: The resource (e.g. `volumes` or `issue`).
+        """
+        parts = urlparse(url).path.strip("/").split("/")
+        if len(parts) < 2:
+            return "comicvine"
+        return parts[1]
+
+    @staticmethod
+    def reserve(resource: str, max_wait: float | None = None) -> float:
+        """Take a token for a request to a resource, even when the budget is
+        already used up. The request is then scheduled at the moment that
+        the budget allows it.
+
+        Args:
+            resource (str): The resource that will be requested.
+
+            max_wait (Union[float, None], optional): The maximum amount of
+            seconds that the request may be delayed. If it would be delayed
+            longer, no token is taken. `None` for no maximum.
+                Defaults to None.
+
+        Raises:
+            CVRateLimitReached: The request would be delayed longer than
+            `max_wait`.
+
+        Returns:
+            float: The amount of seconds to wait before doing the request.
+        """
+        now = time()
+        wait_time = 0.0
+        with closing(CVRateLimiter._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                for key, capacity, rate in CVRateLimiter._buckets(resource):
+                    bucket = conn.execute(
+                        "SELECT tokens, updated_at FROM buckets WHERE resource = ?;",
+                        (key,),
+                    ).fetchone()
+                    tokens = capacity
+                    if bucket is not None:
+                        tokens = min(
+                            capacity, bucket[0] + (now - bucket[1]) * rate
+                        )
+
+                    tokens -= 1
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?);",
+                        (key, tokens, now),
+                    )
+                    wait_time = max(wait_time, -tokens / rate)
+
+                if max_wait is not None and wait_time > max_wait:
+                    raise CVRateLimitReached
+
+                conn.execute("COMMIT;")
+
+            except BaseException:
+                conn.execute("ROLLBACK;")
+                raise
+
+        return wait_time
+
+    @staticmethod
+    def exhaust(resource: str) -> None:
+        """Mark the budget of a resource as used up, for when CV reports that
+        the rate limit is reached even though the buckets didn't expect it.
+
+        Args:
+            resource (str): The resource that CV refused.
+        """
+        with closing(CVRateLimiter._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO buckets VALUES (?, 0.0, ?)
+                ON CONFLICT(resource) DO UPDATE
+                SET
+                    tokens = MIN(tokens, 0.0),
+                    updated_at = excluded.updated_at;
+                """,
+                (resource, time()),
+            )
+        return
+
+    @staticmethod
+    def get_budget() -> dict[str, Any]:
+        """Get the remaining budget of the CV API.
+
+        Returns:
+            Dict[str, Any]: The hourly quota per resource, and per resource
+            that has been used recently the amount of requests that can still
+            be made and the seconds until the budget is full again.
+        """
+        capacity = Constants.CV_HOURLY_QUOTA
+        rate = capacity / 3600
+        now = time()
+
+        with closing(CVRateLimiter._connect()) as conn:
+            buckets = conn.execute(
+                "SELECT resource, tokens, updated_at FROM buckets WHERE resource != ?;",
+                (CVRateLimiter.velocity_key,),
+            ).fetchall()
+
+        resources = {}
+        for resource, tokens, updated_at in buckets:
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens >= capacity:
+                continue
+            resources[resource] = {
+                "remaining": max(0, floor(tokens)),
+                "full_in": round((capacity - tokens) / rate),
+            }
+
+        return {"hourly_quota": capacity, "resources": resources}
+
+
+class CVRequestSlots:
+    """Limits the amount of requests to the CV API that are in flight at the
+    same time to `Constants.CV_MAX_CONCURRENT_REQUESTS`, across all sessions,
+    event loops and threads. A freed slot is handed to the request that has
+    been waiting the longest.
+    """
+
+    _lock = Lock()
+    _in_use = 0
+    _waiters: deque[tuple[AbstractEventLoop, Future[None]]] = deque()
+
+    @classmethod
+    async def acquire(cls) -> None:
+        "Wait for a free slot and take it"
+        with cls._lock:
+            if (
+                not cls._waiters
+                and cls._in_use < Constants.CV_MAX_CONCURRENT_REQUESTS
+            ):
+                cls._in_use += 1
+                return
+
+            loop = get_running_loop()
+            waiter = (loop, loop.create_future())
+            cls._waiters.append(waiter)
+
+        try:
+            await waiter[1]
+
+        except CancelledError:
+            with cls._lock:
+                handed_over = waiter not in cls._waiters
+                if not handed_over:
+                    cls._waiters.remove(waiter)
+
+            if handed_over:
+                # The slot was handed to us already, so pass it on
+                cls.release()
+            raise
+
+        return
+
+    @classmethod
+    def release(cls) -> None:
+        "Give back a slot"
+        with cls._lock:
+            while cls._waiters:
+                loop, future = cls._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(cls.__wake, future)
+                    return
+                except RuntimeError:
+                    # Event loop of the waiter is closed
+                    continue
+
+            cls._in_use -= 1
+        return
+
+    @staticmethod
+    def __wake(future: Future[None]) -> None:
+        if not future.done():
+            future.set_result(None)
+        return
+
+
+class CVCache:
+    """Cache of the responses of the CV API, stored in a separate database
+    file next to the Kapowarr database. The endpoint and the CV ID's that a
+    response is about are stored in indexed columns, so that the responses
+    about a volume can be invalidated with one query. Responses expire after
+    the TTL of their endpoint (`Constants.CV_CACHE_TTLS`) and the least
+    recently used responses are evicted when the cache grows beyond
+    `Constants.CV_CACHE_MAX_SIZE`.
+    """
+
+    _lock = Lock()
+    _initialised_files: set[str] = set()
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @staticmethod
+    def _ttl(endpoint: str) -> int:
+        """Get the amount of seconds that responses of an endpoint are valid.
+
+        Args:
+            endpoint (str): The endpoint (e.g. `issues`).
+
+        Returns:
+            int: The TTL in seconds.
+        """
+        return Constants.CV_CACHE_TTLS.get(
+            endpoint, Constants.CV_CACHE_DEFAULT_TTL
+        )
+
+    @classmethod
+    def _connect(cls) -> Connection:
+        """Open a connection to the database file of the cache. The first
+        time in this process, the tables are created and the expired
+        responses are removed.
+
+        Returns:
+            Connection: The connection, in autocommit mode.
+        """
+        file = _get_db_file(Constants.CV_CACHE_NAME)
+        conn = connect(file, timeout=Constants.DB_TIMEOUT, isolation_level=None)
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+        with cls._lock:
+            if file in cls._initialised_files:
+                return conn
+            cls._initialised_files.add(file)
+
+        conn.executescript("""
+            DROP TABLE IF EXISTS cache;
+            DROP TABLE IF EXISTS queries;
+
+            CREATE TABLE IF NOT EXISTS responses(
+                query TEXT PRIMARY KEY,
+                endpoint VARCHAR(255) NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed_at_index
+                ON responses(accessed_at);
+            CREATE INDEX IF NOT EXISTS responses_endpoint_created_at_index
+                ON responses(endpoint, created_at);
+
+            CREATE TABLE IF NOT EXISTS response_ids(
+                endpoint VARCHAR(255) NOT NULL,
+                cv_id INTEGER NOT NULL,
+                query TEXT NOT NULL,
+
+                FOREIGN KEY (query) REFERENCES responses(query)
+                    ON DELETE CASCADE,
+                PRIMARY KEY (endpoint, cv_id, query)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS response_ids_query_index
+                ON response_ids(query);
+        """)
+
+        now = time()
+        for endpoint in (
+            *Constants.CV_CACHE_TTLS,
+            *first_of_subarrays(
+                conn.execute(
+                    "SELECT DISTINCT endpoint FROM responses;"
+                ).fetchall()
+            ),
+        ):
+            conn.execute(
+                "DELETE FROM responses WHERE endpoint = ? AND created_at < ?;",
+                (endpoint, now - cls._ttl(endpoint)),
+            )
+
+        return conn
+
+    @classmethod
+    def select(cls, query: str, endpoint: str) -> dict[str, Any] | None:
+        """Get a response from the cache.
+
+        Args:
+            query (str): The key of the response.
+            endpoint (str): The endpoint that the response is of.
+
+        Returns:
+            Union[Dict[str, Any], None]: The response, or `None` if it isn't
+            cached or has expired.
+        """
+        now = time()
+        with closing(cls._connect()) as conn:
+            response = conn.execute(
+                """
+                UPDATE responses
+                SET accessed_at = ?
+                WHERE query = ? AND created_at >= ?
+                RETURNING response;
+                """,
+                (now, query, now - cls._ttl(endpoint)),
+            ).fetchone()
+
+        with cls._lock:
+            if response is None:
+                cls.misses += 1
+            else:
+                cls.hits += 1
+
+        if response is None:
+            return None
+        return loads(response[0])
+
+    @classmethod
+    def insert(
+        cls,
+        query: str,
+        endpoint: str,
+        cv_ids: Sequence[int],
+        response: dict[str, Any],
+    ) -> None:
+        """Add a response to the cache, evicting the least recently used
+        responses if the cache grows too big.
+
+        Args:
+            query (str): The key of the response.
+            endpoint (str): The endpoint that the response is of.
+            cv_ids (Sequence[int]): The CV ID's that the response is about.
+            response (Dict[str, Any]): The response.
+        """
+        now = time()
+        data = dumps(response)
+
+        with closing(cls._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                conn.execute("DELETE FROM responses WHERE query = ?;", (query,))
+                conn.execute(
+                    "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?);",
+                    (query, endpoint, data, len(data), now, now),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO response_ids VALUES (?, ?, ?);",
+                    ((endpoint, cv_id, query) for cv_id in cv_ids),
+                )
+
+                evicted = conn.execute(
+                    """
+                    DELETE FROM responses
+                    WHERE query IN (
+                        SELECT query
+                        FROM (
+                            SELECT
+                                query,
+                                SUM(size) OVER (
+                                    ORDER BY accessed_at DESC
+                                ) AS total_size
+                            FROM responses
+                        )
+                        WHERE total_size > ?
+                    );
+                    """,
+                    (Constants.CV_CACHE_MAX_SIZE,),
+                ).rowcount
+
+                conn.execute("COMMIT;")
+
+            except BaseException:
+                conn.execute("ROLLBACK;")
+                raise
+
+        if evicted:
+            with cls._lock:
+                cls.evictions += evicted
+        return
+
+    @classmethod
+    def delete(cls, endpoint: str, cv_ids: Sequence[int]) -> None:
+        """Remove the responses about certain CV ID's from the cache.
+
+        Args:
+            endpoint (str): The endpoint of which to remove responses
+            (e.g. `issues`).
+            cv_ids (Sequence[int]): The CV ID's of which to remove responses.
+        """
+        with closing(cls._connect()) as conn:
+            conn.execute(
+                """
+                DELETE FROM responses
+                WHERE query IN (
+                    SELECT query
+                    FROM response_ids
+                    WHERE endpoint = ?
+                        AND cv_id IN (SELECT value FROM json_each(?))
+                );
+                """,
+                (endpoint, dumps(cv_ids)),
+            )
+        return
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """Get statistics about the cache.
+
+        Returns:
+            Dict[str, Any]: The amount of hits, misses and evictions since
+            startup, and the current and maximum size.
+        """
+        with closing(cls._connect()) as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), IFNULL(SUM(size), 0) FROM responses;"
+            ).fetchone()
+
+        with cls._lock:
+            return {
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_ratio": round(
+                    cls.hits / ((cls.hits + cls.misses) or 1), 3
+                ),
+                "evictions": cls.evictions,
+                "entries": entries,
+                "size": size,
+                "max_size": Constants.CV_CACHE_MAX_SIZE,
+            }
+
+
+def _validate(model: Any, data: Any) -> Any:
+    """Convert a result of the CV API to a Simyan model.
+
+    Args:
+        model (Any): The Simyan model to convert to.
+        data (Any): The result of the CV API.
+
+    Raises:
+        ServiceError: The result doesn't fit the model.
+
+    Returns:
+        Any: The model instance.
+    """
+    try:
+        return model.model_validate(data)
+    except ValueError as e:
+        raise ServiceError(e) from e
+
+
+def _get_cv_ids(endpoint: str, params: dict[str, Any]) -> list[int]:
+    """Get the CV ID's that a request to the CV API is about.
+
+    Args:
+        endpoint (str): The endpoint of the request, e.g. `/volume/4050-1`.
+        params (Dict[str, Any]): The params of the request, of which the
+        filter (e.g. `volume:1|2`) is used.
+
+    Returns:
+        List[int]: The CV ID's.
+    """
+    if "filter" in params:
+        ids = str(params["filter"]).split(",")[0].partition(":")[2].split("|")
+    else:
+        ids = [endpoint.rpartition("-")[2]]
+
+    return [int(i) for i in ids if i.isdigit()]
+
+
+def _get_batch_filters(
+    key: str,
+    cv_ids: Sequence[str],
+    batch_size: int,
+    updated_since: Mapping[int, float] | None = None,
+) -> list[str]:
+    """Create the filters for requesting the results about CV ID's in batches.
+
+    Args:
+        key (str): The field to filter the CV ID's on, e.g. `id` or `volume`.
+
+        cv_ids (Sequence[str]): The CV ID's.
+
+        batch_size (int): The amount of CV ID's per filter.
+
+        updated_since (Union[Mapping[int, float], None], optional): Per CV ID
+        the timestamp after which results should have been updated to be
+        wanted. The CV ID's are then batched in order of their timestamp, and
+        a filter only lets through the results that were updated after the
+        earliest timestamp of its batch. `None` to not filter on this.
+            Defaults to None.
+
+    Returns:
+        List[str]: The filters.
+    """
+    if updated_since is None:
+        return [f"{key}:{'|'.join(b)}" for b in batched(cv_ids, batch_size)]
+
+    def format_date(timestamp: float) -> str:
+        # CV uses its own timezone, so widen the window by a margin
+        return datetime.fromtimestamp(max(timestamp, 0.0), UTC).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+
+    until = format_date(time() + Constants.CV_DELTA_REFRESH_MARGIN)
+    sorted_ids = sorted(cv_ids, key=lambda i: updated_since.get(int(i), 0.0))
+
+    filters = []
+    for batch in batched(sorted_ids, batch_size):
+        since = format_date(
+            min(updated_since.get(int(i), 0.0) for i in batch)
+            - Constants.CV_DELTA_REFRESH_MARGIN
+        )
+        filters.append(
+            f"{key}:{'|'.join(batch)},date_last_updated:{since}|{until}"
+        )
+
+    return filters
+
+
+class CVSession(AsyncSession):
+    """
+    Inherits from `AsyncSession`. Makes requests to the CV API, answering
+    them from the cache when possible. Requests are paced by `CVRateLimiter`
+    and limited by `CVRequestSlots`, so gathering requests runs them
+    concurrently within the rate budget.
+
+    Raises `simyan.exceptions.ServiceError` or
+    `simyan.exceptions.AuthenticationError` when a request fails.
+    """
+
+    def __init__(self, api_key: str, max_wait: float | None = None) -> None:
+        """Create the session.
+
+        Args:
+            api_key (str): The API key to make the requests with.
+
+            max_wait (Union[float, None], optional): The maximum amount of
+            seconds that a request may be delayed for the rate limit, after
+            which `CVRateLimitReached` is raised. `None` for no maximum.
+                Defaults to None.
+        """
+        super().__init__()
+        self.api_key = api_key
+        self.max_wait = max_wait
+        return
+
+    async def get_api(
+        self,
+        endpoint: str,
+        params: dict[str, Any] = {},
+        skip_cache: bool = False,
+    ) -> dict[str, Any]:
+        """Make a request to the CV API.
+
+        Args:
+            endpoint (str): The endpoint to request, e.g. `/volumes`.
+
+            params (Dict[str, Any], optional): Any additional params.
+                Defaults to {}.
+
+            skip_cache (bool, optional): Don't read from or write to the
+            cache.
+                Defaults to False.
+
+        Raises:
+            ServiceError: The request failed.
+            AuthenticationError: The API key is invalid or the rate limit is
+            reached.
+            CVRateLimitReached: The request would be delayed longer than
+            `max_wait` for the rate limit.
+
+        Returns:
+            Dict[str, Any]: The response of the API.
+        """
+        url = Constants.CV_API_URL + endpoint + "/"
+        request_params = {
+            **{k: str(v) for k, v in params.items()},
+            "api_key": self.api_key,
+            "format": "json",
+        }
+
+        resource = CVRateLimiter.get_resource(url)
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}"
+        # The cache and the rate limiter wait on their database when another
+        # thread or process is writing to it, so keep them off the event loop
+        if not skip_cache:
+            cached_response = await to_thread(
+                CVCache.select, cache_key, resource
+            )
+            if cached_response is not None:
+                return cached_response
+
+        # Wait for the rate limit before taking a slot, so that waiting
+        # requests don't hold up requests that are allowed already
+        wait_time = await to_thread(
+            CVRateLimiter.reserve, resource, self.max_wait
+        )
+        if wait_time > 0.0:
+            LOGGER.debug(
+                f"Waiting {round(wait_time, 1)}s to keep the CV rate "
+                f"limit of the resource '{resource}' happy"
+            )
+            await sleep(wait_time)
+
+        await CVRequestSlots.acquire()
+        try:
+            async with self.get(url, params=request_params) as response:
+                status = response.status
+                try:
+                    result = await response.json(content_type=None)
+                except ValueError:
+                    result = None
+
+        except ClientError as e:
+            raise ServiceError(f"Unable to connect to '{url}'") from e
+
+        finally:
+            CVRequestSlots.release()
+
+        if not isinstance(result, dict):
+            result = {"error": f"Unable to parse response from '{url}'"}
+
+        if status == 420:
+            # This should be 429 but CV uses 420 for rate limiting
+            await to_thread(CVRateLimiter.exhaust, resource)
+            raise AuthenticationError(result.get("error"))
+
+        if status == 401:
+            raise AuthenticationError(result.get("error"))
+
+        if status >= 400 or result.get("error") != "OK":
+            raise ServiceError(result.get("error"))
+
+        if not skip_cache:
+            await to_thread(
+                CVCache.insert,
+                cache_key,
+                resource,
+                _get_cv_ids(endpoint, params),
+                result,
+            )
+        return result
+
+    async def get_api_list(
+        self,
+        endpoint: str,
+        params: dict[str, Any] = {},
+        max_results: int | None = None,
+        skip_cache: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Get all results of a list endpoint of the CV API. The first page is
+        requested to find out the total amount of results, after which the
+        other pages are requested concurrently. The search endpoint returns
+        at most 10 results per page and ignores the offset, so it's paged by
+        page number instead.
+
+        Args:
+            endpoint (str): The endpoint to request, e.g. `/issues`.
+
+            params (Dict[str, Any], optional): Any additional params.
+                Defaults to {}.
+
+            max_results (Union[int, None], optional): The maximum amount of
+            results to fetch. `None` for no limit.
+                Defaults to None.
+
+            skip_cache (bool, optional): Don't read from or write to the
+            cache.
+                Defaults to False.
+
+        Raises:
+            ServiceError: A request failed.
+            AuthenticationError: The API key is invalid or the rate limit is
+            reached.
+
+        Returns:
+            List[Dict[str, Any]]: The results of all pages.
+        """
+        paged = endpoint == "/search"
+        page_size = 10 if paged else 100
+
+        def page_params(index: int) -> dict[str, Any]:
+            if paged:
+                return {**params, "limit": page_size, "page": index + 1}
+            return {**params, "limit": page_size, "offset": index * page_size}
+
+        response = await self.get_api(endpoint, page_params(0), skip_cache)
+        results: list[dict[str, Any]] = response["results"]
+
+        total = response["number_of_total_results"]
+        if max_results is not None:
+            total = min(total, max_results)
+
+        if results:
+            pages = await gather(
+                *(
+                    self.get_api(endpoint, page_params(index), skip_cache)
+                    for index in range(1, ceil(total / page_size))
+                )
+            )
+            for page in pages:
+                results.extend(page["results"])
+
+        return results[:total]
+
+
 class ComicVine:
     one_issue_match = (
         SpecialVersion.TPB,
@@ -159,7 +954,11 @@ class ComicVine:
     with one issue.
     """
 
-    def __init__(self, comicvine_api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        comicvine_api_key: str | None = None,
+        max_wait: float | None = None,
+    ) -> None:
         """Start interacting with ComicVine.
 
         Args:
@@ -167,6 +966,13 @@ class ComicVine:
             that is used.
                 Defaults to None.
 
+            max_wait (Union[float, None], optional): The maximum amount of
+            seconds that a request may be delayed for the rate limit, after
+            which `CVRateLimitReached` is raised. Give
+            `Constants.CV_MAX_INTERACTIVE_WAIT` when a user is waiting on the
+            result. `None` for no maximum.
+                Defaults to None.
+
         Raises:
             InvalidComicVineApiKey: No ComicVine API key is set in the settings.
         """
@@ -178,30 +984,29 @@ class ComicVine:
 
         self.date_type = settings.date_type.value
 
-        # Place the cache db at the same place as the Kapowarr db
-        cache_file_location = join(
-            dirname(DBConnection.file) or folder_path(*Constants.DB_FOLDER),
-            Constants.CV_CACHE_NAME,
-        )
-
-        self.cache = SQLiteCache(path=Path(cache_file_location))
-        self.ssn = Comicvine(api_key=api_key, cache=self.cache)
+        self.api_key = api_key
+        self.max_wait = max_wait
         return
 
-    def remove_from_cache(self, endpoint: str, cv_id: int) -> None:
-        _cv_id = str(cv_id)
-        with self.cache.connection as conn:
-            cache_keys = conn.execute(
-                "SELECT query FROM queries;",
-            ).fetchall()
+    def _session(self) -> CVSession:
+        """Create a session for making requests to the CV API. It has to be
+        created inside the event loop that it's used in.
 
-            for _key in cache_keys:
-                key: str = _key["query"]
-                if (
-                    key.startswith(Constants.CV_API_URL + "/" + endpoint)
-                    and key.count(_cv_id) != 0
-                ):
-                    self.cache.delete(key)
+        Returns:
+            CVSession: The session.
+        """
+        return CVSession(self.api_key, self.max_wait)
+
+    def remove_from_cache(self, endpoint: str, cv_ids: Sequence[int]) -> None:
+        """Remove the cached responses about volumes or issues.
+
+        Args:
+            endpoint (str): The endpoint of which to remove responses
+            (e.g. `issues`).
+            cv_ids (Sequence[int]): The CV ID's of which to remove responses.
+        """
+        CVCache.delete(endpoint, cv_ids)
+        return
 
     async def __call_request(
         self, session: AsyncSession, url: str
@@ -379,7 +1184,8 @@ class ComicVine:
 
         async def _test_token() -> bool:
             try:
-                self.ssn.get_publisher(publisher_id=31)
+                async with self._session() as session:
+                    await session.get_api("/publisher/4010-31", skip_cache=True)
 
             except (ServiceError, AuthenticationError):
                 return False
@@ -409,15 +1215,17 @@ class ComicVine:
         LOGGER.debug(f"Fetching volume data for {cv_id}")
 
         try:
-            result = self.ssn.get_volume(volume_id=cv_id)
-
-            volume_info = self.__format_volume_output(result)
-
-            LOGGER.debug(f"Fetching issue data for volume {cv_id}")
-            volume_info["issues"] = await self.fetch_issues((cv_id,))
+            async with self._session() as session:
+                response, issues = await gather(
+                    session.get_api(f"/volume/4050-{cv_id}"),
+                    self.fetch_issues((cv_id,)),
+                )
+                volume_info = self.__format_volume_output(
+                    _validate(Volume, response["results"])
+                )
+                volume_info["issues"] = issues
 
-            LOGGER.debug(f"Fetching volume data result: {volume_info}")
-            async with AsyncSession() as session:
+                LOGGER.debug(f"Fetching volume data result: {volume_info}")
                 volume_info["cover"] = await self.__call_request(
                     session, volume_info["cover_link"]
                 )
@@ -426,13 +1234,22 @@ class ComicVine:
             raise CVRateLimitReached
 
     async def fetch_volumes(
-        self, cv_ids: Sequence[str | int]
+        self,
+        cv_ids: Sequence[str | int],
+        updated_since: Mapping[int, float] | None = None,
     ) -> list[VolumeMetadata]:
         """Get the metadata of the volumes from ComicVine, without their issues.
 
         Args:
             cv_ids (Sequence[Union[str, int]]): The CV ID's of the volumes.
 
+            updated_since (Union[Mapping[int, float], None], optional): Per
+            CV ID the timestamp of when the volume was last fetched. If given,
+            only the volumes that have been updated on CV since then are
+            returned, bypassing the cache. Some volumes that were updated
+            shortly before are returned too.
+                Defaults to None.
+
         Returns:
             List[VolumeMetadata]: The metadata of the volumes, without issues.
         """
@@ -443,28 +1260,26 @@ class ComicVine:
 
         LOGGER.debug(f"Fetching volume data for {formatted_cv_ids}")
 
+        filters = _get_batch_filters("id", formatted_cv_ids, 100, updated_since)
+
         volume_infos = []
-        async with AsyncSession() as session:
-            batch_brake_time = Constants.CV_BRAKE_TIME * 10
+        async with self._session() as session:
             # 10 requests of 100 vol per round
-            for request_batch in batched(formatted_cv_ids, 1000):
-                if request_batch[0] != formatted_cv_ids[0]:
-                    # From second round on
-                    LOGGER.debug(
-                        f"Waiting {Constants.CV_BRAKE_TIME}s to keep the CV rate limit happy"
-                        f"Waiting {batch_brake_time}s to keep the CV rate limit happy"
-                    )
-                    await sleep(batch_brake_time)
-
-                # Fetch 10 batches of 100 volumes
+            for filter_batch in batched(filters, 10):
+                # Fetch 10 batches of 100 volumes concurrently
                 try:
                     responses = [
-                        self.ssn.list_volumes(
-                            params={
-                                "filter": f"id:{'|'.join(id_batch)}",
-                            }
+                        [_validate(BasicVolume, r) for r in batch]
+                        for batch in await gather(
+                            *(
+                                session.get_api_list(
+                                    "/volumes",
+                                    {"filter": cv_filter},
+                                    skip_cache=updated_since is not None,
+                                )
+                                for cv_filter in filter_batch
+                            )
                         )
-                        for id_batch in batched(request_batch, 100)
                     ]
                 except (ServiceError, AuthenticationError):
                     raise CVRateLimitReached
@@ -496,13 +1311,31 @@ class ComicVine:
         return volume_infos
 
     async def fetch_issues(
-        self, cv_ids: Sequence[str | int]
+        self,
+        cv_ids: Sequence[str | int],
+        allow_partial: bool = True,
+        updated_since: Mapping[int, float] | None = None,
     ) -> list[IssueMetadata]:
         """Get the metadata of the issues of volumes from ComicVine.
 
         Args:
             ids (Sequence[Union[str, int]]): The CV ID's of the volumes.
 
+            allow_partial (bool, optional): When the rate limit is reached
+            while fetching a batch of volumes, leave out the issues of that
+            batch instead of raising.
+                Defaults to True.
+
+            updated_since (Union[Mapping[int, float], None], optional): Per
+            CV ID of a volume the timestamp of when its issues were last
+            fetched. If given, only the issues that have been updated on CV
+            since then are returned, bypassing the cache. Some issues that
+            were updated shortly before are returned too.
+                Defaults to None.
+
+        Raises:
+            CVRateLimitReached: The ComicVine rate limit is reached.
+
         Returns:
             List[IssueMetadata]: The metadata of all the issues inside the
             volumes (assuming the rate limit wasn't reached).
@@ -514,47 +1347,40 @@ class ComicVine:
 
         LOGGER.debug(f"Fetching issue data for volumes {formatted_cv_ids}")
 
-        issue_infos = []
-        batch_brake_time = Constants.CV_BRAKE_TIME * 10
-        for id_batch in batched(formatted_cv_ids, 50):
-            try:
-                results = self.ssn.list_issues(
-                    params={
-                        "filter": f"volume:{'|'.join(id_batch)}",
-                    }
-                )
+        async def fetch_batch(cv_filter: str) -> list[IssueMetadata]:
+            results = await session.get_api_list(
+                "/issues",
+                {"filter": cv_filter},
+                skip_cache=updated_since is not None,
+            )
+            return [
+                self.__format_issue_output(_validate(BasicIssue, r))
+                for r in results
+            ]
 
-            except (ServiceError, AuthenticationError):
-                break
+        # Fetch the batches of 50 volumes concurrently
+        async with self._session() as session:
+            responses = await gather(
+                *(
+                    fetch_batch(cv_filter)
+                    for cv_filter in _get_batch_filters(
+                        "volume", formatted_cv_ids, 50, updated_since
+                    )
+                ),
+                return_exceptions=True,
+            )
 
-            issue_infos += [self.__format_issue_output(r) for r in results]
+        issue_infos = []
+        for response in responses:
+            if isinstance(response, (ServiceError, AuthenticationError)):
+                if not allow_partial:
+                    raise CVRateLimitReached
+                continue
 
-            if len(results) > 100:
-                for offset_batch in batched(range(100, len(results), 100), 10):
-                    if offset_batch[0] != 100:
-                        # From second round on
-                        LOGGER.debug(
-                            f"Waiting {batch_brake_time}s to keep the CV rate limit happy"
-                        )
-                        await sleep(batch_brake_time)
-
-                    try:
-                        responses = [
-                            self.ssn.list_issues(
-                                params={
-                                    "filter": f"volume:{'|'.join(id_batch)}",
-                                    "offset": offset,
-                                }
-                            )
-                            for offset in offset_batch
-                        ]
+            if isinstance(response, BaseException):
+                raise response
 
-                        for batch in responses:
-                            issue_infos += [
-                                self.__format_issue_output(r) for r in batch
-                            ]
-                    except (ServiceError, AuthenticationError):
-                        raise CVRateLimitReached
+            issue_infos += response
 
         return issue_infos
 
@@ -564,6 +1390,10 @@ class ComicVine:
         Args:
             query (str): The query to use when searching.
 
+        Raises:
+            CVRateLimitReached: The search would be delayed longer than
+            `max_wait` for the ComicVine rate limit.
+
         Returns:
             List[VolumeMetadata]: A list with search results.
         """
@@ -580,11 +1410,15 @@ class ComicVine:
                     return []
 
             else:
-                results: list = self.ssn.search(
-                    query=query,
-                    resource=ComicvineResource.VOLUME,
-                    max_results=50,
-                )
+                async with self._session() as session:
+                    results = [
+                        _validate(BasicVolume, r)
+                        for r in await session.get_api_list(
+                            "/search",
+                            {"query": query, "resources": "volume"},
+                            max_results=50,
+                        )
+                    ]
 
         except (ServiceError, AuthenticationError):
             return []
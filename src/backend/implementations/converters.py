@@ -75,7 +75,7 @@ def extract_files_from_folder(source_folder: str, volume_id: int) -> list[str]:
 
     volume = Volume(volume_id)
     volume_data = volume.get_data()
-    volume_issues = volume.get_issues()
+    issue_index = volume.get_issue_index()
     end_year = volume.get_ending_year() or volume_data.year
 
     # Filter non-relevant files
@@ -86,7 +86,7 @@ def extract_files_from_folder(source_folder: str, volume_id: int) -> list[str]:
             folder_extraction_filter(
                 extract_filename_data(c, False),
                 volume_data,
-                volume_issues,
+                issue_index,
                 end_year,
             )
             and "variant cover" not in c.lower().replace(" ", "")
@@ -428,7 +428,7 @@ def _create_link_paths(
     volume = Volume(volume_id)
     volume_data = volume.get_data()
     ending_year = volume.get_ending_year()
-    volume_issues = volume.get_issues()
+    issue_index = volume.get_issue_index()
 
     link_paths: list[list[DownloadGroup]] = []
     if force_match:
@@ -438,7 +438,7 @@ def _create_link_paths(
         if not (
             force_match
             or gc_group_filter(
-                group["info"], volume_data, ending_year, volume_issues
+                group["info"], volume_data, ending_year, issue_index
             )
         ):
             continue
@@ -5,12 +5,13 @@ file and CV result, issue/volume and GC result, etc.
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
 from re import compile
 from typing import TYPE_CHECKING
 
 from backend.base.definitions import IssueData, MatchRejections, SpecialVersion
-from backend.base.helpers import force_range
+from backend.base.helpers import extract_year_from_date, force_range
 from backend.implementations.blocklist import blocklist_contains
 
 if TYPE_CHECKING:
@@ -26,6 +27,67 @@ clean_title_regex = compile(
 )
 
 
+class IssueIndex:
+    """The issues of a volume, indexed on their calculated issue number. Build
+    it once per scan or search and share it between the filters, instead of
+    going over all issues for every file or search result. It doesn't follow
+    changes to the issues, so get a new one after changing them.
+    """
+
+    def __init__(self, issues: Iterable[IssueData]) -> None:
+        """Index the issues.
+
+        Args:
+            issues (Iterable[IssueData]): The issues of the volume.
+        """
+        self.issues = list(issues)
+        "The issues, in the order that they were given in"
+
+        self._sorted_issues = sorted(
+            self.issues, key=lambda i: i.calculated_issue_number
+        )
+        self._numbers = [i.calculated_issue_number for i in self._sorted_issues]
+
+        self.number_to_year: dict[float, int | None] = {
+            i.calculated_issue_number: extract_year_from_date(i.date)
+            for i in self.issues
+        }
+        "Calculated issue number to release year for all issues"
+        return
+
+    def in_range(
+        self,
+        calculated_issue_number_start: float | int,
+        calculated_issue_number_end: float | int,
+    ) -> list[IssueData]:
+        """Get the issues that are between two calculated issue numbers.
+
+        Args:
+            calculated_issue_number_start (Union[float, int]): The start of the
+            range.
+            calculated_issue_number_end (Union[float, int]): The end of the
+            range.
+
+        Returns:
+            List[IssueData]: The issues in the range, sorted on their
+            calculated issue number.
+        """
+        return self._sorted_issues[
+            bisect_left(
+                self._numbers, calculated_issue_number_start
+            ) : bisect_right(self._numbers, calculated_issue_number_end)
+        ]
+
+    def __contains__(self, calculated_issue_number: object) -> bool:
+        return calculated_issue_number in self.number_to_year
+
+    def __iter__(self) -> Iterator[IssueData]:
+        return iter(self.issues)
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+
 def parse_covered_issues(
     issue_str: str | None,
 ) -> tuple[float, float] | float | None:
@@ -66,6 +128,18 @@ def parse_volume_number(
     return volume_number
 
 
+def _clean_title(title: str) -> str:
+    """Reduce a title to the form that is used when comparing titles.
+
+    Args:
+        title (str): The title to clean.
+
+    Returns:
+        str: The cleaned title.
+    """
+    return clean_title_regex.sub("", title.lower()).replace(" ", "")
+
+
 def _match_title(
     title1: str, title2: str, allow_contains: bool = False
 ) -> bool:
@@ -81,11 +155,9 @@ def _match_title(
     Returns:
         bool: Whether the titles match.
     """
-    clean_reference_title = clean_title_regex.sub("", title1.lower()).replace(
-        " ", ""
-    )
+    clean_reference_title = _clean_title(title1)
 
-    clean_title = clean_title_regex.sub("", title2.lower()).replace(" ", "")
+    clean_title = _clean_title(title2)
 
     if allow_contains:
         return clean_title in clean_reference_title
@@ -128,7 +200,7 @@ def _match_year(
 
 def _match_volume_number(
     volume_data: VolumeData,
-    volume_issues: list[IssueData],
+    issue_index: IssueIndex,
     check_number: None | int | tuple[int, int],
     conservative: bool = False,
 ) -> bool:
@@ -139,7 +211,7 @@ def _match_volume_number(
     Args:
         volume_data (VolumeData): The data of the volume.
 
-        volume_issues (List[IssueData]): The data of the issues of the volume.
+        issue_index (IssueIndex): The issues of the volume.
 
         check_number (Union[None, int, Tuple[int, int]]): The volume number
         (or range) to check.
@@ -172,15 +244,10 @@ def _match_volume_number(
     if volume_data.special_version != SpecialVersion.VOLUME_AS_ISSUE:
         return False
 
-    number_found = 0
     numbers = (
         check_number if isinstance(check_number, tuple) else (check_number,)
     )
-    for issue in volume_issues:
-        if issue.calculated_issue_number in numbers:
-            number_found += 1
-
-    return number_found == len(numbers)
+    return all(n in issue_index for n in numbers)
 
 
 def _match_special_version(
@@ -248,7 +315,7 @@ def _match_special_version(
 def folder_extraction_filter(
     file_data: FilenameData,
     volume_data: VolumeData,
-    volume_issues: list[IssueData],
+    issue_index: IssueIndex,
     end_year: int | None,
 ) -> bool:
     """The filter applied to the files when extracting from a folder,
@@ -257,7 +324,7 @@ def folder_extraction_filter(
     Args:
         file_data (FilenameData): Extracted data from file.
         volume_data (VolumeData): The data of the volume.
-        volume_issues (List[IssueData]): The data of the issues of the volume.
+        issue_index (IssueIndex): The issues of the volume.
         end_year (Union[int, None]): Year of last issue or volume year.
 
     Returns:
@@ -272,7 +339,7 @@ def folder_extraction_filter(
 
     matching_volume_number = _match_volume_number(
         volume_data,
-        volume_issues,
+        issue_index,
         file_data["volume_number"],
     )
 
@@ -300,15 +367,14 @@ def folder_extraction_filter(
 def file_importing_filter(
     file_data: FilenameData,
     volume_data: VolumeData,
-    volume_issues: list[IssueData],
-    number_to_year: Mapping[float, int | None],
+    issue_index: IssueIndex,
 ) -> bool:
     """Filter for matching files to volumes.
 
     Args:
         file_data (FilenameData): Extraced data from file.
         volume_data (VolumeData): The data of the volume.
-        volume_issues (List[IssueData]): The data of the issues of the volume.
+        issue_index (IssueIndex): The issues of the volume.
 
     Returns:
         bool: Whether the file passes the filter (if it should be matched or not).
@@ -333,13 +399,13 @@ def file_importing_filter(
     )
 
     matching_volume_number = _match_volume_number(
-        volume_data, volume_issues, file_data["volume_number"]
+        volume_data, issue_index, file_data["volume_number"]
     )
 
     matching_year = _match_year(
         volume_data.year,
         file_data["year"],
-        number_to_year.get(force_range(issue_number)[-1]),
+        issue_index.number_to_year.get(force_range(issue_number)[-1]),
     )
 
     is_match = matching_special_version and (
@@ -353,7 +419,7 @@ def gc_group_filter(
     processed_desc: FilenameData,
     volume_data: VolumeData,
     ending_year: int | None,
-    volume_issues: list[IssueData],
+    issue_index: IssueIndex,
 ) -> bool:
     """Filter for deciding if a GC download group is a match for the
     volume/issue.
@@ -363,7 +429,7 @@ def gc_group_filter(
         volume_data (VolumeData): The data of the volume.
         ending_year (Union[int, None]): The year of the last released issue of
         the volume.
-        volume_issues (List[IssueData]): The data of the issues of the volume.
+        issue_index (IssueIndex): The issues of the volume.
 
     Returns:
         bool: Whether the group passes the filter.
@@ -374,7 +440,7 @@ def gc_group_filter(
 
     matching_volume_number = _match_volume_number(
         volume_data,
-        volume_issues,
+        issue_index,
         processed_desc["volume_number"],
         conservative=True,
     )
@@ -407,8 +473,7 @@ def gc_group_filter(
 def check_search_result_match(
     result: SearchResultData,
     volume_data: VolumeData,
-    volume_issues: list[IssueData],
-    number_to_year: Mapping[float, int | None],
+    issue_index: IssueIndex,
     calculated_issue_number: float | None = None,
 ) -> SearchResultMatchData:
     """Filter for deciding if a search result is a match with what is searched
@@ -419,10 +484,7 @@ def check_search_result_match(
 
         volume_data (VolumeData): The data of the volume.
 
-        volume_issues (List[IssueData]): The data of the issues of the volume.
-
-        number_to_year (Mapping[float, Union[int, None]]):
-        calculated_issue_number to release year for all issues of volume.
+        issue_index (IssueIndex): The issues of the volume.
 
         calculated_issue_number (Union[float, None], optional): The calculated
         issue number of the issue, if the search was for an issue.
@@ -447,7 +509,7 @@ def check_search_result_match(
         rejections.append(MatchRejections.TITLE.value)
 
     if not _match_volume_number(
-        volume_data, volume_issues, result["volume_number"], conservative=True
+        volume_data, issue_index, result["volume_number"], conservative=True
     ):
         rejections.append(MatchRejections.VOLUME_NUMBER.value)
 
@@ -477,7 +539,7 @@ def check_search_result_match(
     ):
         if calculated_issue_number is None:
             # Volume search
-            if not all(i in number_to_year for i in force_range(issue_number)):
+            if not all(i in issue_index for i in force_range(issue_number)):
                 # One of the extracted issue numbers is not found in volume
                 rejections.append(MatchRejections.ISSUE_NUMBER.value)
 
@@ -489,7 +551,7 @@ def check_search_result_match(
     if not _match_year(
         volume_data.year,
         result["year"],
-        number_to_year.get(force_range(issue_number)[-1]),
+        issue_index.number_to_year.get(force_range(issue_number)[-1]),
         conservative=True,
     ):
         rejections.append(MatchRejections.YEAR.value)
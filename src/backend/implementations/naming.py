@@ -45,7 +45,11 @@ from backend.base.helpers import (
     force_range,
 )
 from backend.base.logging import LOGGER
-from backend.implementations.matching import _match_title, file_importing_filter
+from backend.implementations.matching import (
+    IssueIndex,
+    _match_title,
+    file_importing_filter,
+)
 from backend.implementations.root_folders import RootFolders
 from backend.implementations.volumes import Issue, Volume
 from backend.internals.db_models import FilesDB
@@ -716,15 +720,9 @@ def check_mock_filename(
             name = format_filename(filepath, formatted)
             save_name = clean_filepath(name)
 
-            number_to_year: dict[float, int | None] = {
-                i.calculated_issue_number: extract_year_from_date(i.date)
-                for i in issue_mock
-            }
             efd = extract_filename_data(save_name)
             if not (
-                file_importing_filter(
-                    efd, volume_mock, issue_mock, number_to_year
-                )
+                file_importing_filter(efd, volume_mock, IssueIndex(issue_mock))
                 and _match_title(efd["series"], volume_mock.title)
                 and (
                     # Special version doesn't need issue matching
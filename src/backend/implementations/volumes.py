@@ -1,21 +1,21 @@
 from __future__ import annotations
 
-import re
-from asyncio import gather, run, sleep
-from collections.abc import Mapping, Sequence
+from asyncio import gather, run
+from codecs import getincrementaldecoder
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from datetime import datetime, timedelta
 from functools import lru_cache
-from io import BytesIO
+from json import dumps
 from os import stat
 from os.path import dirname, exists, isdir, relpath
-from re import IGNORECASE, compile
+from re import DOTALL, IGNORECASE, compile
 from time import time
 from typing import Any, assert_never
 
-from aiohttp import ClientConnectorError
-from bs4 import BeautifulSoup
+from aiohttp import ClientError
 
 from backend.base.custom_exceptions import (
+    CVRateLimitReached,
     InvalidKey,
     InvalidKeyValue,
     IssueNotFound,
@@ -26,9 +26,12 @@ from backend.base.custom_exceptions import (
 )
 from backend.base.definitions import (
     Constants,
+    CVVolumePage,
     FileConstants,
     FileData,
     FileExtraInfo,
+    FileManifestEntry,
+    FilenameData,
     GeneralFileData,
     GeneralFileType,
     IssueData,
@@ -40,6 +43,7 @@ from backend.base.definitions import (
     SpecialVersion,
     VolumeData,
     VolumeMetadata,
+    VolumeScanResult,
 )
 from backend.base.file_extraction import extract_filename_data
 from backend.base.files import (
@@ -49,7 +53,7 @@ from backend.base.files import (
     delete_empty_parent_folders,
     delete_file_folder,
     folder_is_inside_folder,
-    list_files,
+    iter_files,
     rename_file,
 )
 from backend.base.helpers import (
@@ -59,15 +63,27 @@ from backend.base.helpers import (
     filtered_iter,
     first_of_subarrays,
     force_range,
+    hash_blob,
+    normalise_string,
     to_number_cv_id,
 )
 from backend.base.logging import LOGGER
 from backend.implementations.comicvine import ComicVine
 from backend.implementations.marvel_meta import get_marvel_issues
-from backend.implementations.matching import _match_title, file_importing_filter
+from backend.implementations.matching import (
+    IssueIndex,
+    _clean_title,
+    file_importing_filter,
+)
 from backend.implementations.root_folders import RootFolders
-from backend.internals.db import commit, get_db
-from backend.internals.db_models import FilesDB, GeneralFilesDB
+from backend.internals.db import commit, get_db, iter_blob
+from backend.internals.db_models import (
+    CVVolumePagesDB,
+    FileManifestDB,
+    FilesDB,
+    GeneralFilesDB,
+    VolumeStatsDB,
+)
 from backend.internals.server import WebSocket
 from backend.internals.settings import Settings
 
@@ -79,6 +95,12 @@ split_regex = compile(
 )
 remove_link_regex = compile(r"<a[^>]*>.*?</a>", IGNORECASE)
 omnibus_regex = compile(r"\bomnibus\b", IGNORECASE)
+cv_issue_count_header_regex = compile(
+    r"<h2[^>]*class=\"[^\"]*\bheader-border\b[^\"]*\"[^>]*>(.*?)</h2>",
+    DOTALL,
+)
+html_tag_regex = compile(r"<[^>]*>")
+number_regex = compile(r"\d+")
 os_regex = compile(
     r"(?<!preceding\s)\bone[\- ]?shot\b(?!\scollections?)", IGNORECASE
 )
@@ -278,13 +300,34 @@ class Issue:
     def delete(self) -> None:
         """Delete the issue from the database."""
         data = self.get_data()
+        delete_issues({data.volume_id: [self.id]})
+        return
+
 
-        FilesDB.delete_issue_linked_files(self.id)
-        get_db().execute("DELETE FROM issues WHERE id = ?;", (self.id,))
+def delete_issues(volume_to_issue_ids: Mapping[int, Sequence[int]]) -> None:
+    """Delete multiple issues, and the files linked to them, from the database
+    at once. One websocket message is sent per volume.
 
-        WebSocket().send_issue_deleted(data.volume_id, self.id)
+    Args:
+        volume_to_issue_ids (Mapping[int, Sequence[int]]): The ID of the
+        volume to the IDs of its issues that should be deleted.
+    """
+    issue_ids = [i for ids in volume_to_issue_ids.values() for i in ids]
+    if not issue_ids:
         return
 
+    FilesDB.delete_issues_linked_files(issue_ids)
+    get_db().execute(
+        "DELETE FROM issues WHERE id IN (SELECT value FROM json_each(?));",
+        (dumps(issue_ids),),
+    )
+
+    ws = WebSocket()
+    for volume_id, volume_issue_ids in volume_to_issue_ids.items():
+        if volume_issue_ids:
+            ws.send_issues_deleted(volume_id, volume_issue_ids)
+    return
+
 
 # =====================
 # region Volume
@@ -303,6 +346,7 @@ class Volume:
                 Can only be raised when check_existence is `True`.
         """
         self.id = id
+        self._issue_index: IssueIndex | None = None
 
         if not check_existence:
             return
@@ -367,32 +411,12 @@ class Volume:
                 monitored, monitor_new_issues,
                 v.folder, root_folder,
                 rf.folder AS root_folder_path,
-                (
-                    SELECT COUNT(*)
-                    FROM issues
-                    WHERE volume_id = v.id
-                ) AS issue_count,
-                (
-                    SELECT COUNT(DISTINCT issue_id)
-                    FROM issues i
-                    INNER JOIN issues_files if
-                    ON i.id = if.issue_id
-                    WHERE volume_id = v.id
-                ) AS issues_downloaded,
-                (
-                    SELECT SUM(size) FROM (
-                        SELECT DISTINCT f.id, size
-                        FROM issues i
-                        INNER JOIN issues_files if
-                        INNER JOIN files f
-                        ON i.id = if.issue_id
-                            AND if.file_id = f.id
-                        WHERE volume_id = v.id
-                    )
-                ) AS total_size
+                vs.issue_count, vs.issues_downloaded, vs.total_size
             FROM volumes v
             INNER JOIN root_folders rf
             ON v.root_folder = rf.id
+            INNER JOIN volume_stats vs
+            ON v.id = vs.volume_id
             WHERE v.id = ?
             LIMIT 1;
             """,
@@ -416,21 +440,52 @@ class Volume:
     def vd(self) -> VolumeData:
         return self.get_data()
 
-    def get_cover(self) -> BytesIO:
-        """Get the cover of the volume.
+    def get_cover(self) -> Iterator[bytes]:
+        """Get the cover of the volume. It's streamed out of the database in
+        chunks once iteration starts.
 
         Returns:
-            BytesIO: The cover.
+            Iterator[bytes]: The chunks of the cover. Yields nothing if the
+            volume has no cover.
         """
-        cover = (
+        row = (
             get_db()
             .execute(
-                "SELECT cover FROM volumes_covers WHERE volume_id = ? LIMIT 1",
+                """
+                SELECT rowid
+                FROM volumes_covers
+                WHERE volume_id = ? AND cover IS NOT NULL
+                LIMIT 1;
+                """,
                 (self.id,),
             )
-            .fetchone()[0]
+            .exists()
+        )
+        if row is None:
+            return iter(())
+
+        return iter_blob("volumes_covers", "cover", row)
+
+    def get_cover_hash(self) -> str | None:
+        """Get the hash of the cover of the volume, without reading the cover
+        itself.
+
+        Returns:
+            Union[str, None]: The hash, or `None` if the volume has no cover.
+        """
+        return (
+            get_db()
+            .execute(
+                """
+                SELECT cover_hash
+                FROM volumes_covers
+                WHERE volume_id = ? AND cover IS NOT NULL
+                LIMIT 1;
+                """,
+                (self.id,),
+            )
+            .exists()
         )
-        return BytesIO(cover)
 
     def get_ending_year(self) -> int | None:
         """Get the year of the last issue that has a release date.
@@ -554,6 +609,18 @@ class Volume:
 
         return result
 
+    def get_issue_index(self) -> IssueIndex:
+        """Get the issues of the volume, indexed on their calculated issue
+        number. Files of the issues are not fetched. The index is made once
+        per instance and is reset when the issues are changed through it.
+
+        Returns:
+            IssueIndex: The index of the issues.
+        """
+        if self._issue_index is None:
+            self._issue_index = IssueIndex(self.get_issues(_skip_files=True))
+        return self._issue_index
+
     def get_issues_in_range(
         self,
         calculated_issue_number_start: float | int,
@@ -571,18 +638,9 @@ class Volume:
         Returns:
             List[IssueData]: The list of issues in the range.
         """
-        return [
-            issue
-            for issue in sorted(
-                self.get_issues(_skip_files=True),
-                key=lambda i: i.calculated_issue_number,
-            )
-            if (
-                calculated_issue_number_start
-                <= issue.calculated_issue_number
-                <= calculated_issue_number_end
-            )
-        ]
+        return self.get_issue_index().in_range(
+            calculated_issue_number_start, calculated_issue_number_end
+        )
 
     def get_open_issues(self) -> list[tuple[int, float]]:
         """Get the issues that are not matched to a file and are monitored.
@@ -683,6 +741,7 @@ class Volume:
         Args:
             monitoring_scheme (MonitorScheme): The monitoring scheme to apply.
         """
+        self._issue_index = None
         cursor = get_db()
 
         if monitoring_scheme == MonitorScheme.NONE:
@@ -921,6 +980,8 @@ class Library:
         self,
         sort: LibrarySorting = LibrarySorting.TITLE,
         filter: LibraryFilter | int | None = None,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[dict]:
         """Get all volumes in the library
 
@@ -928,74 +989,105 @@ class Library:
             sort (LibrarySorting, optional): How to sort the list.
                 Defaults to LibrarySorting.TITLE.
 
-            filter (LibraryFilter | None, optional): Apply a filter to
-            the list if not `None`.
+            filter (LibraryFilter | int | None, optional): Apply a filter to
+            the list if not `None`. Give an int to only get the volume with
+            that CV ID.
+                Defaults to None.
+
+            limit (int | None, optional): The maximum amount of volumes to
+            return. Give `None` to return all of them.
                 Defaults to None.
 
+            offset (int, optional): The page to return, in pages of `limit`
+            volumes. Has no effect if `limit` is `None`.
+                Defaults to 0.
+
         Returns:
             List[dict]: The list of volumes in the library.
         """
+        return self._fetch_public_volumes(sort, filter, limit, offset)
+
+    def _fetch_public_volumes(
+        self,
+        sort: LibrarySorting,
+        filter: LibraryFilter | int | None,
+        limit: int | None,
+        offset: int,
+        search_query: str | None = None,
+    ) -> list[dict]:
+        params: dict[str, Any] = {}
+
         if isinstance(filter, LibraryFilter):
             sql_filter = filter.value
         elif isinstance(filter, int):
-            sql_filter = f"WHERE comicvine_id = {filter}"
+            sql_filter = "WHERE comicvine_id = :comicvine_id"
+            params["comicvine_id"] = filter
         else:
             sql_filter = ""
 
+        if search_query is None:
+            sql_search = ""
+
+        elif len(search_query) >= 3:
+            # The trigram tokenizer handles substring matching, as long as the
+            # query has at least three characters
+            sql_search = """
+            INNER JOIN (
+                SELECT rowid AS matched_id
+                FROM volumes_search
+                WHERE volumes_search MATCH :query
+            ) AS search_matches
+            ON volumes.id = search_matches.matched_id
+            """
+            params["query"] = '"' + search_query.replace('"', '""') + '"'
+
+        else:
+            sql_search = """
+            INNER JOIN (
+                SELECT rowid AS matched_id
+                FROM volumes_search
+                WHERE instr(title, :query)
+                    OR instr(alt_title, :query)
+                    OR instr(publisher, :query)
+            ) AS search_matches
+            ON volumes.id = search_matches.matched_id
+            """
+            params["query"] = search_query
+
+        if limit is None:
+            sql_limit = ""
+        else:
+            sql_limit = "LIMIT :limit OFFSET :offset"
+            params["limit"] = limit
+            params["offset"] = offset * limit
+
         volumes = (
             get_db()
-            .execute(f"""
-            WITH
-                vol_issues AS (
-                    SELECT id, monitored, date
-                    FROM issues
-                    WHERE volume_id = volumes.id
-                ),
-                vol_marvel_issues AS (
-                    SELECT id
-                    FROM marvel_issues
-                    WHERE volume_id = volumes.id
-                ),
-                issues_to_files AS (
-                    SELECT issue_id, monitored, f.id, size
-                    FROM issues i
-                    INNER JOIN issues_files if
-                    INNER JOIN files f
-                    ON i.id = if.issue_id
-                        AND if.file_id = f.id
-                    WHERE volume_id = volumes.id
-                )
+            .execute(
+                f"""
             SELECT
                 id, comicvine_id,
                 title, year, publisher,
                 volume_number, description,
                 monitored, monitor_new_issues,
                 folder,
-                (
-                    SELECT COUNT(size) FROM (SELECT size FROM issues_to_files)
-                ) AS issue_file_count,
-                (
-                    SELECT COUNT(id) FROM vol_issues
-                ) AS issue_count,
-                (
-                    SELECT COUNT(id) FROM vol_marvel_issues
-                ) AS marvel_issue_count,
-                (
-                    SELECT COUNT(id) FROM vol_issues WHERE monitored = 1
-                ) AS issue_count_monitored,
-                (
-                    SELECT COUNT(DISTINCT issue_id) FROM issues_to_files
-                ) AS issues_downloaded,
-                (
-                    SELECT COUNT(DISTINCT issue_id) FROM issues_to_files WHERE monitored = 1
-                ) AS issues_downloaded_monitored,
-                (
-                    SELECT SUM(size) FROM (SELECT DISTINCT id, size FROM issues_to_files)
-                ) AS total_size
+                issue_file_count,
+                issue_count,
+                marvel_issue_count,
+                issue_count_monitored,
+                issues_downloaded,
+                issues_downloaded_monitored,
+                total_size
             FROM volumes
+            INNER JOIN volume_stats
+            ON volumes.id = volume_stats.volume_id
+            {sql_search}
             {sql_filter}
-            ORDER BY {sort.value};
-            """)
+            ORDER BY {sort.value}
+            {sql_limit};
+            """,
+                params,
+            )
             .fetchalldict()
         )
 
@@ -1006,8 +1098,11 @@ class Library:
         query: str,
         sort: LibrarySorting = LibrarySorting.TITLE,
         filter: LibraryFilter | None = None,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[dict]:
-        """Search in the library with a query.
+        """Search in the library with a query. Matches on the title, alternative
+        title and publisher of the volumes.
 
         Args:
             query (str): The query to search with.
@@ -1019,25 +1114,91 @@ class Library:
             the list if not `None`.
                 Defaults to None.
 
+            limit (int | None, optional): The maximum amount of volumes to
+            return. Give `None` to return all of them.
+                Defaults to None.
+
+            offset (int, optional): The page to return, in pages of `limit`
+            volumes. Has no effect if `limit` is `None`.
+                Defaults to 0.
+
         Returns:
             List[dict]: The resulting list of matching volumes in the library.
         """
         if query.startswith(("4050-", "cv:")):
             try:
                 cv_id = to_number_cv_id((query,))[0]
-                volumes = self.get_public_volumes(sort, cv_id)
+                volumes = self.get_public_volumes(sort, cv_id, limit, offset)
 
             except ValueError:
                 volumes = []
 
+        else:
+            volumes = self._fetch_public_volumes(
+                sort,
+                filter,
+                limit,
+                offset,
+                search_query=_clean_title(normalise_string(query)),
+            )
+
+        return volumes
+
+    def update_search_index(
+        self, volume_ids: Iterable[int] | None = None
+    ) -> None:
+        """Store the normalised titles of volumes in the search index.
+        Removing volumes from the index happens automatically when the
+        volume is deleted.
+
+        Args:
+            volume_ids (Iterable[int] | None, optional): The volumes to
+            (re)index. Give `None` to rebuild the whole index.
+                Defaults to None.
+        """
+        cursor = get_db()
+
+        if volume_ids is None:
+            cursor.execute("DELETE FROM volumes_search;")
+            volumes = cursor.execute(
+                "SELECT id, title, alt_title, publisher FROM volumes;"
+            ).fetchall()
+
         else:
             volumes = [
-                v
-                for v in self.get_public_volumes(sort, filter)
-                if _match_title(v["title"], query, allow_contains=True)
+                cursor.execute(
+                    """
+                    SELECT id, title, alt_title, publisher
+                    FROM volumes
+                    WHERE id = ?
+                    LIMIT 1;
+                    """,
+                    (volume_id,),
+                ).fetchone()
+                for volume_id in volume_ids
             ]
+            cursor.executemany(
+                "DELETE FROM volumes_search WHERE rowid = ?;",
+                ((v["id"],) for v in volumes if v is not None),
+            )
 
-        return volumes
+        cursor.executemany(
+            """
+            INSERT INTO volumes_search(rowid, title, alt_title, publisher)
+            VALUES (?, ?, ?, ?);
+            """,
+            (
+                (
+                    v["id"],
+                    _clean_title(normalise_string(v["title"])),
+                    _clean_title(normalise_string(v["alt_title"] or "")),
+                    _clean_title(normalise_string(v["publisher"] or "")),
+                )
+                for v in volumes
+                if v is not None
+            ),
+        )
+        return
 
     def get_stats(self) -> dict[str, int]:
         result = (
@@ -1052,8 +1213,8 @@ class Library:
                 v.volumes,
                 v.monitored,
                 v.volumes - v.monitored AS unmonitored,
-                (SELECT COUNT(*) FROM issues) AS issues,
-                (SELECT COUNT(DISTINCT issue_id) FROM issues_files) AS downloaded_issues,
+                (SELECT IFNULL(SUM(issue_count), 0) FROM volume_stats) AS issues,
+                (SELECT IFNULL(SUM(issues_downloaded), 0) FROM volume_stats) AS downloaded_issues,
                 (SELECT COUNT(*) FROM files) AS files,
                 (SELECT IFNULL(SUM(size), 0) FROM files) AS total_file_size
             FROM v;
@@ -1186,7 +1347,8 @@ class Library:
         # Raises RootFolderNotFound when ID is invalid
         root_folder = RootFolders().get_one(root_folder_id)
 
-        vd = run(ComicVine().fetch_volume(comicvine_id))
+        cv = ComicVine(max_wait=Constants.CV_MAX_INTERACTIVE_WAIT)
+        vd = run(cv.fetch_volume(comicvine_id))
 
         cursor = get_db()
         with cursor:
@@ -1237,12 +1399,18 @@ class Library:
 
             cursor.execute(
                 """
-                INSERT INTO volumes_covers(volume_id, cover)
-                VALUES (:volume_id, :cover);
+                INSERT INTO volumes_covers(volume_id, cover, cover_hash)
+                VALUES (:volume_id, :cover, :cover_hash);
                 """,
-                {"volume_id": volume_id, "cover": vd["cover"]},
+                {
+                    "volume_id": volume_id,
+                    "cover": vd["cover"],
+                    "cover_hash": hash_blob(vd["cover"]),
+                },
             )
 
+            self.update_search_index((volume_id,))
+
             cursor.executemany(
                 """
                 INSERT INTO issues(
@@ -1322,51 +1490,128 @@ def determine_special_version(volume_id: int) -> SpecialVersion:
     Returns:
         SpecialVersion: The result.
     """
-    volume = Volume(volume_id)
-    volume_data = volume.get_data()
-    issues = volume.get_issues()
+    return determine_special_versions((volume_id,))[volume_id]
+
+
+def determine_special_versions(
+    volume_ids: Iterable[int],
+) -> dict[int, SpecialVersion]:
+    """Determine for multiple volumes if they're a special version. Only the
+    data needed for it is fetched, for all volumes at once.
+
+    Args:
+        volume_ids (Iterable[int]): The IDs of the volumes to determine for.
+
+    Raises:
+        VolumeNotFound: One of the volumes doesn't exist.
+
+    Returns:
+        Dict[int, SpecialVersion]: Volume ID to the result.
+    """
+    volume_ids = list(volume_ids)
+    if not volume_ids:
+        return {}
+
+    cursor = get_db()
+    ids_param = (dumps(volume_ids),)
+    volumes: dict[int, tuple[str, str | None]] = {
+        v[0]: (v[1], v[2])
+        for v in cursor.execute(
+            """
+            SELECT id, title, description
+            FROM volumes
+            WHERE id IN (SELECT value FROM json_each(?));
+            """,
+            ids_param,
+        )
+    }
+
+    issues: dict[int, list[tuple[str | None, str | None]]] = {
+        volume_id: [] for volume_id in volumes
+    }
+    for volume_id, title, date in cursor.execute(
+        """
+        SELECT volume_id, title, date
+        FROM issues
+        WHERE volume_id IN (SELECT value FROM json_each(?));
+        """,
+        ids_param,
+    ):
+        issues[volume_id].append((title, date))
+
+    result: dict[int, SpecialVersion] = {}
+    for volume_id in volume_ids:
+        if volume_id not in volumes:
+            raise VolumeNotFound(volume_id)
+
+        title, description = volumes[volume_id]
+        result[volume_id] = _determine_special_version(
+            title, description, issues[volume_id]
+        )
+
+    return result
+
+
+def _determine_special_version(
+    volume_title: str,
+    volume_description: str | None,
+    issues: Sequence[tuple[str | None, str | None]],
+) -> SpecialVersion:
+    """Determine if a volume is a special version, based on its data.
+
+    Args:
+        volume_title (str): The title of the volume.
+
+        volume_description (Union[str, None]): The description of the volume.
+
+        issues (Sequence[Tuple[Union[str, None], Union[str, None]]]): The title
+        and release date of each issue of the volume.
+
+    Returns:
+        SpecialVersion: The result.
+    """
     one_issue = len(issues) == 1
 
-    if issues and all(vol_regex.search(i.title or "") for i in issues):
+    if issues and all(vol_regex.search(i[0] or "") for i in issues):
         return SpecialVersion.VOLUME_AS_ISSUE
 
     if one_issue:
-        if omnibus_regex.search(volume_data.title):
+        if omnibus_regex.search(volume_title):
             return SpecialVersion.OMNIBUS
 
-        if os_regex.search(volume_data.title):
+        if os_regex.search(volume_title):
             return SpecialVersion.ONE_SHOT
 
-        if hc_regex.search(volume_data.title):
+        if hc_regex.search(volume_title):
             return SpecialVersion.HARD_COVER
 
-        if (issues[0].title or "").lower() == "omnibus":
+        if (issues[0][0] or "").lower() == "omnibus":
             return SpecialVersion.OMNIBUS
 
-        if (issues[0].title or "").lower().replace(" ", "") in (
+        if (issues[0][0] or "").lower().replace(" ", "") in (
             "hc",
             "hard-cover",
             "hardcover",
         ):
             return SpecialVersion.HARD_COVER
 
-        if (issues[0].title or "").lower().replace(" ", "") in (
+        if (issues[0][0] or "").lower().replace(" ", "") in (
             "os",
             "one-shot",
             "oneshot",
         ):
             return SpecialVersion.ONE_SHOT
 
-    if "annual" in volume_data.title.lower():
+    if "annual" in volume_title.lower():
         # Volume is annual
         return SpecialVersion.NORMAL
 
-    if one_issue and volume_data.description:
+    if one_issue and volume_description:
         # Look for Special Version in first sentence of description.
         # Only first sentence as to avoid false hits (e.g. referring in desc
         # to other volume that is Special Version à la
         # "Also available as one shot")
-        first_sentence = split_regex.split(volume_data.description)[0]
+        first_sentence = split_regex.split(volume_description)[0]
         first_sentence = remove_link_regex.sub("", first_sentence)
         if omnibus_regex.search(first_sentence):
             return SpecialVersion.OMNIBUS
@@ -1377,9 +1622,9 @@ def determine_special_version(volume_id: int) -> SpecialVersion:
         if hc_regex.search(first_sentence):
             return SpecialVersion.HARD_COVER
 
-    if one_issue and issues[0].date:
+    if one_issue and issues[0][1]:
         thirty_plus_days_ago = (
-            datetime.now() - datetime.strptime(issues[0].date, "%Y-%m-%d")
+            datetime.now() - datetime.strptime(issues[0][1], "%Y-%m-%d")
             > THIRTY_DAYS
         )
 
@@ -1389,14 +1634,104 @@ def determine_special_version(volume_id: int) -> SpecialVersion:
     return SpecialVersion.NORMAL
 
 
-def scan_files(
-    volume_id: int,
-    filepath_filter: list[str] = [],
-    del_unmatched_files: bool = True,
-    update_websocket: bool = False,
-    file_extra_info: FileExtraInfo | FileData | None = None,
-) -> None:
-    """Scan inside the volume folder for files and map them to issues.
+def _get_match_key(volume_data: VolumeData, issue_index: IssueIndex) -> str:
+    """Get a hash of the data of a volume that files are matched with. If it
+    changes, files have to be matched to the volume again.
+
+    Args:
+        volume_data (VolumeData): The data of the volume.
+        issue_index (IssueIndex): The issues of the volume.
+
+    Returns:
+        str: The hash.
+    """
+    return hash_blob(
+        repr(
+            (
+                volume_data.title,
+                volume_data.year,
+                volume_data.volume_number,
+                volume_data.special_version,
+                [
+                    (i.id, i.calculated_issue_number, i.date)
+                    for i in issue_index
+                ],
+            )
+        ).encode()
+    )
+
+
+def _match_file_to_volume(
+    file_data: FilenameData,
+    volume_data: VolumeData,
+    issue_index: IssueIndex,
+) -> tuple[list[int], str | None]:
+    """Find out what a file in the volume folder is for.
+
+    Args:
+        file_data (FilenameData): The data extracted from the filename.
+        volume_data (VolumeData): The data of the volume.
+        issue_index (IssueIndex): The issues of the volume.
+
+    Returns:
+        Tuple[List[int], Union[str, None]]: The IDs of the issues that the
+        file is for, and the type of general file that it is, if it is one.
+    """
+    if not file_importing_filter(file_data, volume_data, issue_index):
+        return [], None
+
+    if (
+        file_data["special_version"] == SpecialVersion.COVER
+        and file_data["issue_number"] is None
+    ):
+        # Volume cover file
+        return [], GeneralFileType.COVER.value
+
+    if (
+        file_data["special_version"] == SpecialVersion.METADATA
+        and file_data["issue_number"] is None
+    ):
+        # Volume metadata file
+        return [], GeneralFileType.METADATA.value
+
+    if (
+        volume_data.special_version
+        not in (SpecialVersion.VOLUME_AS_ISSUE, SpecialVersion.NORMAL)
+        and file_data["special_version"]
+    ):
+        # Special Version
+        return [issue_index.issues[0].id], None
+
+    if (
+        file_data["issue_number"] is not None
+        or volume_data.special_version == SpecialVersion.VOLUME_AS_ISSUE
+    ):
+        # Normal issue
+        issue_range = file_data["issue_number"]
+        if (
+            volume_data.special_version == SpecialVersion.VOLUME_AS_ISSUE
+            and file_data["issue_number"] is None
+        ):
+            issue_range = file_data["volume_number"]
+
+        if issue_range is not None:
+            return [
+                issue.id
+                for issue in issue_index.in_range(*force_range(issue_range))
+            ], None
+
+    return [], None
+
+
+def _scan_volume_folder(
+    volume_id: int, filepath_filter: list[str] = []
+) -> VolumeScanResult | None:
+    """Find the files inside the volume folder and the issues that they are
+    for. Only reads from the database, so it can safely be run in parallel
+    for multiple volumes. The result is written to the database with
+    `_apply_volume_scan()`. Only files that are new or changed since the last
+    scan, according to the file manifest of the volume, have their filename
+    parsed. They're only matched again if the volume data also changed.
 
     Args:
         volume_id (int): The ID of the volume to scan for.
@@ -1405,13 +1740,9 @@ def scan_files(
         Intended for adding files to a volume only.
             Defaults to [].
 
-        del_unmatched_files (bool, optional): Delete file entries in the DB
-        that aren't linked to anything anymore.
-            Defaults to True.
-
-        update_websocket (bool, optional): Send websocket messages on changes
-        about the download status of the issues.
-            Defaults to False.
+    Returns:
+        Union[VolumeScanResult, None]: The files and what they're matched to,
+        or `None` if the volume folder doesn't exist.
     """
     LOGGER.debug(f"Scanning for files for {volume_id}")
 
@@ -1423,92 +1754,131 @@ def scan_files(
         if settings.create_empty_volume_folders:
             create_folder(volume_data.folder)
         else:
-            return
+            return None
+
+    issue_index = volume.get_issue_index()
+    manifest = FileManifestDB.fetch(volume_id)
+    match_key = _get_match_key(volume_data, issue_index)
+    manifest_updates: list[FileManifestEntry] = []
+
+    bindings: list[tuple[str, int]] = []
+    general_bindings: list[tuple[str, str]] = []
+    file_sizes: dict[str, int] = {}
+    # Files are matched while the folder is still being walked
+    folder_contents: set[str] = set()
+    for file in filtered_iter(
+        iter_files(volume_data.folder, FileConstants.SCANNABLE_EXTENSIONS),
+        set(filepath_filter),
+    ):
+        folder_contents.add(file)
+        file_stat = stat(file)
+        entry: FileManifestEntry | None = manifest.get(file)
+
+        if entry is None or (entry["inode"], entry["size"], entry["mtime"]) != (
+            file_stat.st_ino,
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+        ):
+            # New or changed file
+            file_data = extract_filename_data(file)
+            entry = None
+        else:
+            file_data = entry["file_data"]
 
-    volume_issues = volume.get_issues(_skip_files=True)
-    general_files = tuple(
-        (gf["id"], gf["file_type"]) for gf in volume.get_general_files()
-    )
-    volume_files = {f["filepath"]: f["id"] for f in volume.get_all_files()}
-    number_to_year: dict[float, int | None] = {
-        i.calculated_issue_number: extract_year_from_date(i.date)
-        for i in volume_issues
-    }
+        if entry is None or entry["match_key"] != match_key:
+            issue_ids, general_file_type = _match_file_to_volume(
+                file_data, volume_data, issue_index
+            )
+            entry = {
+                "filepath": file,
+                "inode": file_stat.st_ino,
+                "size": file_stat.st_size,
+                "mtime": file_stat.st_mtime_ns,
+                "file_data": file_data,
+                "match_key": match_key,
+                "issue_ids": issue_ids,
+                "general_file_type": general_file_type,
+            }
+            manifest_updates.append(entry)
 
-    bindings: list[tuple[int, int]] = []
-    general_bindings: list[tuple[int, str]] = []
-    folder_contents = list_files(
-        folder=volume_data.folder, ext=FileConstants.SCANNABLE_EXTENSIONS
-    )
-    for file in filtered_iter(folder_contents, set(filepath_filter)):
-        file_data = extract_filename_data(file)
+        bindings.extend((file, issue_id) for issue_id in entry["issue_ids"])
+        if entry["general_file_type"] is not None:
+            general_bindings.append((file, entry["general_file_type"]))
+        if entry["issue_ids"] or entry["general_file_type"] is not None:
+            file_sizes[file] = file_stat.st_size
 
-        # Check if file matches volume
-        if not file_importing_filter(
-            file_data, volume_data, volume_issues, number_to_year
-        ):
-            continue
+    if filepath_filter:
+        manifest_deletions = []
+    else:
+        manifest_deletions = list(manifest.keys() - folder_contents)
 
+    if settings.delete_empty_folders:
+        delete_empty_child_folders(volume_data.folder, skip_hidden_folders=True)
         if (
-            file_data["special_version"] == SpecialVersion.COVER
-            and file_data["issue_number"] is None
+            next(iter_files(volume_data.folder), None) is None
+            and not settings.create_empty_volume_folders
         ):
-            # Volume cover file
-            if file not in volume_files:
-                volume_files[file] = FilesDB.add_file(file, file_extra_info)
-
-            general_bindings.append(
-                (volume_files[file], GeneralFileType.COVER.value)
+            delete_empty_parent_folders(
+                volume_data.folder, RootFolders()[volume_data.root_folder]
             )
 
-        elif (
-            file_data["special_version"] == SpecialVersion.METADATA
-            and file_data["issue_number"] is None
-        ):
-            # Volume metadata file
-            if file not in volume_files:
-                volume_files[file] = FilesDB.add_file(file, file_extra_info)
+    return VolumeScanResult(
+        volume_id=volume_id,
+        partial=bool(filepath_filter),
+        bindings=bindings,
+        general_bindings=general_bindings,
+        file_sizes=file_sizes,
+        manifest_updates=manifest_updates,
+        manifest_deletions=manifest_deletions,
+    )
 
-            general_bindings.append(
-                (volume_files[file], GeneralFileType.METADATA.value)
-            )
 
-        elif (
-            volume_data.special_version
-            not in (SpecialVersion.VOLUME_AS_ISSUE, SpecialVersion.NORMAL)
-            and file_data["special_version"]
-        ):
-            # Special Version
-            if file not in volume_files:
-                volume_files[file] = FilesDB.add_file(file, file_extra_info)
+def _apply_volume_scan(
+    scan: VolumeScanResult,
+    update_websocket: bool = False,
+    file_extra_info: FileExtraInfo | FileData | None = None,
+) -> None:
+    """Write the result of `_scan_volume_folder()` to the database. Doesn't
+    commit.
 
-            bindings.append((volume_files[file], volume_issues[0].id))
+    Args:
+        scan (VolumeScanResult): The result of the scan.
 
-        elif (
-            file_data["issue_number"] is not None
-            or volume_data.special_version == SpecialVersion.VOLUME_AS_ISSUE
-        ):
-            # Normal issue
-            issue_range = file_data["issue_number"]
-            if (
-                volume_data.special_version == SpecialVersion.VOLUME_AS_ISSUE
-                and file_data["issue_number"] is None
-            ):
-                issue_range = file_data["volume_number"]
+        update_websocket (bool, optional): Send websocket messages on changes
+        about the download status of the issues.
+            Defaults to False.
 
-            if issue_range is not None:
-                matching_issues = volume.get_issues_in_range(
-                    *force_range(issue_range)
-                )
+        file_extra_info (Union[FileExtraInfo, FileData, None], optional):
+        Extra info to store for files that are new to the database.
+            Defaults to None.
+    """
+    volume_id = scan.volume_id
+    volume = Volume(volume_id)
+    FileManifestDB.update(volume_id, scan.manifest_updates)
+    FileManifestDB.delete(volume_id, scan.manifest_deletions)
 
-                if matching_issues:
-                    if file not in volume_files:
-                        volume_files[file] = FilesDB.add_file(
-                            file, file_extra_info
-                        )
+    general_files = tuple(
+        (gf["id"], gf["file_type"]) for gf in volume.get_general_files()
+    )
+    volume_files = {f["filepath"]: f for f in volume.get_all_files()}
 
-                    for issue in matching_issues:
-                        bindings.append((volume_files[file], issue.id))
+    file_ids = FilesDB.add_files(
+        (file for file in scan.file_sizes if file not in volume_files),
+        file_extra_info,
+        scan.file_sizes,
+    )
+    changed_sizes: dict[int, int] = {}
+    for file, size in scan.file_sizes.items():
+        if file in volume_files:
+            file_ids[file] = volume_files[file]["id"]
+            if volume_files[file]["size"] != size:
+                changed_sizes[file_ids[file]] = size
+    FilesDB.update_sizes(changed_sizes)
+
+    bindings = [(file_ids[file], issue_id) for file, issue_id in scan.bindings]
+    general_bindings = [
+        (file_ids[file], file_type) for file, file_type in scan.general_bindings
+    ]
 
     cursor = get_db()
 
@@ -1541,7 +1911,7 @@ def scan_files(
             newly_downloaded_issues.append(issue_id)
         issue_binding_count[issue_id] += 1
 
-    # This list is only valid if there isn't a filepath_filter
+    # This list is only valid if the scan isn't partial
     deleted_downloaded_issues: list[int] = []
     for _file_id, issue_id in delete_bindings:
         issue_binding_count[issue_id] -= 1
@@ -1551,14 +1921,14 @@ def scan_files(
     del current_bindings
     del issue_binding_count
 
-    if not filepath_filter:
+    if not scan.partial:
         # Delete bindings that aren't in new bindings
         cursor.executemany(
             "DELETE FROM issues_files WHERE file_id = ? AND issue_id = ?;",
             delete_bindings,
         )
 
-        if settings.unmonitor_deleted_issues:
+        if Settings().sv.unmonitor_deleted_issues:
             cursor.executemany(
                 "UPDATE issues SET monitored = 0 WHERE id = ?;",
                 ((issue_id,) for issue_id in deleted_downloaded_issues),
@@ -1570,7 +1940,7 @@ def scan_files(
         add_bindings,
     )
     if update_websocket:
-        if not filepath_filter and (
+        if not scan.partial and (
             deleted_downloaded_issues or newly_downloaded_issues
         ):
             WebSocket().update_downloaded_status(
@@ -1579,13 +1949,13 @@ def scan_files(
                 downloaded_issues=newly_downloaded_issues,
             )
 
-        elif filepath_filter and newly_downloaded_issues:
+        elif scan.partial and newly_downloaded_issues:
             WebSocket().update_downloaded_status(
                 volume_id, downloaded_issues=newly_downloaded_issues
             )
 
     # Delete bindings for general files that aren't in new bindings
-    if not filepath_filter:
+    if not scan.partial:
         delete_general_bindings = (
             (b[0],) for b in general_files if b not in general_bindings
         )
@@ -1604,65 +1974,181 @@ def scan_files(
         ((b[0], b[1], volume_id) for b in general_bindings),
     )
 
+    return
+
+
+def scan_files(
+    volume_id: int,
+    filepath_filter: list[str] = [],
+    del_unmatched_files: bool = True,
+    update_websocket: bool = False,
+    file_extra_info: FileExtraInfo | FileData | None = None,
+) -> None:
+    """Scan inside the volume folder for files and map them to issues.
+
+    Args:
+        volume_id (int): The ID of the volume to scan for.
+
+        filepath_filter (List[str], optional): Only scan specific files.
+        Intended for adding files to a volume only.
+            Defaults to [].
+
+        del_unmatched_files (bool, optional): Delete file entries in the DB
+        that aren't linked to anything anymore.
+            Defaults to True.
+
+        update_websocket (bool, optional): Send websocket messages on changes
+        about the download status of the issues.
+            Defaults to False.
+    """
+    scan = _scan_volume_folder(volume_id, filepath_filter)
+    if scan is None:
+        return
+
+    _apply_volume_scan(scan, update_websocket, file_extra_info)
+
     if del_unmatched_files:
         FilesDB.delete_unmatched_files()
 
     commit()
+    return
 
-    for file_id, _issue_id in bindings:
-        file_data = FilesDB.fetch(file_id=file_id)[0]
-        new_size = stat(file_data["filepath"]).st_size
-        if new_size != file_data["size"]:
-            FilesDB.update(file_id, {"size": new_size})
 
-    if settings.delete_empty_folders:
-        delete_empty_child_folders(volume_data.folder, skip_hidden_folders=True)
-        if (
-            not list_files(volume_data.folder)
-            and not settings.create_empty_volume_folders
-        ):
-            delete_empty_parent_folders(
-                volume_data.folder, RootFolders()[volume_data.root_folder]
-            )
+async def _scrape_cv_volume(
+    session: AsyncSession, site_url: str, page: CVVolumePage | None
+) -> CVVolumePage | None:
+    """Get the issue count shown on the CV page of a volume. The page is only
+    read up to the header that contains the issue count.
 
-    return
+    Args:
+        session (AsyncSession): The session to make the request with.
+        site_url (str): The URL of the CV page of the volume.
+        page (Union[CVVolumePage, None]): The result of the previous time the
+        page was scraped, used to only download the page if it changed.
+
+    Returns:
+        Union[CVVolumePage, None]: The result, or `None` if the page couldn't
+        be downloaded or didn't contain the issue count.
+    """
+    headers = {}
+    if page is not None:
+        if page["etag"]:
+            headers["If-None-Match"] = page["etag"]
+        if page["last_modified"]:
+            headers["If-Modified-Since"] = page["last_modified"]
+
+    try:
+        async with session.get(site_url, headers=headers) as response:
+            if response.status == 304 and page is not None:
+                return page
+
+            if not response.ok:
+                return None
+
+            decoder = getincrementaldecoder("utf-8")(errors="ignore")
+            body = ""
+            match = None
+            async for chunk in response.content.iter_chunked(16384):
+                # Also search the end of the previous part, in case the
+                # header was cut in half
+                start = max(0, len(body) - 512)
+                body += decoder.decode(chunk)
+                match = cv_issue_count_header_regex.search(body, start)
+                if match is not None:
+                    break
+
+            if match is None:
+                return None
+
+            issue_count = number_regex.search(
+                html_tag_regex.sub("", match.group(1))
+            )
+            if issue_count is None:
+                return None
 
+            return {
+                "issue_count": int(issue_count.group()),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
 
-async def _get_cv_page(session: AsyncSession, site_url: str):
-    req = await session.get(site_url)
-    return await req.text()
+    except ClientError:
+        LOGGER.warning(f"Failed to fetch the CV page {site_url}")
+        return None
 
 
 async def _scrape_cv_volumes(
-    volume_datas: list[VolumeMetadata],
-) -> list[tuple[int, int]]:
-    try:
-        async with AsyncSession() as session:
-            requests = await gather(
-                *[_get_cv_page(session, vd["site_url"]) for vd in volume_datas]
+    volume_datas: Mapping[int, VolumeMetadata],
+) -> dict[int, int]:
+    """Get the issue count shown on the CV page of volumes.
+
+    Args:
+        volume_datas (Mapping[int, VolumeMetadata]): Per volume ID its
+        metadata.
+
+    Returns:
+        Dict[int, int]: Per volume ID the issue count. Volumes of which the
+        page couldn't be scraped are left out.
+    """
+    pages = CVVolumePagesDB.fetch(volume_datas.keys())
+    new_pages: dict[int, CVVolumePage] = {}
+    queue = iter(volume_datas.items())
+
+    async def worker(session: AsyncSession) -> None:
+        # The workers share the queue, so every volume is scraped once
+        for volume_id, volume_data in queue:
+            page = await _scrape_cv_volume(
+                session, volume_data["site_url"], pages.get(volume_id)
+            )
+            if page is not None:
+                new_pages[volume_id] = page
+
+    async with AsyncSession() as session:
+        await gather(
+            *(
+                worker(session)
+                for _ in range(
+                    min(Constants.CV_SCRAPE_WORKERS, len(volume_datas))
+                )
             )
-    except ClientConnectorError as e:
-        LOGGER.info(e)
-        await sleep(Constants.CV_BRAKE_TIME)
-        return await _scrape_cv_volumes(volume_datas)
+        )
+
+    CVVolumePagesDB.store(new_pages)
+    return {
+        volume_id: page["issue_count"] for volume_id, page in new_pages.items()
+    }
 
-    results = []
 
-    for index, req in enumerate(requests):
-        soup = BeautifulSoup(req, "html.parser")
-        header = soup.select_one("h2.header-border")
-        if header is not None:
-            match = re.search(r"\d+", header.get_text())
-            if match:
-                issue_count = int(match.group())
-                results.append((index, issue_count))
-    return results
+def get_volumes_to_refresh(allow_skipping: bool = True) -> list[int]:
+    """Get the volumes that a refresh of the whole library would refresh.
+
+    Args:
+        allow_skipping (bool, optional): Leave out volumes that have been
+        updated in the last 24 hours.
+            Defaults to True.
+
+    Returns:
+        List[int]: The IDs of the volumes, least recently updated first.
+    """
+    one_day_ago = datetime.now() - ONE_DAY
+    return first_of_subarrays(
+        get_db().execute(
+            """
+            SELECT id
+            FROM volumes
+            WHERE last_cv_fetch <= ?
+            ORDER BY last_cv_fetch ASC;
+            """,
+            (one_day_ago.timestamp() if allow_skipping else float("inf"),),
+        )
+    )
 
 
 def refresh_and_scan(
     volume_id: int | None = None,
     update_websocket: bool = False,
     allow_skipping: bool = True,
+    volume_ids: Sequence[int] | None = None,
 ) -> None:
     """Refresh and scan one or more volumes.
 
@@ -1677,8 +2163,23 @@ def refresh_and_scan(
             Defaults to False.
 
         allow_skipping (bool, optional): Skip volumes that have been updated in
-        the last 24 hours or that still have the same amount of issues.
+        the last 24 hours or that still have the same amount of issues. When
+        refreshing multiple volumes, only the volumes and issues that have
+        been updated on CV since the volume was last fetched are requested
+        (delta refresh).
             Defaults to True.
+
+        volume_ids (Union[Sequence[int], None], optional): Refresh and scan
+        only these volumes, as one unit of a larger refresh. They're not
+        skipped based on when they were last updated, the library isn't
+        cleaned up afterwards (see `finish_library_scan()`) and reaching the
+        rate limit raises instead of refreshing the volumes partially.
+            Defaults to None.
+
+    Raises:
+        CVRateLimitReached: The ComicVine rate limit is reached. Only raised
+        when `volume_ids` is given, or when it's reached while fetching the
+        volumes or fetching the issues of volumes with many issues.
     """
     cursor = get_db()
 
@@ -1696,6 +2197,17 @@ def refresh_and_scan(
             (volume_id,),
         )
 
+    elif volume_ids is not None:
+        cursor.execute(
+            """
+            SELECT comicvine_id, id, last_cv_fetch, marvel_id, special_version
+            FROM volumes
+            WHERE id IN (SELECT value FROM json_each(?))
+            ORDER BY last_cv_fetch ASC;
+            """,
+            (dumps(list(volume_ids)),),
+        )
+
     elif not allow_skipping:
         cursor.execute("""
             SELECT comicvine_id, id, last_cv_fetch, marvel_id, special_version
@@ -1728,24 +2240,43 @@ def refresh_and_scan(
     if not cv_to_id_fetch:
         return
 
-    # Update volumes
+    # Update volumes. With a delta refresh, CV is only asked for the volumes
+    # that have been updated since their last fetch, which acts as the sync
+    # watermark of the volume.
+    delta_refresh = not volume_id and allow_skipping
+    last_fetches = (
+        {cv_id: e[1] for cv_id, e in cv_to_id_fetch.items()}
+        if delta_refresh
+        else None
+    )
+
     cv = ComicVine()
     volume_datas = filtered_volume_datas = run(
-        cv.fetch_volumes(tuple(cv_to_id_fetch.keys()))
+        cv.fetch_volumes(tuple(cv_to_id_fetch.keys()), last_fetches)
     )
 
     # scrape website to compare issue count and delete from cache if different
-    removed_from_cache = False
-    for index, issue_count in run(_scrape_cv_volumes(volume_datas)):
-        vd = volume_datas[index]
-        if vd["issue_count"] != issue_count:
-            removed_from_cache = True
-            cv.remove_from_cache("issues", vd["comicvine_id"])
-
-    if removed_from_cache:
-        volume_datas = filtered_volume_datas = run(
-            cv.fetch_volumes(tuple(cv_to_id_fetch.keys()))
-        )
+    id_to_volume_data = {
+        cv_to_id_fetch[vd["comicvine_id"]][0]: vd for vd in volume_datas
+    }
+    outdated_cv_ids = [
+        id_to_volume_data[v_id]["comicvine_id"]
+        for v_id, issue_count in run(
+            _scrape_cv_volumes(id_to_volume_data)
+        ).items()
+        if id_to_volume_data[v_id]["issue_count"] != issue_count
+    ]
+
+    if outdated_cv_ids:
+        cv.remove_from_cache("volumes", outdated_cv_ids)
+        cv.remove_from_cache("issues", outdated_cv_ids)
+        refetched_datas = {
+            vd["comicvine_id"]: vd
+            for vd in run(cv.fetch_volumes(outdated_cv_ids))
+        }
+        volume_datas = filtered_volume_datas = [
+            refetched_datas.get(vd["comicvine_id"], vd) for vd in volume_datas
+        ]
 
     if not volume_id and allow_skipping:
         cv_id_to_issue_count: dict[int, int] = dict(
@@ -1755,10 +2286,10 @@ def refresh_and_scan(
                 FROM volumes v
                 LEFT JOIN issues i
                 ON v.id = i.volume_id
-                WHERE v.last_cv_fetch <= ?
-                GROUP BY i.volume_id;
+                WHERE v.id IN (SELECT value FROM json_each(?))
+                GROUP BY v.id;
                 """,
-                (one_day_ago.timestamp(),),
+                (dumps([v[0] for v in cv_to_id_fetch.values()]),),
             )
         )
 
@@ -1770,6 +2301,40 @@ def refresh_and_scan(
             <= thirty_days_ago.timestamp()
         ]
 
+    # Fetch the issues before writing anything, so that reaching the rate
+    # limit leaves the volumes untouched
+    issue_datas = run(
+        cv.fetch_issues(
+            tuple(vd["comicvine_id"] for vd in filtered_volume_datas),
+            allow_partial=volume_ids is None,
+        )
+    )
+
+    # Of the other volumes, only fetch the issues that have been updated.
+    # Unchanged volumes are then in sync and get their watermark moved up.
+    unchanged_volume_ids: list[int] = []
+    if delta_refresh:
+        fully_fetched = {vd["comicvine_id"] for vd in filtered_volume_datas}
+        try:
+            issue_datas += run(
+                cv.fetch_issues(
+                    tuple(c for c in cv_to_id_fetch if c not in fully_fetched),
+                    allow_partial=False,
+                    updated_since=last_fetches,
+                )
+            )
+
+            changed_cv_ids = {vd["comicvine_id"] for vd in volume_datas}
+            unchanged_volume_ids = [
+                e[0]
+                for cv_id, e in cv_to_id_fetch.items()
+                if cv_id not in changed_cv_ids
+            ]
+
+        except CVRateLimitReached:
+            if volume_ids is not None:
+                raise
+
     cursor.executemany(
         """
         UPDATE volumes
@@ -1800,17 +2365,32 @@ def refresh_and_scan(
         ),
     )
 
+    cursor.execute(
+        """
+        UPDATE volumes
+        SET last_cv_fetch = ?
+        WHERE id IN (SELECT value FROM json_each(?));
+        """,
+        (current_time.timestamp(), dumps(unchanged_volume_ids)),
+    )
+
+    Library().update_search_index(
+        cv_to_id_fetch[vd["comicvine_id"]][0] for vd in volume_datas
+    )
+
     cursor.executemany(
         """
         UPDATE volumes_covers
         SET
-            cover = :cover
+            cover = :cover,
+            cover_hash = :cover_hash
         WHERE volume_id = :volume_id;
         """,
         (
             {
                 "volume_id": cv_to_id_fetch[vd["comicvine_id"]][0],
                 "cover": vd["cover"],
+                "cover_hash": hash_blob(vd["cover"]),
             }
             for vd in volume_datas
         ),
@@ -1866,11 +2446,6 @@ def refresh_and_scan(
     commit()
 
     # Update issues
-    issue_datas = run(
-        cv.fetch_issues(
-            tuple(vd["comicvine_id"] for vd in filtered_volume_datas)
-        )
-    )
     monitor_issues_volume_ids: set[int] = set(
         first_of_subarrays(
             cursor.execute(
@@ -1930,37 +2505,40 @@ def refresh_and_scan(
             )
         )
 
-    for vd in filtered_volume_datas:
-        if (
-            len(volume_issues_fetched.get(vd["comicvine_id"]) or tuple())
-            != vd["issue_count"]
+    # Only for volumes of which all issues have been fetched (not guaranteed
+    # because of CV API rate limit).
+    complete_volumes: dict[int, int] = {
+        cv_to_id_fetch[vd["comicvine_id"]][0]: vd["comicvine_id"]
+        for vd in filtered_volume_datas
+        if len(volume_issues_fetched.get(vd["comicvine_id"]) or tuple())
+        == vd["issue_count"]
+    }
+
+    stale_issues: dict[int, list[int]] = {}
+    for v_id, issue_cv, issue_id in cursor.execute(
+        """
+        SELECT volume_id, comicvine_id, id
+        FROM issues
+        WHERE volume_id IN (SELECT value FROM json_each(?));
+        """,
+        (dumps(list(complete_volumes)),),
+    ).fetchall():
+        if issue_cv not in volume_issues_fetched.get(
+            complete_volumes[v_id], set()
         ):
-            continue
+            # Issue is in database but not in CV, so remove
+            LOGGER.debug(
+                f"Deleting issue with ID {issue_id} and CV ID {issue_cv}"
+            )
+            stale_issues.setdefault(v_id, []).append(issue_id)
 
-        # All issues of the volume have been fetched (not guaranteed because of
-        # CV API rate limit).
-        issue_cv_to_id = dict(
-            cursor.execute(
-                """
-            SELECT i.comicvine_id, i.id
-            FROM issues i
-            INNER JOIN volumes v
-            ON i.volume_id = v.id
-            WHERE v.comicvine_id = ?;
-            """,
-                (vd["comicvine_id"],),
-            ).fetchall()
-        )
-        for issue_cv, issue_id in issue_cv_to_id.items():
-            if issue_cv not in volume_issues_fetched[vd["comicvine_id"]]:
-                # Issue is in database but not in CV, so remove
-                LOGGER.debug(
-                    f"Deleting issue with ID {issue_id} and CV ID {issue_cv}"
-                )
-                Issue(issue_id).delete()
-                commit()
+    delete_issues(stale_issues)
+    commit()
 
     # Refresh Special Version
+    special_versions = determine_special_versions(
+        cv_to_id_fetch[vd["comicvine_id"]][0] for vd in volume_datas
+    )
     cursor.executemany(
         """
         UPDATE volumes
@@ -1968,13 +2546,8 @@ def refresh_and_scan(
         WHERE id = :id AND special_version_locked = 0;
         """,
         tuple(
-            {
-                "special_version": determine_special_version(
-                    cv_to_id_fetch[vd["comicvine_id"]][0]
-                ),
-                "id": cv_to_id_fetch[vd["comicvine_id"]][0],
-            }
-            for vd in volume_datas
+            {"special_version": special_version, "id": volume_id}
+            for volume_id, special_version in special_versions.items()
         ),
     )
     commit()
@@ -1984,33 +2557,53 @@ def refresh_and_scan(
         scan_files(volume_id, update_websocket=update_websocket)
 
     else:
-        v_ids = [
-            (v[0], [], False, update_websocket) for v in cv_to_id_fetch.values()
-        ]
+        v_ids = [v[0] for v in cv_to_id_fetch.values()]
         total_count = len(v_ids)
 
         if not total_count:
             return
 
+        # The processes only walk the folders and match the files, which is
+        # the slow part. Their results are written from here in batches, so
+        # that they don't all compete for the database lock.
+        ws = WebSocket()
         with PortablePool(
             max_processes=min(
                 Constants.DB_MAX_CONCURRENT_CONNECTIONS, total_count
             )
         ) as pool:
-            if update_websocket:
-                ws = WebSocket()
-                for idx, _ in enumerate(
-                    pool.istarmap_unordered(scan_files, v_ids)
-                ):
+            for idx, scan in enumerate(
+                pool.imap_unordered(_scan_volume_folder, v_ids)
+            ):
+                if scan is not None:
+                    _apply_volume_scan(scan, update_websocket)
+
+                if (idx + 1) % Constants.DB_SCAN_BATCH_SIZE == 0:
+                    commit()
+
+                if update_websocket and volume_ids is None:
                     ws.update_task_status(
                         message=f"Scanned files for volume {idx + 1}/{total_count}"
                     )
 
-            else:
-                pool.starmap(scan_files, v_ids)
+        commit()
+        if volume_ids is None:
+            finish_library_scan()
 
-        FilesDB.delete_unmatched_files()
+    return
+
+
+def finish_library_scan() -> None:
+    """Clean up after all volumes in the library have been scanned. Files that
+    aren't matched to anything anymore are removed from the database, and the
+    volume statistics are checked.
+    """
+    FilesDB.delete_unmatched_files()
+    commit()
 
+    # The statistics are maintained incrementally, so use this full pass
+    # over the library to catch and repair any drift.
+    VolumeStatsDB.check_consistency()
     return
 
 
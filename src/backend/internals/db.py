@@ -4,31 +4,43 @@ Setting up the database, handling connections, using it and closing it.
 
 from __future__ import annotations
 
+from collections import deque
 from collections.abc import Iterable, Iterator
-from os.path import dirname, exists, isdir, join
+from itertools import chain
+from os.path import abspath, dirname, exists, getsize, isdir, join
+from pathlib import Path
+from queue import Empty, LifoQueue
+from re import compile
 from sqlite3 import (
     PARSE_DECLTYPES,
+    SQLITE_BUSY,
+    SQLITE_LOCKED,
     Connection,
     Cursor,
+    Error,
+    OperationalError,
     ProgrammingError,
     Row,
     register_adapter,
     register_converter,
 )
-from threading import current_thread
-from time import time
-from typing import Any
+from sys import _getframe
+from threading import Lock, current_thread
+from time import perf_counter, sleep, time
+from typing import Any, Literal
 
 from flask import g
 
 from backend.base.definitions import (
     Constants,
     DateType,
+    DBSynchronous,
+    DBTempStore,
     SeedingHandling,
     SpecialVersion,
 )
 from backend.base.helpers import CommaList, current_thread_id
-from backend.base.logging import LOGGER, set_log_level
+from backend.base.logging import LOGGER, SLOW_QUERY_LOGGER, set_log_level
 
 
 class KapowarrCursor(Cursor):
@@ -39,13 +51,61 @@ class KapowarrCursor(Cursor):
         return super().lastrowid or 1
 
     @property
-    def connection(self) -> DBConnection:
+    def connection(self) -> BaseDBConnection:
         return super().connection  # pyright: ignore
 
     def __init__(self, cursor: DBConnection, /) -> None:
         super().__init__(cursor)
         return
 
+    def _can_retry(self, e: OperationalError) -> bool:
+        """Whether a statement that failed because the database was busy or
+        locked can safely be run again. That is only the case when it wasn't
+        part of a transaction, as a failed transaction has to be redone
+        completely.
+        """
+        return (e.sqlite_errorcode & 0xFF) in (
+            SQLITE_BUSY,
+            SQLITE_LOCKED,
+        ) and not self.connection.in_transaction
+
+    def _retry(self, method: Any, *args: Any) -> KapowarrCursor:
+        attempt = 0
+        while True:
+            attempt += 1
+            DBConnectionStats.record_retry()
+            sleep(0.1 * 2**attempt)
+            try:
+                return method(*args)
+            except OperationalError as e:
+                if attempt >= Constants.DB_BUSY_RETRIES or not self._can_retry(
+                    e
+                ):
+                    DBConnectionStats.record_retry_failure()
+                    raise
+
+    def execute(self, sql: str, parameters: Any = (), /) -> KapowarrCursor:
+        try:
+            return super().execute(sql, parameters)
+        except OperationalError as e:
+            if not self._can_retry(e):
+                raise
+        return self._retry(super().execute, sql, parameters)
+
+    def executemany(
+        self, sql: str, seq_of_parameters: Any, /
+    ) -> KapowarrCursor:
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            # Generators can't be consumed again, so they can't be retried
+            return super().executemany(sql, seq_of_parameters)
+
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        except OperationalError as e:
+            if not self._can_retry(e):
+                raise
+        return self._retry(super().executemany, sql, seq_of_parameters)
+
     def fetchonedict(self) -> dict[str, Any] | None:
         """Same as `fetchone` but convert the Row object to a dict.
 
@@ -92,7 +152,7 @@ class KapowarrCursor(Cursor):
     def __enter__(self):
         """Start a transaction"""
         self.connection.isolation_level = None
-        self.execute("BEGIN TRANSACTION;")
+        self.execute(f"BEGIN {self.connection.transaction_mode} TRANSACTION;")
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -103,7 +163,450 @@ class KapowarrCursor(Cursor):
             else:
                 self.execute("COMMIT;")
 
-        self.connection.isolation_level = "DEFERRED"
+        self.connection.isolation_level = self.connection.transaction_mode
+        return
+
+
+# region Profiling
+statement_literal_regex = compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+statement_whitespace_regex = compile(r"\s+")
+
+
+def normalise_statement(sql: str) -> str:
+    """Reduce an SQL statement to a form where statements that only differ in
+    formatting or literal values are equal.
+
+    Args:
+        sql (str): The SQL statement.
+
+    Returns:
+        str: The normalised statement.
+    """
+    return statement_whitespace_regex.sub(
+        " ", statement_literal_regex.sub("?", sql)
+    ).strip()
+
+
+class StatementStats:
+    def __init__(self, statement: str) -> None:
+        self.statement = statement
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.total_rows = 0
+        self.callers: dict[str, int] = {}
+        self.timings: deque[float] = deque(
+            maxlen=Constants.DB_PROFILER_SAMPLE_SIZE
+        )
+        return
+
+    def add(self, duration: float, rows: int, caller: str) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.total_rows += rows
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+        self.timings.append(duration)
+        return
+
+    def todict(self) -> dict[str, Any]:
+        timings = sorted(self.timings)
+
+        def percentile(p: float) -> float:
+            return round(timings[int(p * (len(timings) - 1))] * 1000, 3)
+
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_time": round(self.total_time * 1000, 3),
+            "mean_time": round(self.total_time / self.count * 1000, 3),
+            "p50_time": percentile(0.5),
+            "p95_time": percentile(0.95),
+            "p99_time": percentile(0.99),
+            "max_time": round(self.max_time * 1000, 3),
+            "total_rows": self.total_rows,
+            "callers": self.callers,
+        }
+
+
+class QueryProfiler:
+    """Opt-in collection of timing statistics of the database statements that
+    are run in this process. Statements that take longer than the threshold
+    are written to the slow query log, together with their query plan.
+    All times are in milliseconds.
+    """
+
+    enabled = False
+    slow_query_threshold = 500  # ms
+
+    _lock = Lock()
+    _stats: dict[str, StatementStats] = {}
+    _slow_queries: deque[dict[str, Any]] = deque(
+        maxlen=Constants.DB_PROFILER_SLOW_QUERY_COUNT
+    )
+
+    @classmethod
+    def configure(cls, enabled: bool, slow_query_threshold: int) -> None:
+        """Turn the profiler on or off.
+
+        Args:
+            enabled (bool): Whether statements should be profiled.
+            slow_query_threshold (int): The amount of milliseconds after which
+            a statement is considered slow.
+        """
+        if enabled != cls.enabled:
+            LOGGER.info(
+                f"{'Enabling' if enabled else 'Disabling'} query profiling"
+            )
+        cls.enabled = enabled
+        cls.slow_query_threshold = slow_query_threshold
+        return
+
+    @classmethod
+    def record(
+        cls,
+        connection: BaseDBConnection,
+        sql: str,
+        parameters: Any,
+        duration: float,
+        rows: int,
+        caller: str,
+    ) -> None:
+        """Add a measurement of a statement.
+
+        Args:
+            connection (BaseDBConnection): The connection the statement ran
+            on.
+            sql (str): The statement.
+            parameters (Any): The parameters the statement ran with.
+            duration (float): The wall time in seconds, including fetching.
+            rows (int): The amount of rows returned or affected.
+            caller (str): The function that ran the statement.
+        """
+        statement = normalise_statement(sql)
+        with cls._lock:
+            stats = cls._stats.get(statement)
+            if stats is None:
+                stats = cls._stats[statement] = StatementStats(statement)
+            stats.add(duration, rows, caller)
+
+        if duration * 1000 < cls.slow_query_threshold:
+            return
+
+        try:
+            plan = "\n".join(
+                str(r[-1])
+                for r in Cursor(connection).execute(
+                    "EXPLAIN QUERY PLAN " + sql, parameters
+                )
+            )
+        except Error:
+            # E.g. statements that can't be explained, like BEGIN
+            plan = ""
+
+        slow_query = {
+            "statement": statement,
+            "time": round(duration * 1000, 3),
+            "rows": rows,
+            "caller": caller,
+            "query_plan": plan,
+            "ran_at": round(time()),
+        }
+        with cls._lock:
+            cls._slow_queries.append(slow_query)
+
+        SLOW_QUERY_LOGGER.warning(
+            f"Slow query ({slow_query['time']}ms, {rows} rows) "
+            f"from {caller}: {statement}\n{plan}"
+        )
+        return
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """Get the collected statistics.
+
+        Returns:
+            Dict[str, Any]: The statistics of every statement, sorted by
+            total time spent on them, and the most recent slow queries.
+        """
+        with cls._lock:
+            statements = [s.todict() for s in cls._stats.values()]
+            slow_queries = list(cls._slow_queries)
+
+        return {
+            "enabled": cls.enabled,
+            "slow_query_threshold": cls.slow_query_threshold,
+            "statements": sorted(
+                statements, key=lambda s: s["total_time"], reverse=True
+            ),
+            "slow_queries": slow_queries,
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Throw away all collected statistics"""
+        with cls._lock:
+            cls._stats.clear()
+            cls._slow_queries.clear()
+        return
+
+
+class ProfilingKapowarrCursor(KapowarrCursor):
+    """A cursor that reports to the `QueryProfiler`. The measurement of a
+    statement includes the time spent fetching its results, so it's finished
+    when the next statement is run or the cursor is closed.
+    """
+
+    def __init__(self, cursor: DBConnection, /) -> None:
+        super().__init__(cursor)
+        self._measurement: list | None = None
+        return
+
+    @staticmethod
+    def _caller() -> str:
+        frame = _getframe(2)
+        while frame.f_back is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+
+    def _start(self, sql: str, parameters: Any, duration: float) -> None:
+        # sql, parameters, duration, rows, caller
+        self._measurement = [
+            sql,
+            parameters,
+            duration,
+            max(self.rowcount, 0),
+            self._caller(),
+        ]
+        return
+
+    def _finish(self) -> None:
+        if self._measurement is None:
+            return
+        sql, parameters, duration, rows, caller = self._measurement
+        self._measurement = None
+        QueryProfiler.record(
+            self.connection, sql, parameters, duration, rows, caller
+        )
+        return
+
+    def _fetched(self, duration: float, rows: int) -> None:
+        if self._measurement is not None:
+            self._measurement[2] += duration
+            self._measurement[3] += rows
+        return
+
+    def execute(self, sql: str, parameters: Any = (), /) -> KapowarrCursor:
+        self._finish()
+        start = perf_counter()
+        super().execute(sql, parameters)
+        self._start(sql, parameters, perf_counter() - start)
+        return self
+
+    def executemany(
+        self, sql: str, seq_of_parameters: Any, /
+    ) -> KapowarrCursor:
+        self._finish()
+        # Keep the first set of parameters to explain the statement with
+        parameters_iter = iter(seq_of_parameters)
+        first_parameters = next(parameters_iter, None)
+        if first_parameters is not None:
+            parameters_iter = chain((first_parameters,), parameters_iter)
+
+        start = perf_counter()
+        super().executemany(sql, parameters_iter)
+        self._start(sql, first_parameters or (), perf_counter() - start)
+        return self
+
+    def executescript(self, sql_script: str, /) -> KapowarrCursor:
+        self._finish()
+        super().executescript(sql_script)
+        return self
+
+    def fetchone(self) -> Any:
+        start = perf_counter()
+        result = super().fetchone()
+        self._fetched(perf_counter() - start, result is not None)
+        return result
+
+    def fetchmany(self, size: int | None = 1) -> list[Any]:
+        start = perf_counter()
+        result = super().fetchmany(size)
+        self._fetched(perf_counter() - start, len(result))
+        return result
+
+    def fetchall(self) -> list[Any]:
+        start = perf_counter()
+        result = super().fetchall()
+        self._fetched(perf_counter() - start, len(result))
+        return result
+
+    def __next__(self) -> Any:
+        start = perf_counter()
+        try:
+            result = super().__next__()
+        except StopIteration:
+            self._fetched(perf_counter() - start, 0)
+            raise
+        self._fetched(perf_counter() - start, 1)
+        return result
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+        return
+
+
+# region Connection
+class DBConnectionStats:
+    """Metrics of the database connections: how long getting a read-only
+    connection from the pool took and how often statements had to be retried
+    because the database was busy. All times are in milliseconds.
+    """
+
+    _lock = Lock()
+    read_acquisitions = 0
+    read_waits = 0
+    read_wait_time = 0.0
+    read_max_wait_time = 0.0
+    read_pool_exhausted = 0
+    busy_retries = 0
+    busy_failures = 0
+
+    @classmethod
+    def record_read_acquisition(
+        cls, wait_time: float, waited: bool, exhausted: bool
+    ) -> None:
+        """Add a measurement of getting a connection from the read-only pool.
+
+        Args:
+            wait_time (float): The time it took in seconds.
+            waited (bool): Whether all connections were in use, so it had to
+            wait on one being released.
+            exhausted (bool): Whether no connection was released in time.
+        """
+        with cls._lock:
+            cls.read_acquisitions += 1
+            cls.read_waits += waited
+            cls.read_wait_time += wait_time
+            cls.read_max_wait_time = max(cls.read_max_wait_time, wait_time)
+            cls.read_pool_exhausted += exhausted
+        return
+
+    @classmethod
+    def record_retry(cls) -> None:
+        """Register that a statement is retried because the database was busy"""
+        with cls._lock:
+            cls.busy_retries += 1
+        return
+
+    @classmethod
+    def record_retry_failure(cls) -> None:
+        """Register that a statement failed, even after retrying it"""
+        with cls._lock:
+            cls.busy_failures += 1
+        return
+
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """Get the collected metrics.
+
+        Returns:
+            Dict[str, Any]: The metrics and the current state of the pool.
+        """
+        with cls._lock:
+            return {
+                "read_pool_size": ReadOnlyDBPool.size,
+                "read_pool_open": ReadOnlyDBPool.open_connections,
+                "read_pool_idle": ReadOnlyDBPool.idle.qsize(),
+                "read_acquisitions": cls.read_acquisitions,
+                "read_waits": cls.read_waits,
+                "read_mean_wait_time": round(
+                    cls.read_wait_time / (cls.read_acquisitions or 1) * 1000,
+                    3,
+                ),
+                "read_max_wait_time": round(cls.read_max_wait_time * 1000, 3),
+                "read_pool_exhausted": cls.read_pool_exhausted,
+                "busy_retries": cls.busy_retries,
+                "busy_failures": cls.busy_failures,
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        """Throw away all collected metrics"""
+        with cls._lock:
+            cls.read_acquisitions = 0
+            cls.read_waits = 0
+            cls.read_wait_time = 0.0
+            cls.read_max_wait_time = 0.0
+            cls.read_pool_exhausted = 0
+            cls.busy_retries = 0
+            cls.busy_failures = 0
+        return
+
+
+class DBPerformanceProfile:
+    """The PRAGMAs that tune the performance of SQLite. They're set per
+    connection, so they're applied to every connection before it's used.
+    """
+
+    version = 0
+    "Increased on every change, so connections know to apply it again"
+
+    pragmas: dict[str, str | int] = {}
+
+    @classmethod
+    def configure(
+        cls,
+        synchronous: DBSynchronous,
+        cache_size: int,
+        mmap_size: int,
+        temp_store: DBTempStore,
+        wal_autocheckpoint: int,
+    ) -> None:
+        """Change the profile.
+
+        Args:
+            synchronous (DBSynchronous): How thoroughly to make sure that
+            changes have reached the disk.
+            cache_size (int): The size of the page cache per connection in MiB.
+            mmap_size (int): How much of the database file to map into memory
+            in MiB.
+            temp_store (DBTempStore): Where to store temporary tables.
+            wal_autocheckpoint (int): After how many pages in the write-ahead
+            log it is checkpointed. 0 to turn off.
+        """
+        pragmas: dict[str, str | int] = {
+            "synchronous": synchronous.name,
+            "cache_size": -cache_size * 1024,
+            "mmap_size": mmap_size * 1024 * 1024,
+            "temp_store": temp_store.name,
+            "wal_autocheckpoint": wal_autocheckpoint,
+            "journal_size_limit": Constants.DB_WAL_SIZE_LIMIT,
+        }
+        if pragmas != cls.pragmas:
+            LOGGER.debug(f"Setting database performance profile: {pragmas}")
+            cls.pragmas = pragmas
+            cls.version += 1
+        return
+
+    @classmethod
+    def apply(cls, connection: BaseDBConnection) -> None:
+        """Set the PRAGMAs of the profile on a connection. Some can't be set
+        inside a transaction, so it's postponed in that case.
+
+        Args:
+            connection (BaseDBConnection): The connection to apply it to.
+        """
+        if connection.in_transaction:
+            return
+
+        cursor = Cursor(connection)
+        for pragma, value in cls.pragmas.items():
+            cursor.execute(f"PRAGMA {pragma} = {value};")
+        cursor.close()
+
+        connection.profile_version = cls.version
         return
 
 
@@ -128,24 +631,15 @@ class DBConnectionManager(type):
         return
 
 
-class DBConnection(Connection, metaclass=DBConnectionManager):
-    file = ""
+class BaseDBConnection(Connection):
+    transaction_mode: Literal["DEFERRED", "IMMEDIATE", "EXCLUSIVE"] = "DEFERRED"
+    "The type of transactions that are started on the connection"
 
-    def __init__(self, *, timeout: float = Constants.DB_TIMEOUT) -> None:
-        """Create a connection with a database
+    cursors_key = "cursors"
+    "The attribute of `g` that the cursors of the connection are stored in"
 
-        Args:
-            timeout (float, optional): How long to wait before giving up
-                on a command.
-                Defaults to Constants.DB_TIMEOUT.
-        """
-        self.closed = False
-        LOGGER.debug(f"Creating connection {self}")
-        super().__init__(
-            self.file, timeout=timeout, detect_types=PARSE_DECLTYPES
-        )
-        super().cursor().execute("PRAGMA foreign_keys = ON;")
-        return
+    profile_version = 0
+    "The version of the `DBPerformanceProfile` that is applied"
 
     def cursor(self, force_new: bool = False) -> KapowarrCursor:  # pyright: ignore
         """Get a database cursor from the connection.
@@ -158,21 +652,30 @@ class DBConnection(Connection, metaclass=DBConnectionManager):
         Returns:
             KapowarrCursor: The database cursor.
         """
-        if not hasattr(g, "cursors"):
-            g.cursors = []
+        if self.profile_version != DBPerformanceProfile.version:
+            DBPerformanceProfile.apply(self)
+
+        cursors: list[KapowarrCursor] | None = g.get(self.cursors_key)
+        if cursors is None:
+            cursors = []
+            setattr(g, self.cursors_key, cursors)
+
+        cursor_class = (
+            ProfilingKapowarrCursor if QueryProfiler.enabled else KapowarrCursor
+        )
 
-        if not g.cursors:
-            c = KapowarrCursor(self)
+        if not cursors:
+            c = cursor_class(self)  # pyright: ignore
             c.row_factory = Row
-            g.cursors.append(c)
+            cursors.append(c)
 
         if not force_new:
-            return g.cursors[0]
+            return cursors[0]
         else:
-            c = KapowarrCursor(self)
+            c = cursor_class(self)  # pyright: ignore
             c.row_factory = Row
-            g.cursors.append(c)
-            return g.cursors[-1]
+            cursors.append(c)
+            return cursors[-1]
 
     def close(self) -> None:
         """Close the database connection"""
@@ -185,6 +688,158 @@ class DBConnection(Connection, metaclass=DBConnectionManager):
         return f"<{self.__class__.__name__}; {current_thread().name}; {id(self)}; closed={self.closed}>"
 
 
+class DBConnection(BaseDBConnection, metaclass=DBConnectionManager):
+    file = ""
+
+    # Take the write lock at the start of a transaction, instead of upgrading
+    # to it halfway. Writers then wait on each other in turn, instead of
+    # failing with a busy error when another connection wrote in between.
+    transaction_mode = "IMMEDIATE"
+
+    def __init__(self, *, timeout: float = Constants.DB_TIMEOUT) -> None:
+        """Create a connection with a database
+
+        Args:
+            timeout (float, optional): How long to wait before giving up
+                on a command.
+                Defaults to Constants.DB_TIMEOUT.
+        """
+        self.closed = False
+        LOGGER.debug(f"Creating connection {self}")
+        super().__init__(
+            self.file,
+            timeout=timeout,
+            detect_types=PARSE_DECLTYPES,
+            isolation_level=self.transaction_mode,
+        )
+        super().cursor().execute("PRAGMA foreign_keys = ON;")
+        return
+
+
+class ReadOnlyDBConnection(BaseDBConnection):
+    cursors_key = "read_only_cursors"
+
+    def __init__(
+        self, file: str, *, timeout: float = Constants.DB_TIMEOUT
+    ) -> None:
+        """Create a read-only connection with a database. The connection can
+        be used by multiple threads, but not at the same time.
+
+        Args:
+            file (str): The database file.
+
+            timeout (float, optional): How long to wait before giving up
+                on a command.
+                Defaults to Constants.DB_TIMEOUT.
+        """
+        self.closed = False
+        self.generation = ReadOnlyDBPool.generation
+        LOGGER.debug(f"Creating connection {self}")
+        super().__init__(
+            Path(abspath(file)).as_uri() + "?mode=ro",
+            uri=True,
+            timeout=timeout,
+            detect_types=PARSE_DECLTYPES,
+            isolation_level=self.transaction_mode,
+            check_same_thread=False,
+        )
+        super().cursor().execute("PRAGMA query_only = ON;")
+        return
+
+
+class ReadOnlyDBPool:
+    """A pool of read-only connections. They only ever read the committed
+    state of the database, so in WAL mode they never wait on the writer and
+    never hold it up.
+    """
+
+    size = Constants.DB_READ_POOL_SIZE
+    idle: LifoQueue[ReadOnlyDBConnection] = LifoQueue()
+    open_connections = 0
+    generation = 0
+
+    _lock = Lock()
+
+    @classmethod
+    def acquire(cls) -> ReadOnlyDBConnection | None:
+        """Get a connection from the pool. If all connections are in use, wait
+        for one to be released.
+
+        Returns:
+            Union[ReadOnlyDBConnection, None]: The connection, or `None` if
+            none became available in time.
+        """
+        start = perf_counter()
+        connection = None
+        waited = False
+        try:
+            connection = cls.idle.get_nowait()
+
+        except Empty:
+            with cls._lock:
+                can_open = cls.open_connections < cls.size
+                if can_open:
+                    cls.open_connections += 1
+
+            if can_open:
+                try:
+                    connection = ReadOnlyDBConnection(DBConnection.file)
+                except Error as e:
+                    LOGGER.warning(f"Failed to open read-only connection: {e}")
+                    with cls._lock:
+                        cls.open_connections -= 1
+
+            else:
+                waited = True
+                try:
+                    connection = cls.idle.get(timeout=Constants.DB_TIMEOUT)
+                except Empty:
+                    pass
+
+        DBConnectionStats.record_read_acquisition(
+            perf_counter() - start, waited, waited and connection is None
+        )
+        return connection
+
+    @classmethod
+    def release(cls, connection: ReadOnlyDBConnection) -> None:
+        """Give a connection back to the pool.
+
+        Args:
+            connection (ReadOnlyDBConnection): The connection to give back.
+        """
+        if connection.generation != cls.generation:
+            # Connection of before the pool was closed
+            connection.close()
+            return
+
+        if connection.closed:
+            with cls._lock:
+                cls.open_connections -= 1
+            return
+
+        if connection.in_transaction:
+            connection.rollback()
+
+        cls.idle.put(connection)
+        return
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close all connections of the pool. Connections that are in use are
+        closed once they're released.
+        """
+        with cls._lock:
+            cls.generation += 1
+            cls.open_connections = 0
+            while True:
+                try:
+                    cls.idle.get_nowait().close()
+                except Empty:
+                    break
+        return
+
+
 def set_db_location(db_folder: str | None) -> None:
     """Setup database location. Create folder for database and set location for
     `db.DBConnection`.
@@ -212,6 +867,7 @@ def set_db_location(db_folder: str | None) -> None:
     create_folder(dirname(db_file_location))
 
     DBConnection.file = db_file_location
+    ReadOnlyDBPool.close_all()
 
     return
 
@@ -227,9 +883,46 @@ def get_db(force_new: bool = False) -> KapowarrCursor:
     Returns:
         KapowarrCursor: Database cursor instance that outputs Row objects.
     """
+    if g.get("read_only_db"):
+        return get_read_only_db(force_new=force_new)
     return DBConnection().cursor(force_new=force_new)
 
 
+def get_read_only_db(force_new: bool = False) -> KapowarrCursor:
+    """Get a database cursor of a read-only connection. The connection is
+    taken from the pool on first use in the app context, and given back when
+    the context ends. If the pool has no connection available in time,
+    a cursor of the normal connection is returned instead.
+
+    Args:
+        force_new (bool, optional): Decides whether a new cursor is
+            returned instead of the standard one.
+            Defaults to False.
+
+    Returns:
+        KapowarrCursor: Database cursor instance that outputs Row objects.
+    """
+    connection: ReadOnlyDBConnection | None = g.get("read_only_connection")
+    if connection is None:
+        connection = ReadOnlyDBPool.acquire()
+        if connection is None:
+            g.read_only_db = False
+            return DBConnection().cursor(force_new=force_new)
+        g.read_only_connection = connection
+
+    return connection.cursor(force_new=force_new)
+
+
+def use_read_only_db() -> None:
+    """Make `get_db()` return cursors of a read-only connection for the rest
+    of the app context. Only use this for contexts that don't write to the
+    database, like GET requests. They don't see uncommitted changes of other
+    contexts and in return don't have to wait on them.
+    """
+    g.read_only_db = True
+    return
+
+
 def commit() -> None:
     """Commit the database changes"""
     get_db().connection.commit()
@@ -267,12 +960,17 @@ def close_db(_e: BaseException | None = None) -> None:
     Args:
         e (Union[None, BaseException], optional): Error. Defaults to None.
     """
+    if hasattr(g, "read_only_connection"):
+        for c in g.pop(ReadOnlyDBConnection.cursors_key, []):
+            c.close()
+        ReadOnlyDBPool.release(g.pop("read_only_connection"))
+
     if not hasattr(g, "cursors"):
         return
 
     try:
         cursors = g.cursors
-        db: DBConnection = cursors[0].connection
+        db: BaseDBConnection = cursors[0].connection
         for c in cursors:
             c.close()
         delattr(g, "cursors")
@@ -286,6 +984,194 @@ def close_db(_e: BaseException | None = None) -> None:
     return
 
 
+def iter_blob(table: str, column: str, row: int) -> Iterator[bytes]:
+    """Stream a BLOB out of the database in chunks, without loading all of it
+    into memory. The BLOB is read on a read-only connection of its own, which
+    is only taken when iteration starts and given back when it ends. That way
+    the BLOB can still be streamed after the app context has ended, like when
+    it's the body of a response.
+
+    Args:
+        table (str): The table that the BLOB is in.
+        column (str): The column that the BLOB is in.
+        row (int): The rowid of the row that the BLOB is in.
+
+    Yields:
+        bytes: The next chunk of the BLOB.
+    """
+    connection = ReadOnlyDBPool.acquire()
+    pooled = connection is not None
+    if connection is None:
+        connection = ReadOnlyDBConnection(DBConnection.file)
+
+    try:
+        with connection.blobopen(table, column, row, readonly=True) as blob:
+            while chunk := blob.read(Constants.DB_BLOB_CHUNK_SIZE):
+                yield chunk
+
+    finally:
+        if pooled:
+            ReadOnlyDBPool.release(connection)
+        else:
+            connection.close()
+
+    return
+
+
+def get_db_size() -> int:
+    """Get the size of the database on disk, including the write-ahead log.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return sum(
+        getsize(f)
+        for f in (DBConnection.file, DBConnection.file + "-wal")
+        if exists(f)
+    )
+
+
+def run_db_maintenance() -> tuple[int, float]:
+    """Update the statistics that the query planner uses, give unused pages
+    back to the filesystem and checkpoint and truncate the write-ahead log.
+
+    Returns:
+        Tuple[int, float]: The amount of bytes that were reclaimed and the
+        amount of seconds it took.
+    """
+    start = perf_counter()
+    commit()
+    size_before = get_db_size()
+
+    cursor = get_db()
+    cursor.execute(f"PRAGMA analysis_limit = {Constants.DB_ANALYSIS_LIMIT};")
+    if (
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1' LIMIT 1;"
+        ).exists()
+        is None
+    ):
+        # Never analysed before, which optimize doesn't always pick up on
+        cursor.execute("ANALYZE;")
+    else:
+        cursor.execute("PRAGMA optimize = 0x10002;")
+
+    cursor.execute("PRAGMA incremental_vacuum;").fetchall()
+    busy = cursor.execute("PRAGMA wal_checkpoint(TRUNCATE);").exists()
+    if busy:
+        LOGGER.debug("Could not fully checkpoint the write-ahead log")
+    commit()
+
+    return size_before - get_db_size(), perf_counter() - start
+
+
+# region Query Plans
+HOT_STATEMENTS: dict[str, str] = {
+    "blocklist_contains": """
+        SELECT id
+        FROM blocklist
+        WHERE download_link = ?
+            OR (web_link = ? AND download_link IS NULL)
+        LIMIT 1;
+    """,
+    "volume_of_comicvine_id": """
+        SELECT 1 FROM volumes WHERE comicvine_id = ? LIMIT 1;
+    """,
+    "volumes_to_refresh": """
+        SELECT comicvine_id, id, last_cv_fetch, marvel_id, special_version
+        FROM volumes
+        WHERE last_cv_fetch <= ?
+        ORDER BY last_cv_fetch ASC;
+    """,
+    "issues_of_volume": """
+        SELECT id, calculated_issue_number
+        FROM issues
+        WHERE volume_id = ?
+        ORDER BY calculated_issue_number;
+    """,
+    "issues_of_file": """
+        SELECT issue_id FROM issues_files WHERE file_id = ?;
+    """,
+    "file_of_filepath": """
+        SELECT id FROM files WHERE filepath = ? LIMIT 1;
+    """,
+    "files_of_volume": """
+        SELECT DISTINCT f.id, filepath, size
+        FROM files f
+        INNER JOIN issues_files if
+        INNER JOIN issues i
+        ON
+            f.id = if.file_id
+            AND if.issue_id = i.id
+        WHERE volume_id = ?;
+    """,
+    "general_files_of_volume": """
+        SELECT f.id, filepath, size, file_type
+        FROM files f
+        INNER JOIN volume_files vf
+        ON f.id = vf.file_id
+        WHERE volume_id = ?;
+    """,
+    "marvel_issues_of_volume": """
+        SELECT id FROM marvel_issues WHERE volume_id = ?;
+    """,
+    "downloads_of_volume": """
+        SELECT id FROM download_queue WHERE volume_id = ?;
+    """,
+    "downloads_of_client": """
+        SELECT 1 FROM download_queue WHERE external_client_id = ? LIMIT 1;
+    """,
+    "download_history_of_issue": """
+        SELECT rowid
+        FROM download_history
+        WHERE issue_id = ?
+        ORDER BY downloaded_at DESC, rowid DESC
+        LIMIT 50;
+    """,
+}
+"""
+Statements that run often or on big tables, and should therefore be
+supported by an index. Checked by `find_full_table_scans()`.
+"""
+
+full_scan_regex = compile(r"^SCAN (?!.*\b(?:USING|VIRTUAL TABLE)\b)(\w+)")
+
+
+def find_full_table_scans() -> dict[str, list[str]]:
+    """Find the statements in `HOT_STATEMENTS` of which the query plan
+    contains a scan over a full table.
+
+    Returns:
+        Dict[str, List[str]]: The name of the statements mapped to the
+        tables that they scan fully. Statements without them are left out.
+    """
+    cursor = Cursor(DBConnection())
+    result: dict[str, list[str]] = {}
+    for name, sql in HOT_STATEMENTS.items():
+        tables = []
+        for row in cursor.execute(
+            "EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?")
+        ):
+            scan = full_scan_regex.match(row[-1])
+            if scan:
+                tables.append(scan.group(1))
+
+        if tables:
+            result[name] = tables
+
+    cursor.close()
+    return result
+
+
+def check_query_plans() -> None:
+    """Log a warning for every hot statement that scans a full table"""
+    for name, tables in find_full_table_scans().items():
+        LOGGER.warning(
+            f"Statement '{name}' scans the full table(s): {', '.join(tables)}"
+        )
+    return
+
+
 def setup_db_adapters_and_converters() -> None:
     """Add DB adapters and converters for custom types and bool"""
     register_adapter(bool, lambda b: int(b))
@@ -294,6 +1180,8 @@ def setup_db_adapters_and_converters() -> None:
     register_adapter(SeedingHandling, lambda e: e.value)
     register_adapter(SpecialVersion, lambda e: e.value)
     register_adapter(DateType, lambda e: e.value)
+    register_adapter(DBSynchronous, lambda e: e.value)
+    register_adapter(DBTempStore, lambda e: e.value)
     return
 
 
@@ -312,8 +1200,19 @@ def setup_db() -> None:
     settings_values = settings.get_settings()
 
     set_log_level(settings_values.log_level)
+    QueryProfiler.configure(
+        settings_values.db_profiling, settings_values.db_slow_query_threshold
+    )
+    DBPerformanceProfile.configure(
+        settings_values.db_synchronous,
+        settings_values.db_cache_size,
+        settings_values.db_mmap_size,
+        settings_values.db_temp_store,
+        settings_values.db_wal_autocheckpoint,
+    )
 
     DatabaseMigrationHandler.migrate()
+    check_query_plans()
 
     # Generate api key
     if not settings_values.api_key:
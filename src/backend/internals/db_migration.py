@@ -3,8 +3,9 @@
 from asyncio import run
 from collections.abc import Callable
 
+from backend.base.helpers import hash_blob
 from backend.base.logging import LOGGER
-from backend.internals.db import get_db, iter_commit
+from backend.internals.db import commit, get_db, iter_commit
 
 
 # region Fork
@@ -29,6 +30,320 @@ def migrate_react() -> None:
         );
     """)
 
+    # Per-volume statistics used by the library listing. Kept up to date by
+    # triggers so that every code path that touches issues, files or their
+    # bindings updates it, without having to remember to do so.
+    get_db().executescript("""
+        CREATE TABLE IF NOT EXISTS volume_stats(
+            volume_id INTEGER PRIMARY KEY,
+            issue_count INTEGER NOT NULL DEFAULT 0,
+            issue_count_monitored INTEGER NOT NULL DEFAULT 0,
+            issues_downloaded INTEGER NOT NULL DEFAULT 0,
+            issues_downloaded_monitored INTEGER NOT NULL DEFAULT 0,
+            issue_file_count INTEGER NOT NULL DEFAULT 0,
+            marvel_issue_count INTEGER NOT NULL DEFAULT 0,
+            total_size INTEGER NOT NULL DEFAULT 0,
+            last_issue_date VARCHAR(10),
+
+            FOREIGN KEY (volume_id) REFERENCES volumes(id)
+                ON DELETE CASCADE
+        );
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_volume_insert
+        AFTER INSERT ON volumes
+        BEGIN
+            INSERT OR IGNORE INTO volume_stats(volume_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_issue_insert
+        AFTER INSERT ON issues
+        BEGIN
+            UPDATE volume_stats
+            SET
+                issue_count = issue_count + 1,
+                issue_count_monitored = issue_count_monitored + NEW.monitored,
+                last_issue_date = CASE
+                    WHEN NEW.date > IFNULL(last_issue_date, '')
+                    THEN NEW.date
+                    ELSE last_issue_date
+                END
+            WHERE volume_id = NEW.volume_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_issue_delete
+        AFTER DELETE ON issues
+        BEGIN
+            UPDATE volume_stats
+            SET
+                issue_count = issue_count - 1,
+                issue_count_monitored = issue_count_monitored - OLD.monitored,
+                last_issue_date = (
+                    SELECT MAX(date)
+                    FROM issues
+                    WHERE volume_id = OLD.volume_id
+                )
+            WHERE volume_id = OLD.volume_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_issue_monitored
+        AFTER UPDATE OF monitored ON issues
+        WHEN OLD.monitored != NEW.monitored
+        BEGIN
+            UPDATE volume_stats
+            SET
+                issue_count_monitored = issue_count_monitored
+                    + NEW.monitored - OLD.monitored,
+                issues_downloaded_monitored = issues_downloaded_monitored
+                    + (NEW.monitored - OLD.monitored) * EXISTS (
+                        SELECT 1
+                        FROM issues_files
+                        WHERE issue_id = NEW.id
+                    )
+            WHERE volume_id = NEW.volume_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_issue_date
+        AFTER UPDATE OF date ON issues
+        WHEN OLD.date IS NOT NEW.date
+        BEGIN
+            UPDATE volume_stats
+            SET last_issue_date = (
+                SELECT MAX(date)
+                FROM issues
+                WHERE volume_id = NEW.volume_id
+            )
+            WHERE volume_id = NEW.volume_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_binding_insert
+        AFTER INSERT ON issues_files
+        BEGIN
+            UPDATE volume_stats
+            SET
+                issue_file_count = issue_file_count + (
+                    (SELECT size FROM files WHERE id = NEW.file_id) IS NOT NULL
+                ),
+                issues_downloaded = issues_downloaded + (
+                    (
+                        SELECT COUNT(*)
+                        FROM issues_files
+                        WHERE issue_id = NEW.issue_id
+                    ) = 1
+                ),
+                issues_downloaded_monitored = issues_downloaded_monitored + (
+                    (
+                        SELECT COUNT(*)
+                        FROM issues_files
+                        WHERE issue_id = NEW.issue_id
+                    ) = 1
+                    AND (SELECT monitored FROM issues WHERE id = NEW.issue_id)
+                ),
+                total_size = total_size + CASE
+                    WHEN (
+                        SELECT COUNT(*)
+                        FROM issues_files if
+                        INNER JOIN issues i
+                        ON if.issue_id = i.id
+                        WHERE if.file_id = NEW.file_id
+                            AND i.volume_id = volume_stats.volume_id
+                    ) = 1
+                    THEN IFNULL(
+                        (SELECT size FROM files WHERE id = NEW.file_id), 0
+                    )
+                    ELSE 0
+                END
+            WHERE volume_id = (
+                SELECT volume_id FROM issues WHERE id = NEW.issue_id
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_binding_delete
+        AFTER DELETE ON issues_files
+        BEGIN
+            UPDATE volume_stats
+            SET
+                issue_file_count = issue_file_count - (
+                    (SELECT size FROM files WHERE id = OLD.file_id) IS NOT NULL
+                ),
+                issues_downloaded = issues_downloaded - NOT EXISTS (
+                    SELECT 1
+                    FROM issues_files
+                    WHERE issue_id = OLD.issue_id
+                ),
+                issues_downloaded_monitored = issues_downloaded_monitored - (
+                    NOT EXISTS (
+                        SELECT 1
+                        FROM issues_files
+                        WHERE issue_id = OLD.issue_id
+                    )
+                    AND (SELECT monitored FROM issues WHERE id = OLD.issue_id)
+                ),
+                total_size = total_size - CASE
+                    WHEN NOT EXISTS (
+                        SELECT 1
+                        FROM issues_files if
+                        INNER JOIN issues i
+                        ON if.issue_id = i.id
+                        WHERE if.file_id = OLD.file_id
+                            AND i.volume_id = volume_stats.volume_id
+                    )
+                    THEN IFNULL(
+                        (SELECT size FROM files WHERE id = OLD.file_id), 0
+                    )
+                    ELSE 0
+                END
+            WHERE volume_id = (
+                SELECT volume_id FROM issues WHERE id = OLD.issue_id
+            );
+        END;
+
+        -- The ON DELETE CASCADE of issues_files runs after the file row is
+        -- already gone, so the size could not be subtracted anymore. Remove
+        -- the bindings ourselves while the file is still there.
+        CREATE TRIGGER IF NOT EXISTS volume_stats_file_delete
+        BEFORE DELETE ON files
+        BEGIN
+            DELETE FROM issues_files WHERE file_id = OLD.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_file_size
+        AFTER UPDATE OF size ON files
+        WHEN OLD.size IS NOT NEW.size
+        BEGIN
+            UPDATE volume_stats
+            SET
+                total_size = total_size
+                    + IFNULL(NEW.size, 0) - IFNULL(OLD.size, 0),
+                issue_file_count = issue_file_count + (
+                    SELECT COUNT(*)
+                    FROM issues_files if
+                    INNER JOIN issues i
+                    ON if.issue_id = i.id
+                    WHERE if.file_id = NEW.id
+                        AND i.volume_id = volume_stats.volume_id
+                ) * ((NEW.size IS NOT NULL) - (OLD.size IS NOT NULL))
+            WHERE volume_id IN (
+                SELECT i.volume_id
+                FROM issues_files if
+                INNER JOIN issues i
+                ON if.issue_id = i.id
+                WHERE if.file_id = NEW.id
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_marvel_issue_insert
+        AFTER INSERT ON marvel_issues
+        BEGIN
+            UPDATE volume_stats
+            SET marvel_issue_count = marvel_issue_count + 1
+            WHERE volume_id = NEW.volume_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS volume_stats_marvel_issue_delete
+        AFTER DELETE ON marvel_issues
+        BEGIN
+            UPDATE volume_stats
+            SET marvel_issue_count = marvel_issue_count - 1
+            WHERE volume_id = OLD.volume_id;
+        END;
+    """)
+
+    # Full text search index for the library. The rowid is the volume ID and
+    # the values are normalised titles, filled by `Library.update_search_index`
+    get_db().executescript("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS volumes_search USING fts5(
+            title,
+            alt_title,
+            publisher,
+            tokenize = 'trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS volumes_search_volume_delete
+        AFTER DELETE ON volumes
+        BEGIN
+            DELETE FROM volumes_search WHERE rowid = OLD.id;
+        END;
+    """)
+
+    # Indexes for keyset pagination of the history and blocklist
+    get_db().executescript("""
+        CREATE INDEX IF NOT EXISTS download_history_downloaded_at_index
+            ON download_history(downloaded_at);
+        CREATE INDEX IF NOT EXISTS download_history_volume_downloaded_at_index
+            ON download_history(volume_id, downloaded_at);
+        CREATE INDEX IF NOT EXISTS download_history_issue_downloaded_at_index
+            ON download_history(issue_id, downloaded_at);
+        CREATE INDEX IF NOT EXISTS task_history_run_at_index
+            ON task_history(run_at);
+    """)
+
+    # Indexes for lookups that would otherwise scan the full table.
+    # issues_files(file_id) is already covered by its primary key.
+    get_db().executescript("""
+        CREATE INDEX IF NOT EXISTS volumes_comicvine_id_index
+            ON volumes(comicvine_id);
+        CREATE INDEX IF NOT EXISTS volumes_last_cv_fetch_index
+            ON volumes(last_cv_fetch);
+        CREATE INDEX IF NOT EXISTS volume_files_volume_id_index
+            ON volume_files(volume_id);
+        CREATE INDEX IF NOT EXISTS blocklist_web_link_index
+            ON blocklist(web_link);
+        CREATE INDEX IF NOT EXISTS download_queue_volume_id_index
+            ON download_queue(volume_id);
+        CREATE INDEX IF NOT EXISTS download_queue_external_client_id_index
+            ON download_queue(external_client_id);
+        CREATE INDEX IF NOT EXISTS marvel_issues_volume_id_index
+            ON marvel_issues(volume_id);
+    """)
+
+    # Files found in the volume folders during the last scan, so that
+    # following scans only have to process new and changed files.
+    # Managed by `FileManifestDB`.
+    get_db().executescript("""
+        CREATE TABLE IF NOT EXISTS file_manifests(
+            volume_id INTEGER NOT NULL,
+            filepath VARCHAR(255) NOT NULL,
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime INTEGER NOT NULL,
+            file_data TEXT NOT NULL,
+            match_key VARCHAR(32) NOT NULL,
+            issue_ids TEXT NOT NULL,
+            general_file_type VARCHAR(15),
+
+            PRIMARY KEY (volume_id, filepath),
+            FOREIGN KEY (volume_id) REFERENCES volumes(id)
+                ON DELETE CASCADE
+        );
+    """)
+
+    # The progress of the Update All task, so that it can be resumed after
+    # an interruption. Managed by `UpdateAllUnitsDB`.
+    get_db().executescript("""
+        CREATE TABLE IF NOT EXISTS update_all_units(
+            id INTEGER PRIMARY KEY,
+            volume_ids TEXT NOT NULL,
+            allow_skipping BOOL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt INTEGER NOT NULL DEFAULT 0,
+            done BOOL NOT NULL DEFAULT 0
+        );
+    """)
+
+    # The issue count on the CV page of each volume, with the validators of
+    # the page for conditional requests. Managed by `CVVolumePagesDB`.
+    get_db().executescript("""
+        CREATE TABLE IF NOT EXISTS cv_volume_pages(
+            volume_id INTEGER PRIMARY KEY,
+            issue_count INTEGER NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+
+            FOREIGN KEY (volume_id) REFERENCES volumes(id)
+                ON DELETE CASCADE
+        );
+    """)
+
     s = Settings().get_settings().todict()
 
     if (
@@ -91,6 +406,53 @@ def migrate_react() -> None:
         Settings().update({"added_kapowarr_react_columns": 2})
         s = Settings().get_settings().todict()
 
+    if s["added_kapowarr_react_columns"] < 3:
+        from backend.internals.db_models import VolumeStatsDB
+
+        VolumeStatsDB.rebuild()
+        Settings().update({"added_kapowarr_react_columns": 3})
+        s = Settings().get_settings().todict()
+
+    if s["added_kapowarr_react_columns"] < 4:
+        from backend.implementations.volumes import Library
+
+        Library().update_search_index()
+        Settings().update({"added_kapowarr_react_columns": 4})
+        s = Settings().get_settings().todict()
+
+    if s["added_kapowarr_react_columns"] < 5:
+        # Allow the maintenance task to give free pages back to the
+        # filesystem. Changing the mode of an existing database requires
+        # a full vacuum.
+        cursor = get_db()
+        if cursor.execute("PRAGMA auto_vacuum;").exists() != 2:
+            LOGGER.info("Enabling incremental vacuum, this can take a while")
+            commit()
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+            cursor.execute("VACUUM;")
+        Settings().update({"added_kapowarr_react_columns": 5})
+        s = Settings().get_settings().todict()
+
+    if s["added_kapowarr_react_columns"] < 6:
+        # Hash of the cover, so that clients can validate their cached copy
+        # without the cover having to be read
+        cursor = get_db()
+        cursor.execute(
+            "ALTER TABLE volumes_covers ADD COLUMN cover_hash VARCHAR(32);"
+        )
+        hashes = [
+            (hash_blob(cover), rowid)
+            for rowid, cover in cursor.execute(
+                "SELECT rowid, cover FROM volumes_covers;"
+            )
+        ]
+        cursor.executemany(
+            "UPDATE volumes_covers SET cover_hash = ? WHERE rowid = ?;",
+            hashes,
+        )
+        Settings().update({"added_kapowarr_react_columns": 6})
+        s = Settings().get_settings().todict()
+
 
 # region Handler
 class DatabaseMigrationHandler:
@@ -334,7 +696,7 @@ def _migrate_add_custom_folder():
 def _migrate_add_special_version():
     from backend.implementations.volumes import (
         Library,
-        determine_special_version,
+        determine_special_versions,
     )
 
     cursor = get_db()
@@ -344,8 +706,10 @@ def _migrate_add_special_version():
     """)
 
     updates = (
-        (determine_special_version(v_id), v_id)
-        for v_id in Library().get_volumes()
+        (special_version, v_id)
+        for v_id, special_version in determine_special_versions(
+            Library().get_volumes()
+        ).items()
     )
 
     cursor.executemany(
@@ -409,12 +773,14 @@ def _migrate_update_manifest():
 def _migrate_update_special_version():
     from backend.implementations.volumes import (
         Library,
-        determine_special_version,
+        determine_special_versions,
     )
 
     updates = (
-        (determine_special_version(v_id), v_id)
-        for v_id in Library().get_volumes()
+        (special_version, v_id)
+        for v_id, special_version in determine_special_versions(
+            Library().get_volumes()
+        ).items()
     )
 
     get_db().executemany(
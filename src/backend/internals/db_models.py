@@ -3,11 +3,20 @@ Interacting with the database
 """
 
 from collections.abc import Iterable, Mapping, Sequence
+from json import dumps, loads
 from os import stat
 from typing import Any
 
 from backend.base.custom_exceptions import FileNotFound
-from backend.base.definitions import FileData, FileExtraInfo, GeneralFileData
+from backend.base.definitions import (
+    Constants,
+    CVVolumePage,
+    FileData,
+    FileExtraInfo,
+    FileManifestEntry,
+    GeneralFileData,
+    UpdateAllUnit,
+)
 from backend.base.helpers import first_of_subarrays
 from backend.base.logging import LOGGER
 from backend.internals.db import get_db
@@ -88,6 +97,51 @@ class FilesDB:
 
         return result
 
+    @staticmethod
+    def fetch_many(
+        *,
+        file_ids: Iterable[int] | None = None,
+        filepaths: Iterable[str] | None = None,
+    ) -> list[FileData]:
+        """Get the data of multiple files in one go. Files that are not in the
+        database are skipped.
+
+        Args:
+            file_ids (Union[Iterable[int], None], optional): The IDs of the
+            files to get.
+                Defaults to None.
+
+            filepaths (Union[Iterable[str], None], optional): The filepaths of
+            the files to get, when not selecting on ID.
+                Defaults to None.
+
+        Returns:
+            List[FileData]: The data of the files that were found.
+        """
+        if file_ids is not None:
+            column, values = "id", list(file_ids)
+        elif filepaths is not None:
+            column, values = "filepath", list(filepaths)
+        else:
+            return []
+
+        if not values:
+            return []
+
+        result: list = (
+            get_db()
+            .execute(
+                f"""
+                SELECT id, filepath, size, releaser, scan_type, resolution, dpi
+                FROM files
+                WHERE {column} IN (SELECT value FROM json_each(?));
+                """,
+                (dumps(values),),
+            )
+            .fetchalldict()
+        )
+        return result
+
     @staticmethod
     def volume_of_file(filepath: str) -> int | None:
         volume_id = (
@@ -188,6 +242,80 @@ class FilesDB:
 
         return FilesDB.fetch(filepath=filepath)[0]["id"]
 
+    @staticmethod
+    def add_files(
+        filepaths: Iterable[str],
+        file_info: FileExtraInfo | None = None,
+        sizes: Mapping[str, int] = {},
+    ) -> dict[str, int]:
+        """Add multiple files to the database in one go. Files that are
+        already in the database are left untouched.
+
+        Args:
+            filepaths (Iterable[str]): The files to add.
+
+            file_info (Union[FileExtraInfo, None], optional): Extra info to
+            store for all of the files.
+                Defaults to None.
+
+            sizes (Mapping[str, int], optional): The sizes of the files, if
+            they're already known. Files that are missing are checked on disk.
+                Defaults to {}.
+
+        Returns:
+            Dict[str, int]: Map of the filepaths to their ID.
+        """
+        filepaths = list(filepaths)
+        if not filepaths:
+            return {}
+
+        info = file_info or {}
+        cursor = get_db()
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO
+                files(filepath, size, releaser, scan_type, resolution, dpi)
+            VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            (
+                (
+                    filepath,
+                    sizes[filepath]
+                    if filepath in sizes
+                    else stat(filepath).st_size,
+                    info.get("releaser"),
+                    info.get("scan_type"),
+                    info.get("resolution"),
+                    info.get("dpi"),
+                )
+                for filepath in filepaths
+            ),
+        )
+        if cursor.rowcount > 0:
+            LOGGER.debug(f"Added {cursor.rowcount} files to the database")
+
+        return {
+            f["filepath"]: f["id"]
+            for f in FilesDB.fetch_many(filepaths=filepaths)
+        }
+
+    @staticmethod
+    def update_sizes(sizes: Mapping[int, int]) -> None:
+        """Change the size of multiple files in one go.
+
+        Args:
+            sizes (Mapping[int, int]): Map of the file IDs to their new size.
+        """
+        if not sizes:
+            return
+
+        get_db().executemany(
+            "UPDATE files SET size = ? WHERE id = ?;",
+            ((size, file_id) for file_id, size in sizes.items()),
+        )
+        LOGGER.debug(f"Updated the size of {len(sizes)} files")
+        return
+
     @staticmethod
     def update_filepaths(
         old_filepaths: Iterable[str], new_filepaths: Iterable[str]
@@ -271,17 +399,28 @@ class FilesDB:
 
     @staticmethod
     def delete_issue_linked_files(issue_id: int) -> None:
+        FilesDB.delete_issues_linked_files((issue_id,))
+        return
+
+    @staticmethod
+    def delete_issues_linked_files(issue_ids: Iterable[int]) -> None:
+        """Delete the files that are linked to any of the given issues.
+
+        Args:
+            issue_ids (Iterable[int]): The IDs of the issues.
+        """
         get_db().execute(
             """
             DELETE FROM files
             WHERE id in (
                 SELECT DISTINCT file_id
                 FROM issues_files
-                WHERE issue_id = ?
+                WHERE issue_id IN (SELECT value FROM json_each(?))
             );
             """,
-            (issue_id,),
+            (dumps(list(issue_ids)),),
         )
+        return
 
     @staticmethod
     def delete_unmatched_files() -> None:
@@ -333,3 +472,435 @@ class GeneralFilesDB:
             (volume_id,),
         )
         return
+
+
+class FileManifestDB:
+    """The `file_manifests` table remembers, per volume, which files were
+    found in the volume folder, what was extracted from their filename and
+    what they were matched to. Scans use it to skip files that haven't
+    changed since the last scan.
+    """
+
+    @staticmethod
+    def fetch(volume_id: int) -> dict[str, FileManifestEntry]:
+        """Get the manifest of a volume.
+
+        Args:
+            volume_id (int): The ID of the volume.
+
+        Returns:
+            Dict[str, FileManifestEntry]: The filepaths mapped to their entry.
+        """
+        result: dict[str, FileManifestEntry] = {}
+        for entry in get_db().execute(
+            """
+            SELECT
+                filepath, inode, size, mtime,
+                file_data, match_key, issue_ids, general_file_type
+            FROM file_manifests
+            WHERE volume_id = ?;
+            """,
+            (volume_id,),
+        ):
+            file_data = loads(entry["file_data"])
+            for key in ("volume_number", "issue_number"):
+                # JSON has no tuples
+                if isinstance(file_data[key], list):
+                    file_data[key] = tuple(file_data[key])
+
+            result[entry["filepath"]] = {
+                "filepath": entry["filepath"],
+                "inode": entry["inode"],
+                "size": entry["size"],
+                "mtime": entry["mtime"],
+                "file_data": file_data,
+                "match_key": entry["match_key"],
+                "issue_ids": loads(entry["issue_ids"]),
+                "general_file_type": entry["general_file_type"],
+            }
+
+        return result
+
+    @staticmethod
+    def update(volume_id: int, entries: Iterable[FileManifestEntry]) -> None:
+        """Add entries to the manifest of a volume, or replace them if they
+        already exist.
+
+        Args:
+            volume_id (int): The ID of the volume.
+            entries (Iterable[FileManifestEntry]): The entries.
+        """
+        get_db().executemany(
+            """
+            INSERT OR REPLACE INTO file_manifests(
+                volume_id, filepath, inode, size, mtime,
+                file_data, match_key, issue_ids, general_file_type
+            ) VALUES (
+                :volume_id, :filepath, :inode, :size, :mtime,
+                :file_data, :match_key, :issue_ids, :general_file_type
+            );
+            """,
+            (
+                {
+                    **entry,
+                    "volume_id": volume_id,
+                    "file_data": dumps(entry["file_data"]),
+                    "issue_ids": dumps(entry["issue_ids"]),
+                }
+                for entry in entries
+            ),
+        )
+        return
+
+    @staticmethod
+    def delete(volume_id: int, filepaths: Iterable[str]) -> None:
+        """Remove entries from the manifest of a volume.
+
+        Args:
+            volume_id (int): The ID of the volume.
+            filepaths (Iterable[str]): The filepaths of the entries.
+        """
+        get_db().executemany(
+            "DELETE FROM file_manifests WHERE volume_id = ? AND filepath = ?;",
+            ((volume_id, filepath) for filepath in filepaths),
+        )
+        return
+
+
+class CVVolumePagesDB:
+    """The `cv_volume_pages` table holds per volume the issue count shown on
+    its CV page, together with the ETag and Last-Modified header of the page.
+    This way the page only has to be downloaded again when it changed.
+    """
+
+    @staticmethod
+    def fetch(volume_ids: Iterable[int]) -> dict[int, CVVolumePage]:
+        """Get the stored pages of volumes.
+
+        Args:
+            volume_ids (Iterable[int]): The IDs of the volumes.
+
+        Returns:
+            Dict[int, CVVolumePage]: Per volume ID its stored page. Volumes
+            without one are left out.
+        """
+        return {
+            p["volume_id"]: {
+                "issue_count": p["issue_count"],
+                "etag": p["etag"],
+                "last_modified": p["last_modified"],
+            }
+            for p in get_db().execute(
+                """
+                SELECT volume_id, issue_count, etag, last_modified
+                FROM cv_volume_pages
+                WHERE volume_id IN (SELECT value FROM json_each(?));
+                """,
+                (dumps(list(volume_ids)),),
+            )
+        }
+
+    @staticmethod
+    def store(pages: Mapping[int, CVVolumePage]) -> None:
+        """Add or update the stored pages of volumes.
+
+        Args:
+            pages (Mapping[int, CVVolumePage]): Per volume ID its page.
+        """
+        get_db().executemany(
+            """
+            INSERT INTO cv_volume_pages(
+                volume_id, issue_count, etag, last_modified
+            ) VALUES (
+                :volume_id, :issue_count, :etag, :last_modified
+            )
+            ON CONFLICT(volume_id) DO
+            UPDATE
+            SET
+                issue_count = :issue_count,
+                etag = :etag,
+                last_modified = :last_modified;
+            """,
+            ({"volume_id": v_id, **page} for v_id, page in pages.items()),
+        )
+        return
+
+
+class UpdateAllUnitsDB:
+    """The `update_all_units` table holds the progress of the Update All task.
+    The volumes to refresh are split into units that are refreshed one after
+    another. A unit is marked as done once it has been refreshed, so that an
+    interrupted run can continue where it stopped.
+    """
+
+    @staticmethod
+    def create(
+        volume_id_batches: Iterable[Sequence[int]], allow_skipping: bool
+    ) -> None:
+        """Replace the units with new ones.
+
+        Args:
+            volume_id_batches (Iterable[Sequence[int]]): The volume IDs of
+            each unit.
+            allow_skipping (bool): Whether the units may skip volumes that
+            don't need an update.
+        """
+        cursor = get_db()
+        cursor.execute("DELETE FROM update_all_units;")
+        cursor.executemany(
+            """
+            INSERT INTO update_all_units(volume_ids, allow_skipping)
+            VALUES (?, ?);
+            """,
+            ((dumps(list(b)), allow_skipping) for b in volume_id_batches),
+        )
+        return
+
+    @staticmethod
+    def fetch_pending() -> list[UpdateAllUnit]:
+        """Get the units that still have to be refreshed and haven't failed
+        too often, in the order that they should be refreshed in.
+
+        Returns:
+            List[UpdateAllUnit]: The units.
+        """
+        return [
+            {
+                "id": u["id"],
+                "volume_ids": loads(u["volume_ids"]),
+                "allow_skipping": bool(u["allow_skipping"]),
+                "attempts": u["attempts"],
+                "next_attempt": u["next_attempt"],
+            }
+            for u in get_db().execute(
+                """
+                SELECT id, volume_ids, allow_skipping, attempts, next_attempt
+                FROM update_all_units
+                WHERE done = 0 AND attempts < ?
+                ORDER BY next_attempt, id;
+                """,
+                (Constants.UPDATE_ALL_MAX_ATTEMPTS,),
+            )
+        ]
+
+    @staticmethod
+    def count_pending_volumes() -> int:
+        """Get the amount of volumes in the units that haven't been refreshed
+        yet.
+
+        Returns:
+            int: The amount of volumes.
+        """
+        return (
+            get_db()
+            .execute(
+                """
+                SELECT IFNULL(SUM(json_array_length(volume_ids)), 0)
+                FROM update_all_units
+                WHERE done = 0 AND attempts < ?;
+                """,
+                (Constants.UPDATE_ALL_MAX_ATTEMPTS,),
+            )
+            .exists()
+            or 0
+        )
+
+    @staticmethod
+    def mark_done(unit_id: int) -> None:
+        get_db().execute(
+            "UPDATE update_all_units SET done = 1 WHERE id = ?;", (unit_id,)
+        )
+        return
+
+    @staticmethod
+    def mark_failed(unit_id: int, next_attempt: int) -> None:
+        """Note that an attempt at refreshing a unit failed.
+
+        Args:
+            unit_id (int): The ID of the unit.
+            next_attempt (int): Epoch timestamp from which the unit may be
+            tried again.
+        """
+        get_db().execute(
+            """
+            UPDATE update_all_units
+            SET attempts = attempts + 1, next_attempt = ?
+            WHERE id = ?;
+            """,
+            (next_attempt, unit_id),
+        )
+        return
+
+    @staticmethod
+    def count_failed() -> int:
+        "Get the amount of units that were given up on after too many attempts"
+        return (
+            get_db()
+            .execute(
+                """
+                SELECT COUNT(*)
+                FROM update_all_units
+                WHERE done = 0 AND attempts >= ?;
+                """,
+                (Constants.UPDATE_ALL_MAX_ATTEMPTS,),
+            )
+            .exists()
+            or 0
+        )
+
+    @staticmethod
+    def clear() -> None:
+        get_db().execute("DELETE FROM update_all_units;")
+        return
+
+
+class VolumeStatsDB:
+    """The `volume_stats` table holds per-volume counts and sizes for the
+    library listing. It's kept up to date by triggers, so it normally never has
+    to be written to directly. This class can calculate the values from
+    scratch, to verify and repair the table.
+    """
+
+    _calculate_query = """
+        SELECT
+            v.id AS volume_id,
+            (
+                SELECT COUNT(*)
+                FROM issues
+                WHERE volume_id = v.id
+            ) AS issue_count,
+            (
+                SELECT COUNT(*)
+                FROM issues
+                WHERE volume_id = v.id
+                    AND monitored = 1
+            ) AS issue_count_monitored,
+            (
+                SELECT COUNT(DISTINCT if.issue_id)
+                FROM issues i
+                INNER JOIN issues_files if
+                ON i.id = if.issue_id
+                WHERE i.volume_id = v.id
+            ) AS issues_downloaded,
+            (
+                SELECT COUNT(DISTINCT if.issue_id)
+                FROM issues i
+                INNER JOIN issues_files if
+                ON i.id = if.issue_id
+                WHERE i.volume_id = v.id
+                    AND i.monitored = 1
+            ) AS issues_downloaded_monitored,
+            (
+                SELECT COUNT(f.size)
+                FROM issues i
+                INNER JOIN issues_files if
+                INNER JOIN files f
+                ON i.id = if.issue_id
+                    AND if.file_id = f.id
+                WHERE i.volume_id = v.id
+            ) AS issue_file_count,
+            (
+                SELECT COUNT(*)
+                FROM marvel_issues
+                WHERE volume_id = v.id
+            ) AS marvel_issue_count,
+            (
+                SELECT IFNULL(SUM(size), 0) FROM (
+                    SELECT DISTINCT f.id, f.size
+                    FROM issues i
+                    INNER JOIN issues_files if
+                    INNER JOIN files f
+                    ON i.id = if.issue_id
+                        AND if.file_id = f.id
+                    WHERE i.volume_id = v.id
+                )
+            ) AS total_size,
+            (
+                SELECT MAX(date)
+                FROM issues
+                WHERE volume_id = v.id
+            ) AS last_issue_date
+        FROM volumes v
+    """
+
+    _columns = """
+        volume_id,
+        issue_count, issue_count_monitored,
+        issues_downloaded, issues_downloaded_monitored,
+        issue_file_count, marvel_issue_count,
+        total_size, last_issue_date
+    """
+
+    @staticmethod
+    def rebuild(volume_ids: Iterable[int] | None = None) -> None:
+        """Calculate the statistics from scratch and store them.
+
+        Args:
+            volume_ids (Iterable[int] | None, optional): Only rebuild the
+            statistics of these volumes. Give `None` to rebuild the whole table.
+                Defaults to None.
+        """
+        cursor = get_db()
+        if volume_ids is None:
+            LOGGER.debug("Rebuilding volume statistics of all volumes")
+            cursor.execute("DELETE FROM volume_stats;")
+            cursor.execute(
+                f"""
+                INSERT INTO volume_stats({VolumeStatsDB._columns})
+                {VolumeStatsDB._calculate_query};
+                """
+            )
+            return
+
+        volume_ids = tuple(volume_ids)
+        LOGGER.debug(f"Rebuilding volume statistics of volumes {volume_ids}")
+        cursor.executemany(
+            f"""
+            INSERT OR REPLACE INTO volume_stats({VolumeStatsDB._columns})
+            {VolumeStatsDB._calculate_query}
+            WHERE v.id = ?;
+            """,
+            ((volume_id,) for volume_id in volume_ids),
+        )
+        return
+
+    @staticmethod
+    def find_inconsistencies() -> list[int]:
+        """Find the volumes of which the stored statistics don't match
+        the actual values, or that don't have statistics stored at all.
+
+        Returns:
+            List[int]: The IDs of the volumes.
+        """
+        return first_of_subarrays(
+            get_db().execute(
+                f"""
+                {VolumeStatsDB._calculate_query}
+                EXCEPT
+                SELECT {VolumeStatsDB._columns}
+                FROM volume_stats;
+                """
+            )
+        )
+
+    @staticmethod
+    def check_consistency(repair: bool = True) -> list[int]:
+        """Verify that the stored statistics are correct.
+
+        Args:
+            repair (bool, optional): Rebuild the statistics of the volumes that
+            turn out to be incorrect.
+                Defaults to True.
+
+        Returns:
+            List[int]: The IDs of the volumes that had incorrect statistics.
+        """
+        volume_ids = VolumeStatsDB.find_inconsistencies()
+        if volume_ids:
+            LOGGER.warning(
+                f"Volume statistics were incorrect for volumes {volume_ids}"
+            )
+            if repair:
+                VolumeStatsDB.rebuild(volume_ids)
+
+        return volume_ids
@@ -5,7 +5,7 @@ Also handling startup types.
 
 from __future__ import annotations
 
-from collections.abc import Callable, Collection, Iterable, Mapping
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
 from multiprocessing import SimpleQueue
 from os import urandom
 from threading import Thread, Timer
@@ -30,6 +30,8 @@ from backend.base.helpers import Singleton
 from backend.base.logging import LOGGER, setup_logging
 from backend.internals.db import (
     DBConnectionManager,
+    DBPerformanceProfile,
+    ReadOnlyDBPool,
     close_db,
     set_db_location,
     setup_db_adapters_and_converters,
@@ -71,6 +73,7 @@ class ThreadedTaskDispatcher(TTD):
         WebSocket().disconnect_all()
 
         result = super().shutdown(cancel_pending, timeout)
+        ReadOnlyDBPool.close_all()
         return result
 
 
@@ -391,12 +394,20 @@ class WebSocket(SocketIO, metaclass=Singleton):
         )
         return
 
-    def send_issue_deleted(self, volume_id: int, issue_id: int) -> None:
+    def send_issues_deleted(
+        self, volume_id: int, issue_ids: Sequence[int]
+    ) -> None:
+        """Send a message stating that issues of a volume have been deleted.
+
+        Args:
+            volume_id (int): The ID of the volume.
+            issue_ids (Sequence[int]): The IDs of the deleted issues.
+        """
         self.emit(
             SocketEvent.ISSUE_DELETED,
             {
                 "volume_id": volume_id,
-                "issue_id": issue_id,
+                "issue_ids": list(issue_ids),
             },
         )
         return
@@ -666,4 +677,15 @@ def setup_process(
 
     app = Flask(__name__)
     app.teardown_appcontext(close_db)
+
+    with app.app_context():
+        settings = Settings().sv
+        DBPerformanceProfile.configure(
+            settings.db_synchronous,
+            settings.db_cache_size,
+            settings.db_mmap_size,
+            settings.db_temp_store,
+            settings.db_wal_autocheckpoint,
+        )
+
     return app.app_context
@@ -18,6 +18,8 @@ from backend.base.definitions import (
     BaseEnum,
     Constants,
     DateType,
+    DBSynchronous,
+    DBTempStore,
     GCDownloadSource,
     SeedingHandling,
 )
@@ -35,7 +37,13 @@ from backend.base.helpers import (
     normalise_base_url,
 )
 from backend.base.logging import LOGGER, set_log_level
-from backend.internals.db import DBConnection, commit, get_db
+from backend.internals.db import (
+    DBConnection,
+    DBPerformanceProfile,
+    QueryProfiler,
+    commit,
+    get_db,
+)
 from backend.internals.db_migration import DatabaseMigrationHandler
 
 
@@ -101,6 +109,7 @@ class PublicSettingsValues:
 
     create_empty_volume_folders: bool = True
     delete_empty_folders: bool = False
+    watch_library: bool = False
 
     unmonitor_deleted_issues: bool = False
 
@@ -129,6 +138,15 @@ class PublicSettingsValues:
     include_cover_only_files: bool = False
     include_scanned_books: bool = False
 
+    db_profiling: bool = False
+    db_slow_query_threshold: int = 500  # ms
+
+    db_synchronous: DBSynchronous = DBSynchronous.NORMAL
+    db_cache_size: int = 64  # MiB
+    db_mmap_size: int = 256  # MiB
+    db_temp_store: DBTempStore = DBTempStore.MEMORY
+    db_wal_autocheckpoint: int = 1000  # pages
+
     def todict(self, to_public: bool = True) -> dict[str, Any]:
         """Convert the dataclass to a dictionary.
 
@@ -168,10 +186,19 @@ class SettingsValues(PublicSettingsValues):
     backup_url_base: str = ""
 
 
+DB_PERFORMANCE_KEYS = (
+    "db_synchronous",
+    "db_cache_size",
+    "db_mmap_size",
+    "db_temp_store",
+    "db_wal_autocheckpoint",
+)
+
 task_intervals = {
     # If there are tasks that should be run at the same time,
     # but per se after each other, put them in that order in the dict.
     "update_all": 3600,  # every hour
+    "database_maintenance": 86400,  # every day
     "search_all": 86400,  # every day
 }
 
@@ -270,6 +297,7 @@ class Settings(metaclass=Singleton):
             InvalidSettingModification: Key can not be modified this way.
             FolderNotFound: Folder not found.
         """
+        from backend.features.library_watcher import LibraryWatcher
         from backend.implementations.naming import (
             NAMING_MAPPING,
             check_mock_filename,
@@ -301,6 +329,28 @@ class Settings(metaclass=Singleton):
 
         self.clear_cache()
 
+        if "db_profiling" in data or "db_slow_query_threshold" in data:
+            new_settings = self.get_settings()
+            QueryProfiler.configure(
+                new_settings.db_profiling, new_settings.db_slow_query_threshold
+            )
+
+        if any(key in data for key in DB_PERFORMANCE_KEYS):
+            new_settings = self.get_settings()
+            DBPerformanceProfile.configure(
+                new_settings.db_synchronous,
+                new_settings.db_cache_size,
+                new_settings.db_mmap_size,
+                new_settings.db_temp_store,
+                new_settings.db_wal_autocheckpoint,
+            )
+
+        if "watch_library" in data:
+            if formatted_data["watch_library"]:
+                LibraryWatcher().start()
+            else:
+                LibraryWatcher().stop()
+
         LOGGER.info(f"Settings changed: {formatted_data}")
 
         WebSocket().send_settings_updated(self.get_public_settings())
@@ -463,6 +513,15 @@ class Settings(metaclass=Singleton):
                 ) or folder_is_inside_folder(converted_value, rf.folder):
                     raise InvalidKeyValue(key, value)
 
+        elif key == "db_slow_query_threshold" and value < 0:
+            raise InvalidKeyValue(key, value)
+
+        elif key == "db_cache_size" and value <= 0:
+            raise InvalidKeyValue(key, value)
+
+        elif key in ("db_mmap_size", "db_wal_autocheckpoint") and value < 0:
+            raise InvalidKeyValue(key, value)
+
         elif key == "concurrent_direct_downloads" and value <= 0:
             raise InvalidKeyValue(key, value)
 
@@ -14,6 +14,7 @@ from backend.base.custom_exceptions import (
 from backend.base.definitions import (
     BlocklistReason,
     BlocklistReasonID,
+    Constants,
     CredentialData,
     CredentialSource,
     DownloadSource,
@@ -27,6 +28,10 @@ from backend.base.definitions import (
     ThumbnailData,
     VolumeData,
 )
+from backend.base.file_extraction import (
+    clear_filename_data_cache,
+    get_filename_data_cache_stats,
+)
 from backend.base.helpers import hash_password
 from backend.base.logging import LOGGER, get_log_file_contents
 from backend.features.download_queue import (
@@ -63,7 +68,11 @@ from backend.implementations.blocklist import (
     get_blocklist_entry,
     get_blocklist_total_records,
 )
-from backend.implementations.comicvine import ComicVine
+from backend.implementations.comicvine import (
+    ComicVine,
+    CVCache,
+    CVRateLimiter,
+)
 from backend.implementations.conversion import (
     FileConversionHandler,
     preview_mass_convert,
@@ -81,6 +90,12 @@ from backend.implementations.naming import (
 from backend.implementations.remote_mapping import RemoteMappings
 from backend.implementations.root_folders import RootFolders
 from backend.implementations.volumes import Library, delete_issue_file
+from backend.internals.db import (
+    DBConnectionStats,
+    QueryProfiler,
+    find_full_table_scans,
+    use_read_only_db,
+)
 from backend.internals.db_models import FilesDB
 from backend.internals.server import Server, StartTypeHandlers
 from backend.internals.settings import Settings, get_about_data
@@ -97,6 +112,16 @@ def return_api(
     return {"error": error, "result": result}, code
 
 
+@api.before_request
+def read_only_get_requests() -> None:
+    """GET requests only read from the database, so they use a read-only
+    connection instead of having to wait on writes.
+    """
+    if request.method == "GET":
+        use_read_only_db()
+    return
+
+
 def error_handler(method: Callable[[Any], Any]) -> Any:
     """Used as decodator. Catches the errors that can occur in the endpoint and returns the correct api error"""
 
@@ -237,7 +262,7 @@ def extract_key(
             else:
                 raise InvalidKeyValue(key, value)
 
-        elif key in ("query", "folder_filter"):
+        elif key in ("query", "folder_filter", "after"):
             if not value:
                 raise InvalidKeyValue(key, value)
 
@@ -349,7 +374,9 @@ def api_auth_check() -> ApiReturn:
 @error_handler
 @auth
 def api_about() -> ApiReturn:
-    return return_api(get_about_data())
+    return return_api(
+        {**get_about_data(), "comicvine_cache": CVCache.get_stats()}
+    )
 
 
 @api.route("/system/logs", methods=["GET"])
@@ -365,6 +392,44 @@ def api_logs() -> tuple[Response, int]:
     ), 200
 
 
+@api.route("/system/db/stats", methods=["GET", "DELETE"])
+@error_handler
+@auth
+def api_db_stats() -> ApiReturn | None:
+    if request.method == "GET":
+        return return_api(
+            {
+                **QueryProfiler.get_stats(),
+                "connections": DBConnectionStats.get_stats(),
+                "full_table_scans": find_full_table_scans(),
+            }
+        )
+
+    elif request.method == "DELETE":
+        QueryProfiler.reset()
+        DBConnectionStats.reset()
+        return return_api({})
+
+
+@api.route("/system/cache/stats", methods=["GET", "DELETE"])
+@error_handler
+@auth
+def api_cache_stats() -> ApiReturn | None:
+    if request.method == "GET":
+        return return_api({"filename_data": get_filename_data_cache_stats()})
+
+    elif request.method == "DELETE":
+        clear_filename_data_cache()
+        return return_api({})
+
+
+@api.route("/system/comicvine/budget", methods=["GET"])
+@error_handler
+@auth
+def api_cv_budget() -> ApiReturn:
+    return return_api(CVRateLimiter.get_budget())
+
+
 @api.route("/system/tasks", methods=["GET", "POST"])
 @error_handler
 @auth
@@ -437,11 +502,18 @@ def api_tasks() -> ApiReturn | None:
 @api.route("/system/tasks/history", methods=["GET", "DELETE"])
 @error_handler
 @auth
-def api_task_history() -> ApiReturn | None:
+def api_task_history() -> (
+    ApiReturn | tuple[dict[str, Any], int, dict[str, str]] | None
+):
     if request.method == "GET":
         offset = extract_key(request, "offset", False)
-        tasks = get_task_history(offset)
-        return return_api(tasks)
+        after = extract_key(request, "after", False)
+        tasks, next_cursor = get_task_history(offset, after)
+
+        # The result stays a list, so the cursor is sent in a header
+        result, code = return_api(tasks)
+        headers = {} if next_cursor is None else {"X-Next-Cursor": next_cursor}
+        return result, code, headers
 
     elif request.method == "DELETE":
         delete_task_history()
@@ -749,7 +821,8 @@ def api_library_import() -> ApiReturn | None:
 def api_volumes_search() -> ApiReturn | None:
     if request.method == "GET":
         query = extract_key(request, "query")
-        search_results = run(ComicVine().search_volumes(query))
+        cv = ComicVine(max_wait=Constants.CV_MAX_INTERACTIVE_WAIT)
+        search_results = run(cv.search_volumes(query))
         for r in search_results:
             del r["cover"]  # pyright: ignore
         return return_api(search_results)
@@ -800,10 +873,17 @@ def api_volumes() -> ApiReturn | None:
         query = extract_key(request, "query", False)
         sort = extract_key(request, "sort", False)
         filter = extract_key(request, "filter", False)
+        # Only page the results when explicitly asked for
+        limit = (
+            extract_key(request, "limit", False)
+            if "limit" in request.values
+            else None
+        )
+        offset = extract_key(request, "offset", False)
         if query:
-            volumes = library.search(query, sort, filter)
+            volumes = library.search(query, sort, filter, limit, offset)
         else:
-            volumes = library.get_public_volumes(sort, filter)
+            volumes = library.get_public_volumes(sort, filter, limit, offset)
 
         return return_api(volumes)
 
@@ -928,8 +1008,21 @@ def api_volume(id: int) -> ApiReturn | None:
 @error_handler
 @auth
 def api_volume_cover(id: int) -> tuple[Response, int]:
-    cover = library.get_volume(id).get_cover()
-    return send_file(cover, mimetype="image/jpeg"), 200
+    volume = library.get_volume(id)
+    cover_hash = volume.get_cover_hash()
+
+    if cover_hash is not None and cover_hash in request.if_none_match:
+        response = Response(status=304)
+        code = 304
+    else:
+        response = Response(volume.get_cover(), mimetype="image/jpeg")
+        code = 200
+
+    if cover_hash is not None:
+        response.set_etag(cover_hash)
+    response.cache_control.private = True
+    response.cache_control.max_age = Constants.COVER_MAX_AGE
+    return response, code
 
 
 @api.route("/issues/<int:id>/thumbnails", methods=["GET"])
@@ -1153,12 +1246,16 @@ def api_download_history() -> ApiReturn | None:
         volume_id: int = extract_key(request, "volume_id", False)
         issue_id: int = extract_key(request, "issue_id", False)
         offset: int = extract_key(request, "offset", False)
-        history = get_download_history(volume_id, issue_id, offset)
+        after: str | None = extract_key(request, "after", False)
+        history, next_cursor = get_download_history(
+            volume_id, issue_id, offset, after
+        )
         total_records = get_download_history_total_records(volume_id, issue_id)
         return return_api(
             {
                 "history": history,
                 "total_records": total_records,
+                "next_cursor": next_cursor,
             }
         )
 
@@ -1186,13 +1283,15 @@ def api_empty_download_folder() -> ApiReturn:
 def api_blocklist() -> ApiReturn | None:
     if request.method == "GET":
         offset = extract_key(request, "offset", False)
+        after = extract_key(request, "after", False)
 
-        blocklist = get_blocklist(offset)
+        blocklist, next_cursor = get_blocklist(offset, after)
         total_records = get_blocklist_total_records()
         return return_api(
             {
                 "blocklist": [b.todict() for b in blocklist],
                 "total_records": total_records,
+                "next_cursor": next_cursor,
             }
         )
 
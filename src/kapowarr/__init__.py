@@ -11,6 +11,7 @@ from backend.base.custom_exceptions import InvalidKeyValue
 from backend.base.definitions import Constants, StartType
 from backend.base.logging import LOGGER, setup_logging
 from backend.features.download_queue import DownloadHandler
+from backend.features.library_watcher import LibraryWatcher
 from backend.features.tasks import TaskHandler
 from backend.internals.db import set_db_location, setup_db
 from backend.internals.server import Server, StartTypeHandlers
@@ -98,6 +99,10 @@ def _main(
         download_handler.load_downloads()
         task_handler = TaskHandler()
         task_handler.handle_intervals()
+        task_handler.resume_tasks()
+        library_watcher = LibraryWatcher()
+        if settings.watch_library:
+            library_watcher.start()
 
     restart_type = None
     try:
@@ -110,6 +115,7 @@ def _main(
     finally:
         download_handler.stop_handle()
         task_handler.stop_handle()
+        library_watcher.stop()
 
         if restart_type is not None:
             LOGGER.info("Restarting Kapowarr")